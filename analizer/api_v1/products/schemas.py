@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import date
+import datetime
 
 
 class ProductSchema(BaseModel):
@@ -8,8 +8,53 @@ class ProductSchema(BaseModel):
     """
     uid: int
     id: int
-    date: date
+    date: datetime.date
     name: str
     quantity: int
     price: float
     category: str
+
+
+class ProductFieldsSchema(BaseModel):
+    """
+    Схема продукта с выбранными полями
+    """
+    uid: int | None = None
+    id: int | None = None
+    date: datetime.date | None = None
+    name: str | None = None
+    quantity: int | None = None
+    price: float | None = None
+    category: str | None = None
+
+
+class ProductPageSchema(BaseModel):
+    """
+    Страница продуктов
+
+    `next_cursor` передается в `cursor` для следующей страницы,
+    `None` на последней странице.
+    """
+    items: list[ProductFieldsSchema]
+    next_cursor: str | None
+
+
+class DailyAggregateSchema(BaseModel):
+    """
+    Агрегаты продаж за день
+    """
+    date: datetime.date
+    revenue: float | None
+    top_products: list[str]
+    categories: list[str]
+
+    def template_values(self) -> dict[str, str]:
+        """
+        Значения для шаблона запроса LLM
+        """
+        return dict(
+            date=self.date.strftime('%Y-%m-%d'),
+            revenue=str(self.revenue),
+            products=', '.join(self.top_products),
+            categories=', '.join(self.categories),
+        )
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from collections.abc import AsyncGenerator
+from datetime import date
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import ColumnElement
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from .schemas import ProductSchema
+from .schemas import ProductPageSchema
 from .dao import ProductDAO
-from config import db_connection
+from api_v1.renders import ExportFormat, ExportRender
+from config import db_connection, settings
+from config.dao.base_dao import select_columns
+from config.models import Product
 
 
 router = APIRouter(prefix='/products',
@@ -11,10 +18,84 @@ router = APIRouter(prefix='/products',
                    )
 
 
-@router.get(path='/list')
+class ProductFilters:
+    """
+    Фильтры выборки продуктов из параметров запроса
+    """
+
+    def __init__(self,
+                 date_from: date | None = None,
+                 date_to: date | None = None,
+                 category: str | None = None,
+                 fields: str | None = Query(default=None,
+                                            description='Поля через запятую'),
+                 ) -> None:
+        self.filters: list[ColumnElement[bool]] = []
+        if date_from is not None:
+            self.filters.append(Product.date >= date_from)
+        if date_to is not None:
+            self.filters.append(Product.date <= date_to)
+        self.kwargs: dict[str, Any] = {}
+        if category is not None:
+            self.kwargs['category'] = category
+        self.fields = ([field.strip() for field in fields.split(',')]
+                       if fields else None)
+
+
+@router.get(path='/list', response_model_exclude_unset=True)
 async def get_list_products(
-    session: AsyncSession = Depends(db_connection.session_geter)
-) -> list[ProductSchema]:
-    return await ProductDAO.find_all_items_by_args(
-        session=session,
+    cursor: str | None = None,
+    limit: int = Query(default=settings.PAGE_SIZE,
+                       ge=1,
+                       le=settings.PAGE_SIZE_MAX),
+    params: ProductFilters = Depends(),
+    session: AsyncSession = Depends(db_connection.session_geter),
+) -> ProductPageSchema:
+    try:
+        items, next_cursor = await ProductDAO.find_page(
+            session=session,
+            cursor=cursor,
+            limit=limit,
+            fields=params.fields,
+            filters=params.filters,
+            **params.kwargs,
+        )
+    except ValueError as ex:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=str(ex))
+    return ProductPageSchema(items=items, next_cursor=next_cursor)
+
+
+@router.get(path='/export', response_class=ExportRender)
+async def export_products(
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON,
+                                        alias='format'),
+    gzip: bool = False,
+    params: ProductFilters = Depends(),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(
+        db_connection.session_factory,
+    ),
+) -> ExportRender:
+    try:
+        columns = select_columns(table=Product.__table__, fields=params.fields)
+    except ValueError as ex:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=str(ex))
+
+    async def rows() -> AsyncGenerator[dict[str, Any], None]:
+        async with session_factory() as session:
+            async for row in ProductDAO.stream_items(
+                session=session,
+                fields=params.fields,
+                filters=params.filters,
+                **params.kwargs,
+            ):
+                yield row
+
+    return ExportRender(
+        rows=rows(),
+        fields=[column.name for column in columns],
+        export_format=export_format,
+        compress=gzip,
+        filename='products',
     )
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+import zlib
+from collections.abc import AsyncIterable, AsyncGenerator, Sequence
+from enum import StrEnum
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+from config import settings
+
+
+class ExportFormat(StrEnum):
+    """
+    Форматы выгрузки
+    """
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: 'application/x-ndjson',
+    ExportFormat.CSV: 'text/csv',
+}
+
+
+class ExportRender(StreamingResponse):
+    """
+    Потоковая выгрузка строк в NDJSON или CSV
+
+    Строки кодируются по мере поступления и отдаются кусками
+    по `settings.EXPORT_CHUNK_SIZE` байт, при `compress`
+    сжимаются gzip (`Content-Encoding: gzip`). Вся выгрузка
+    в памяти не собирается.
+
+    ## Example
+    ``` python
+    @router.get(path='/export')
+    async def export_items():
+        rows = ModelDAO.stream_items(session=session)
+        return ExportRender(
+            rows=rows,
+            fields=('id', 'name'),
+            export_format=ExportFormat.CSV,
+        )
+    ```
+    """
+
+    def __init__(self,
+                 rows: AsyncIterable[dict[str, Any]],
+                 fields: Sequence[str],
+                 export_format: ExportFormat = ExportFormat.NDJSON,
+                 compress: bool = False,
+                 filename: str = 'export',
+                 ) -> None:
+        if export_format == ExportFormat.CSV:
+            lines = encode_csv(rows=rows, fields=fields)
+        else:
+            lines = encode_ndjson(rows=rows)
+        content = join_chunks(lines=lines, size=settings.EXPORT_CHUNK_SIZE)
+        headers = {'Content-Disposition': ('attachment; '
+                                           f'filename="{filename}.{export_format}"')}
+        if compress:
+            content = gzip_chunks(chunks=content)
+            headers['Content-Encoding'] = 'gzip'
+        super().__init__(
+            content=content,
+            media_type=MEDIA_TYPES[export_format],
+            headers=headers,
+        )
+
+
+async def encode_ndjson(rows: AsyncIterable[dict[str, Any]],
+                        ) -> AsyncGenerator[str, None]:
+    """
+    Строки в формате NDJSON, по объекту JSON на строку
+    """
+    async for row in rows:
+        yield json.dumps(row, default=str, ensure_ascii=False) + '\n'
+
+
+async def encode_csv(rows: AsyncIterable[dict[str, Any]],
+                     fields: Sequence[str],
+                     ) -> AsyncGenerator[str, None]:
+    """
+    Строки в формате CSV с заголовком `fields`
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    async for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def join_chunks(lines: AsyncIterable[str],
+                      size: int,
+                      ) -> AsyncGenerator[bytes, None]:
+    """
+    Объединение строк в куски не меньше `size` байт
+    """
+    chunk = []
+    length = 0
+    async for line in lines:
+        data = line.encode()
+        chunk.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(chunk)
+            chunk = []
+            length = 0
+    if chunk:
+        yield b''.join(chunk)
+
+
+async def gzip_chunks(chunks: AsyncIterable[bytes],
+                      ) -> AsyncGenerator[bytes, None]:
+    """
+    Потоковое сжатие кусков в формат gzip
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -3,6 +3,7 @@ from fastapi import FastAPI
 from config import settings
 from api_v1.products.views import router as products
 from api_v1.llm_answers.views import router as answers
+from api_v1.sales_summary.views import router as summary
 
 
 def register_routers(app: FastAPI) -> None:
@@ -44,3 +45,7 @@ def register_routers(app: FastAPI) -> None:
         router=answers,
         prefix=settings.API_PREFIX,
         )
+    app.include_router(
+        router=summary,
+        prefix=settings.API_PREFIX,
+        )
@@ -0,0 +1,153 @@
+from collections.abc import Iterable
+from datetime import date
+from sqlalchemy import Select, delete, desc, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from config import settings
+from config.dao import BaseDAO
+from config.dao.base_dao import DIALECT_INSERTS
+from config.models import DailySalesSummary, Product
+from api_v1.products.schemas import DailyAggregateSchema
+
+
+class DailySalesSummaryDAO(BaseDAO):
+    """
+    DAO класс для сводок продаж за день
+    """
+    model = DailySalesSummary
+    source = Product
+
+    @classmethod
+    def top_order(cls) -> tuple:
+        """
+        Порядок лучших продуктов: по количеству продаж, при равенстве -
+        по имени и `id`, чтобы сводка и запрос LLM совпадали
+        """
+        product = cls.source
+        return desc(product.quantity), product.name, product.id
+
+    @classmethod
+    async def aggregate(cls,
+                        session: AsyncSession,
+                        date: date,
+                        top: int = settings.SUMMARY_TOP_PRODUCTS,
+                        ) -> dict[str, object] | None:
+        """
+        Агрегация продуктов за дату в значения сводки
+
+        Один запрос: оконные функции считают выручку, количество,
+        выручку категорий и ранги за один проход по продуктам даты,
+        наружу отдаются только `top` лучших продуктов и первые строки
+        каждой категории. Используется и для сводки, и для запроса
+        LLM без сводки.
+
+        Returns:
+            dict[str, object] | None: Значения сводки или `None`, \
+                если продуктов за дату нет.
+        """
+        product = cls.source
+        amount = product.price * product.quantity
+        day = (Select(
+            product.name,
+            product.category,
+            func.sum(amount).over().label('revenue'),
+            func.count().over().label('item_count'),
+            func.sum(amount)
+            .over(partition_by=product.category)
+            .label('category_revenue'),
+            func.row_number()
+            .over(order_by=cls.top_order())
+            .label('rank'),
+            func.row_number()
+            .over(partition_by=product.category)
+            .label('category_rank'),
+            )
+            .where(product.date == date)
+            .subquery())
+        rows = (await session.execute(
+            Select(day)
+            .where(or_(day.c.rank <= top, day.c.category_rank == 1))
+            .order_by(day.c.rank)
+        )).all()
+        if not rows:
+            return None
+        return dict(
+            date=date,
+            revenue=rows[0].revenue,
+            item_count=rows[0].item_count,
+            top_products=[row.name for row in rows if row.rank <= top],
+            category_revenue={row.category: row.category_revenue
+                              for row
+                              in sorted(rows, key=lambda row: row.category)
+                              if row.category_rank == 1},
+        )
+
+    @classmethod
+    async def refresh(cls,
+                      session: AsyncSession,
+                      dates: Iterable[date],
+                      ) -> None:
+        """
+        Пересчет сводок за даты в текущей транзакции
+
+        Вызывается при загрузке продуктов перед commit, см.
+        :class:`config.dao.BaseDAO.upsert_multiple`. Сводка даты
+        пересчитывается целиком одним запросом :class:`aggregate`:
+        upsert заменяет старые значения продуктов, поэтому
+        приращение без их чтения было бы неточным.
+        """
+        table = cls.model.__table__
+        connection = await session.connection()
+        insert = DIALECT_INSERTS[connection.dialect.name]
+        for date in set(dates):
+            values = await cls.aggregate(session=session, date=date)
+            if values is None:
+                await session.execute(
+                    delete(cls.model).where(cls.model.date == date),
+                )
+                continue
+            stmt = insert(table).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=('date',),
+                set_={key: stmt.excluded[key]
+                      for key
+                      in values
+                      if key != 'date'},
+            )
+            await session.execute(stmt)
+
+    @classmethod
+    async def get_aggregate(cls,
+                            session: AsyncSession,
+                            date: date,
+                            top: int = 3,
+                            ) -> DailyAggregateSchema | None:
+        """
+        Агрегаты для запроса LLM из сводки за дату
+        """
+        summary = await cls.find_item_by_args(session=session, date=date)
+        if summary is None:
+            return None
+        return cls.to_aggregate(date=summary.date,
+                                revenue=summary.revenue,
+                                top_products=summary.top_products,
+                                category_revenue=summary.category_revenue,
+                                top=top)
+
+    @staticmethod
+    def to_aggregate(date: date,
+                     revenue: float | None,
+                     top_products: list[str],
+                     category_revenue: dict[str, float],
+                     top: int,
+                     ) -> DailyAggregateSchema:
+        """
+        Агрегаты для запроса LLM из значений сводки
+        """
+        return DailyAggregateSchema(
+            date=date,
+            revenue=revenue,
+            top_products=top_products[:top],
+            categories=sorted(category_revenue),
+        )
@@ -0,0 +1,15 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import date
+
+
+class DailySalesSummarySchema(BaseModel):
+    """
+    Схема сводки продаж за день
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    date: date
+    revenue: float
+    item_count: int
+    top_products: list[str]
+    category_revenue: dict[str, float]
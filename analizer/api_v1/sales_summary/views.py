@@ -0,0 +1,36 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import db_connection
+from .schemas import DailySalesSummarySchema
+from .dao import DailySalesSummaryDAO
+
+
+router = APIRouter(prefix='/summary',
+                   tags=['Summary'],
+                   )
+
+
+@router.get(path='/list')
+async def get_list_summary(
+    session: AsyncSession = Depends(db_connection.session_geter),
+) -> list[DailySalesSummarySchema]:
+    return await DailySalesSummaryDAO.find_all_items_by_args(
+        session=session,
+    )
+
+
+@router.get(path='/daily/{date}')
+async def get_daily_summary(
+    date: date,
+    session: AsyncSession = Depends(db_connection.session_geter),
+) -> DailySalesSummarySchema:
+    summary = await DailySalesSummaryDAO.find_item_by_args(
+        session=session,
+        date=date,
+    )
+    if summary is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f'Нет сводки за {date}')
+    return summary
@@ -51,6 +51,7 @@ async def app() -> AsyncGenerator[LifespanManager, Any]:
                   )
     register_routers(app=app)
     app.dependency_overrides[db_connection.session_geter] = override_get_async_session
+    app.dependency_overrides[db_connection.session_factory] = lambda: db_setup.session
 
     async with LifespanManager(app) as manager:
         yield manager.app
@@ -1,3 +1,4 @@
+import json
 import pytest
 from datetime import date
 from typing import Iterable
@@ -38,3 +39,111 @@ class TestProducts:
             date=date(2024, 1, 1),
         )
         assert isinstance(products, Iterable)
+
+    @pytest.mark.asyncio
+    async def test_copy_products(self, client, get_async_session):
+        values = (dict(date=date(2024, 1, 2),
+                       id=index,
+                       name=f'product {index}',
+                       quantity=index,
+                       price=100.5,
+                       category='Category')
+                  for index in range(1, 11))
+        count = await ProductDAO.copy_multiple(
+            session=get_async_session,
+            list_values=values,
+            batch_size=3,
+        )
+        assert count == 10
+        products = await ProductDAO.find_all_items_by_args(
+            session=get_async_session,
+            date=date(2024, 1, 2),
+        )
+        assert sorted(product.id for product in products) == list(range(1, 11))
+
+    @pytest.mark.asyncio
+    async def test_upsert_products(self, client, get_async_session):
+        values = [dict(date=date(2024, 1, 3),
+                       id=index % 5,
+                       name=f'product {index}',
+                       quantity=index,
+                       price=100.5,
+                       category='Category')
+                  for index in range(10)]
+        for _ in range(2):
+            count = await ProductDAO.upsert_multiple(
+                session=get_async_session,
+                list_values=values,
+                batch_size=4,
+            )
+        # Дубликаты убираются внутри пачки: 4 + 4 + 2 уникальных ключа
+        assert count == 10
+        products = await ProductDAO.find_all_items_by_args(
+            session=get_async_session,
+            date=date(2024, 1, 3),
+        )
+        assert sorted(product.name for product in products) == [
+            f'product {index}' for index in range(5, 10)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_page_products(self, client, get_async_session):
+        values = (dict(date=date(2024, 1, 4),
+                       id=index,
+                       name=f'product {index}',
+                       quantity=index,
+                       price=100.5,
+                       category='Category')
+                  for index in range(10))
+        await ProductDAO.copy_multiple(
+            session=get_async_session,
+            list_values=values,
+        )
+        names, cursor = [], None
+        while True:
+            items, cursor = await ProductDAO.find_page(
+                session=get_async_session,
+                cursor=cursor,
+                limit=3,
+                fields=('name',),
+                date=date(2024, 1, 4),
+            )
+            assert all(item.keys() == {'name'} for item in items)
+            names.extend(item['name'] for item in items)
+            if cursor is None:
+                break
+        assert names == [f'product {index}' for index in range(10)]
+
+    @pytest.mark.asyncio
+    async def test_view_page_products(self, client):
+        params = dict(date_from='2024-01-04',
+                      date_to='2024-01-04',
+                      limit=4,
+                      fields='id,name')
+        response = await client.get('/products/list', params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert [item['id'] for item in page['items']] == [0, 1, 2, 3]
+        assert page['items'][0].keys() == {'id', 'name'}
+        response = await client.get('/products/list',
+                                    params=params | dict(cursor=page['next_cursor']))
+        assert [item['id'] for item in response.json()['items']] == [4, 5, 6, 7]
+        response = await client.get('/products/list', params=dict(fields='bad'))
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_export_products(self, client):
+        params = dict(date_from='2024-01-04', date_to='2024-01-04')
+        response = await client.get('/products/export', params=params)
+        assert response.status_code == 200
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row['id'] for row in rows] == list(range(10))
+        response = await client.get('/products/export',
+                                    params=params | dict(format='csv',
+                                                         fields='id,name',
+                                                         gzip=True))
+        assert response.headers['content-encoding'] == 'gzip'
+        lines = response.text.splitlines()
+        assert lines[0] == 'id,name'
+        assert lines[1] == '0,product 0'
+        assert len(lines) == 11
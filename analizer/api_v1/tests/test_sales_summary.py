@@ -0,0 +1,96 @@
+import pytest
+from datetime import date
+
+from api_v1.products.dao import ProductDAO
+from api_v1.sales_summary.dao import DailySalesSummaryDAO
+from task_schedule.utils import ProductPromptMaker
+
+
+async def load_products(session, summary_date, values):
+    """
+    Загрузка продуктов с пересчетом сводки в той же транзакции
+    """
+    async def refresh(session):
+        await DailySalesSummaryDAO.refresh(session=session,
+                                           dates=(summary_date,))
+
+    await ProductDAO.upsert_multiple(
+        session=session,
+        list_values=values,
+        before_commit=refresh,
+    )
+
+
+class TestSalesSummary:
+    """
+    Тесты дневной сводки продаж
+    """
+
+    @pytest.mark.asyncio
+    async def test_refresh_summary(self, client, get_async_session):
+        summary_date = date(2024, 2, 1)
+        values = [dict(date=summary_date,
+                       id=index,
+                       name=f'product {index}',
+                       quantity=index,
+                       price=10.0,
+                       category=f'Category {index % 2}')
+                  for index in range(1, 5)]
+        for _ in range(2):
+            await load_products(session=get_async_session,
+                                summary_date=summary_date,
+                                values=values)
+        summary = await DailySalesSummaryDAO.find_item_by_args(
+            session=get_async_session,
+            date=summary_date,
+        )
+        assert summary.revenue == 100.0
+        assert summary.item_count == 4
+        assert summary.top_products[0] == 'product 4'
+        assert summary.category_revenue == {'Category 0': 60.0,
+                                            'Category 1': 40.0}
+
+    @pytest.mark.asyncio
+    async def test_summary_same_as_products(self, client, get_async_session):
+        summary_date = date(2024, 2, 3)
+        values = [dict(date=summary_date,
+                       id=index,
+                       name=f'product {9 - index}',
+                       quantity=5,
+                       price=10.0,
+                       category=f'Category {index % 3}')
+                  for index in range(6)]
+        await load_products(session=get_async_session,
+                            summary_date=summary_date,
+                            values=values)
+        summary = await DailySalesSummaryDAO.get_aggregate(
+            session=get_async_session,
+            date=summary_date,
+        )
+        aggregate = await ProductPromptMaker(
+            session=get_async_session,
+            date=summary_date,
+        ).get_daily_aggregate(session=get_async_session, date=summary_date)
+        assert summary == aggregate
+        assert aggregate.top_products == ['product 4',
+                                          'product 5',
+                                          'product 6']
+
+    @pytest.mark.asyncio
+    async def test_view_daily_summary(self, client, get_async_session):
+        summary_date = date(2024, 2, 2)
+        values = [dict(date=summary_date,
+                       id=index,
+                       name=f'product {index}',
+                       quantity=index,
+                       price=1.0,
+                       category='Category')
+                  for index in range(1, 4)]
+        await load_products(session=get_async_session,
+                            summary_date=summary_date,
+                            values=values)
+        response = await client.get('/summary/daily/2024-02-02')
+        assert response.status_code == 200
+        assert response.json()['item_count'] == 3
+        response = await client.get('/summary/daily/2000-01-01')
+        assert response.status_code == 404
@@ -33,6 +33,17 @@ config.set_main_option(
     settings.db.url,
 )
 
+# Таблицы в базе анализатора, которыми управляют другие сервисы:
+# кэш ответов сервиса LLM (`LLM.CACHE.POSTGRES_TABLE`)
+EXCLUDED_TABLES = frozenset({'llm_answer_cache'})
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """
+    Без таблиц из `EXCLUDED_TABLES` в `autogenerate`
+    """
+    return not (type_ == 'table' and name in EXCLUDED_TABLES)
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -50,6 +61,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -59,7 +71,9 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection,
+                      target_metadata=target_metadata,
+                      include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
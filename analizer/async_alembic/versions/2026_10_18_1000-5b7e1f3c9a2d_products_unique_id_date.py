@@ -0,0 +1,45 @@
+"""products unique id date
+
+Revision ID: 5b7e1f3c9a2d
+Revises: 2ce5c84d86c4
+Create Date: 2026-10-18 10:00:12.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e1f3c9a2d"
+down_revision: Union[str, None] = "2ce5c84d86c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Дубликаты (id, date) от повторных загрузок, остается последний
+    op.execute(
+        sa.text(
+            "DELETE FROM products AS old "
+            "USING products AS new "
+            "WHERE old.id = new.id "
+            "AND old.date = new.date "
+            "AND old.uid < new.uid"
+        )
+    )
+    op.create_unique_constraint(
+        "uq_products_id_date",
+        "products",
+        ["id", "date"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_products_id_date",
+        "products",
+        type_="unique",
+    )
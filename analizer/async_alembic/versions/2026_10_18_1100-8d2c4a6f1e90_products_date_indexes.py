@@ -0,0 +1,56 @@
+"""products date indexes
+
+Revision ID: 8d2c4a6f1e90
+Revises: 5b7e1f3c9a2d
+Create Date: 2026-10-18 11:00:41.902117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2c4a6f1e90"
+down_revision: Union[str, None] = "5b7e1f3c9a2d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY не блокирует запись в products, но не работает
+    # внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_date_quantity",
+            "products",
+            ["date", sa.text("quantity DESC")],
+            postgresql_include=["name", "price"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_products_date_category",
+            "products",
+            ["date", "category"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_products_date_category",
+            table_name="products",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_products_date_quantity",
+            table_name="products",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,59 @@
+"""add daily sales summary
+
+Revision ID: c41f7b2e6d58
+Revises: 8d2c4a6f1e90
+Create Date: 2026-10-18 12:00:07.551930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f7b2e6d58"
+down_revision: Union[str, None] = "8d2c4a6f1e90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_sales_summary",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("revenue", sa.Float(), nullable=False),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.Column("top_products", sa.JSON(), nullable=False),
+        sa.Column("category_revenue", sa.JSON(), nullable=False),
+        sa.Column("uid", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("uid"),
+        sa.UniqueConstraint("date"),
+    )
+    # Сводки за уже загруженные дни, порядок топа как
+    # в DailySalesSummaryDAO.top_order: при равном количестве по имени и id
+    op.execute(
+        sa.text(
+            "INSERT INTO daily_sales_summary "
+            "(date, revenue, item_count, top_products, category_revenue) "
+            "SELECT totals.date, totals.revenue, totals.item_count, "
+            "COALESCE((SELECT json_agg(top.name "
+            "ORDER BY top.quantity DESC, top.name, top.id) "
+            "FROM (SELECT id, name, quantity FROM products AS p "
+            "WHERE p.date = totals.date "
+            "ORDER BY quantity DESC, name, id LIMIT 10) AS top), "
+            "'[]'::json), "
+            "(SELECT json_object_agg(c.category, c.revenue) "
+            "FROM (SELECT category, sum(price * quantity) AS revenue "
+            "FROM products AS p WHERE p.date = totals.date "
+            "GROUP BY category) AS c) "
+            "FROM (SELECT date, sum(price * quantity) AS revenue, "
+            "count(*) AS item_count FROM products "
+            "GROUP BY date) AS totals"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_sales_summary")
@@ -0,0 +1,40 @@
+"""products date uid index
+
+Revision ID: e7a94d0b3f21
+Revises: c41f7b2e6d58
+Create Date: 2026-10-18 13:00:12.530871
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a94d0b3f21"
+down_revision: Union[str, None] = "c41f7b2e6d58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Индекс под курсор (date, uid) в /products/list
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_date_uid",
+            "products",
+            ["date", "uid"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_products_date_uid",
+            table_name="products",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,104 @@
+"""
+Сравнение движков XML парсеров на синтетическом фиде
+
+```bash
+python -m benchmarks.engines --rows 200000
+```
+"""
+
+import argparse
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from parsers import StringXMLParser, FileXMLParser, StreamXMLParser, FeedXMLParser
+from parsers.engines import (
+    etree_iterparse,
+    etree_pull_parser,
+    lxml_iterparse,
+    lxml_pull_parser,
+    LXML_AVAILABLE,
+    )
+from benchmarks.feeds import write_feed
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _stream_parser(engine: Callable) -> type[StreamXMLParser]:
+    return type('BenchStreamXMLParser', (StreamXMLParser,), dict(PARSER=engine))
+
+
+def _feed_parser(engine: Callable) -> type[FeedXMLParser]:
+    return type('BenchFeedXMLParser', (FeedXMLParser,), dict(PARSER=engine))
+
+
+def _read_chunks(path: Path) -> Iterable[bytes]:
+    with path.open(mode='rb') as file_:
+        while chunk := file_.read(CHUNK_SIZE):
+            yield chunk
+
+
+def get_cases(path: Path) -> dict[str, Callable[[], Iterable]]:
+    """
+    Случаи для замера: имя -> функция возвращающая генератор сущностей
+    """
+    options = dict(target_items='product', type_converter=None)
+    cases = {
+        'minidom parseString': lambda: StringXMLParser(
+            xml=path.read_text(encoding='utf-8'),
+            **options,
+        ).get_generator(),
+        'minidom parse': lambda: FileXMLParser(
+            xml=path,
+            **options,
+        ).get_generator(),
+        'etree iterparse': lambda: _stream_parser(etree_iterparse)(
+            xml=path,
+            **options,
+        ).get_generator(),
+        'etree XMLPullParser': lambda: _feed_parser(etree_pull_parser)(
+            xml=_read_chunks(path),
+            **options,
+        ).get_generator(),
+    }
+    if LXML_AVAILABLE:
+        cases.update({
+            'lxml iterparse': lambda: _stream_parser(lxml_iterparse)(
+                xml=path,
+                **options,
+            ).get_generator(),
+            'lxml XMLPullParser': lambda: _feed_parser(lxml_pull_parser)(
+                xml=_read_chunks(path),
+                **options,
+            ).get_generator(),
+        })
+    return cases
+
+
+def run(rows: int, repeat: int = 3, skip_dom: bool = False) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_feed(Path(tmp).joinpath('items.xml'), rows=rows)
+        size = path.stat().st_size / 2 ** 20
+        print(f'Фид: {rows} продуктов, {size:.1f} MB')
+        print(f'{"движок":<24}{"сек":>10}{"строк/сек":>14}')
+        for name, case in get_cases(path).items():
+            if skip_dom and name.startswith('minidom'):
+                continue
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                count = sum(1 for _ in case())
+                best = min(best, time.perf_counter() - start)
+            assert count == rows, f'{name}: {count} != {rows}'
+            print(f'{name:<24}{best:>10.3f}{rows / best:>14,.0f}')
+
+
+if __name__ == '__main__':
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--rows', type=int, default=100_000)
+    args.add_argument('--repeat', type=int, default=3)
+    args.add_argument('--skip-dom', action='store_true')
+    options = args.parse_args()
+    run(rows=options.rows, repeat=options.repeat, skip_dom=options.skip_dom)
@@ -0,0 +1,65 @@
+"""
+Генератор синтетических XML фидов по образцу `items.xml`
+"""
+
+import random
+from collections.abc import Generator
+from pathlib import Path
+
+
+CATEGORIES = ('Builds', 'Electronics', 'Machines', 'Tools', 'Clothes')
+
+
+def iter_feed(rows: int,
+              name_width: int = 16,
+              extra_fields: int = 0,
+              date: str = '2024-01-01',
+              seed: int = 0,
+              ) -> Generator[str, None, None]:
+    """
+    Детерминированный фид частями
+
+    Args:
+        rows (int): Количество продуктов.
+        name_width (int, optional): Длина поля `name`.
+        extra_fields (int, optional): Количество дополнительных \
+            текстовых полей шириной `name_width`.
+        date (str, optional): Атрибут `date` документа.
+        seed (int, optional): Зерно генератора.
+    """
+    rnd = random.Random(seed)
+    yield '<?xml version="1.0" encoding="utf-8"?>\n'
+    yield f'<sales_data date="{date}">\n    <products>\n'
+    for index in range(1, rows + 1):
+        name = f'Product {index}'.ljust(name_width, 'x')[:name_width]
+        extra = ''.join(
+            f'\n            <field_{field}>{name}</field_{field}>'
+            for field
+            in range(extra_fields)
+        )
+        yield (f'        <product>\n'
+               f'            <id>{index}</id>\n'
+               f'            <name>{name}</name>\n'
+               f'            <quantity>{rnd.randint(1, 1000)}</quantity>\n'
+               f'            <price>{rnd.randint(1, 100000)}.{rnd.randint(0, 99):02d}</price>\n'
+               f'            <category>{rnd.choice(CATEGORIES)}</category>'
+               f'{extra}\n'
+               f'        </product>\n')
+    yield '    </products>\n</sales_data>\n'
+
+
+def make_feed(rows: int, **options) -> str:
+    """
+    Фид одной строкой
+    """
+    return ''.join(iter_feed(rows=rows, **options))
+
+
+def write_feed(path: Path, rows: int, **options) -> Path:
+    """
+    Запись фида в файл частями, без сборки всей строки в памяти
+    """
+    path = Path(path)
+    with path.open(mode='w', encoding='utf-8') as file_:
+        file_.writelines(iter_feed(rows=rows, **options))
+    return path
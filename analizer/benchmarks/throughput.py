@@ -0,0 +1,237 @@
+"""
+Замер пропускной способности парсеров и конвертеров типов
+
+Каждый случай запускается в отдельном процессе на детерминированном
+фиде, в отчете строк/сек, прирост пикового RSS и пик аллокаций
+`tracemalloc`. Результаты можно сохранить и сравнить с прошлым
+запуском, при регрессии код выхода `1`.
+
+```bash
+python -m benchmarks.throughput --rows 1000 100000 1000000
+python -m benchmarks.throughput --rows 100000 --save baseline.json
+python -m benchmarks.throughput --rows 100000 --compare baseline.json
+```
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from parsers import StringXMLParser, FileXMLParser, StreamXMLParser
+from parsers.type_converters import DefaultTypeConverter, SchemaTypeConverter
+from benchmarks.feeds import write_feed
+
+
+TARGET_ITEMS = 'product'
+
+Case = Callable[[Path], Callable[[], Iterable]]
+
+
+def _raw_rows(path: Path) -> list[dict[str, str]]:
+    return StreamXMLParser(
+        xml=path,
+        target_items=TARGET_ITEMS,
+        type_converter=None,
+    ).get_list()
+
+
+def _string_parser(type_converter) -> Case:
+    def prepare(path: Path) -> Callable[[], Iterable]:
+        xml = path.read_text(encoding='utf-8')
+        return lambda: StringXMLParser(
+            xml=xml,
+            target_items=TARGET_ITEMS,
+            type_converter=type_converter,
+        ).get_generator()
+    return prepare
+
+
+def _file_parser(parser_cls: type[FileXMLParser], type_converter) -> Case:
+    def prepare(path: Path) -> Callable[[], Iterable]:
+        return lambda: parser_cls(
+            xml=path,
+            target_items=TARGET_ITEMS,
+            type_converter=type_converter,
+        ).get_generator()
+    return prepare
+
+
+def _default_converter(path: Path) -> Callable[[], Iterable]:
+    rows = _raw_rows(path=path)
+    return lambda: (DefaultTypeConverter(row).convert() for row in rows)
+
+
+def _schema_converter(path: Path) -> Callable[[], Iterable]:
+    rows = _raw_rows(path=path)
+    return lambda: SchemaTypeConverter().convert_many(rows=rows)
+
+
+CASES: dict[str, Case] = {
+    'StringXMLParser': _string_parser(None),
+    'StringXMLParser+Default': _string_parser(DefaultTypeConverter),
+    'FileXMLParser': _file_parser(FileXMLParser, None),
+    'FileXMLParser+Default': _file_parser(FileXMLParser, DefaultTypeConverter),
+    'StreamXMLParser+Default': _file_parser(StreamXMLParser,
+                                            DefaultTypeConverter),
+    'DefaultTypeConverter': _default_converter,
+    'SchemaTypeConverter': _schema_converter,
+}
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(case: str,
+            path: str,
+            rows: int,
+            repeat: int,
+            trace: bool,
+            ) -> dict[str, float]:
+    """
+    Замер одного случая, выполняется в отдельном процессе
+
+    RSS считается от пика процесса до подготовки данных,
+    аллокации - отдельным проходом под `tracemalloc`.
+    """
+    rss_start = _max_rss_mb()
+    runner = CASES[case](Path(path))
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in runner())
+        best = min(best, time.perf_counter() - start)
+    if count != rows:
+        raise AssertionError(f'{case}: {count} != {rows}')
+    result = dict(
+        seconds=best,
+        rows_per_sec=rows / best,
+        rss_mb=_max_rss_mb() - rss_start,
+    )
+    if trace:
+        tracemalloc.start()
+        sum(1 for _ in runner())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['alloc_peak_mb'] = peak / 2 ** 20
+    return result
+
+
+def _feed_path(directory: Path, rows: int, name_width: int, extra_fields: int) -> Path:
+    path = directory.joinpath(f'items_{rows}_{name_width}_{extra_fields}.xml')
+    if not path.exists():
+        write_feed(path, rows=rows, name_width=name_width, extra_fields=extra_fields)
+    return path
+
+
+def run(rows: Iterable[int],
+        cases: Iterable[str],
+        feeds_dir: Path,
+        name_width: int = 16,
+        extra_fields: int = 0,
+        repeat: int = 3,
+        trace: bool = True,
+        ) -> dict[str, dict[str, float]]:
+    """
+    Запуск замеров
+
+    Returns:
+        dict[str, dict[str, float]]: `"<случай>/<строк>"` -> метрики.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    print(f'{"случай":<26}{"строк":>10}{"строк/сек":>14}'
+          f'{"RSS MB":>10}{"alloc MB":>10}')
+    for count in rows:
+        path = _feed_path(feeds_dir, count, name_width, extra_fields)
+        for case in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(measure,
+                                     case,
+                                     str(path),
+                                     count,
+                                     repeat,
+                                     trace).result()
+            results[f'{case}/{count}'] = result
+            alloc = result.get('alloc_peak_mb')
+            alloc = '-' if alloc is None else f'{alloc:.1f}'
+            print(f'{case:<26}{count:>10}{result["rows_per_sec"]:>14,.0f}'
+                  f'{result["rss_mb"]:>10.1f}{alloc:>10}')
+    return results
+
+
+def compare(results: dict[str, dict[str, float]],
+            baseline: dict[str, dict[str, float]],
+            tolerance: float,
+            ) -> list[str]:
+    """
+    Регрессии относительно прошлого запуска
+
+    Регрессия - падение строк/сек или рост пикового RSS
+    больше чем на `tolerance`.
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        speed = result['rows_per_sec'] / base['rows_per_sec']
+        if speed < 1 - tolerance:
+            regressions.append(f'{key}: строк/сек {speed:.0%} от прошлого')
+        if result['rss_mb'] > max(base['rss_mb'], 1) * (1 + tolerance):
+            regressions.append(f'{key}: RSS {result["rss_mb"]:.1f} MB, '
+                               f'было {base["rss_mb"]:.1f} MB')
+    return regressions
+
+
+def main() -> int:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    args.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000])
+    args.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    args.add_argument('--name-width', type=int, default=16)
+    args.add_argument('--extra-fields', type=int, default=0)
+    args.add_argument('--repeat', type=int, default=3)
+    args.add_argument('--no-trace', action='store_true')
+    args.add_argument('--feeds-dir', type=Path, default=None,
+                      help='каталог для повторного использования фидов')
+    args.add_argument('--save', type=Path, default=None)
+    args.add_argument('--compare', type=Path, default=None)
+    args.add_argument('--tolerance', type=float, default=0.15)
+    options = args.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        feeds_dir = options.feeds_dir or Path(tmp)
+        feeds_dir.mkdir(parents=True, exist_ok=True)
+        results = run(
+            rows=options.rows,
+            cases=options.cases,
+            feeds_dir=feeds_dir,
+            name_width=options.name_width,
+            extra_fields=options.extra_fields,
+            repeat=options.repeat,
+            trace=not options.no_trace,
+        )
+    if options.save:
+        options.save.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    if options.compare:
+        baseline = json.loads(options.compare.read_text(encoding='utf-8'))
+        regressions = compare(
+            results=results,
+            baseline=baseline,
+            tolerance=options.tolerance,
+        )
+        for regression in regressions:
+            print(f'РЕГРЕССИЯ {regression}')
+        return int(bool(regressions))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,7 @@ from .config import settings
 from .celery.connection import app as celery_app
 from .database.db_helper import db_helper as db_connection
 from .database.db_helper import db_test as test_connection
+from .http_client.client_helper import http_helper as http_client
 from .models.base import Base as BaseModel
 
 
@@ -9,5 +10,6 @@ __all__ = ('settings',
            'celery_app',
            'db_connection',
            'test_connection',
+           'http_client',
            'BaseModel',
            )
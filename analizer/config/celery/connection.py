@@ -1,19 +1,133 @@
 import asyncio
+import os
+import threading
 import celery
-from typing import Any, Awaitable, Callable
+from celery.signals import worker_process_shutdown, worker_shutdown
+from typing import Any, Awaitable, Callable, Coroutine, TypeVar
 from functools import wraps
+from loguru import logger
 
 from config import settings
 
 
+T = TypeVar('T')
+
+
+class EventLoopThread:
+    """
+    Цикл событий в отдельном потоке процесса
+
+    Цикл запускается при первой задаче и живет до остановки
+    воркера, поэтому пулы соединений БД и HTTP переиспользуются
+    между задачами. После `fork` (prefork пул) в дочернем
+    процессе запускается свой цикл.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return (self._loop is not None
+                and self._pid == os.getpid()
+                and self._loop.is_running())
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Получение запущенного цикла событий
+        """
+        with self._lock:
+            if not self.is_running:
+                self._start()
+            return self._loop
+
+    def _start(self) -> None:
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(started.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run,
+                                        name='celery-event-loop',
+                                        daemon=True)
+        self._thread.start()
+        started.wait()
+        self._loop = loop
+        self._pid = os.getpid()
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """
+        Выполнение корутины в цикле и ожидание результата
+
+        Вызывается из потока задачи. Если ожидание прервано
+        (например `SoftTimeLimitExceeded`), корутина отменяется.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.get_loop())
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self, callbacks: list[Callable[[], Awaitable[Any]]]) -> None:
+        """
+        Выполнение `callbacks` в цикле и его остановка
+        """
+        with self._lock:
+            if not self.is_running:
+                return
+            loop = self._loop
+            for callback in callbacks:
+                future = asyncio.run_coroutine_threadsafe(callback(), loop)
+                try:
+                    future.result(timeout=settings.celery.SHUTDOWN_TIMEOUT)
+                except Exception as ex:
+                    logger.warning(f'Ошибка при остановке цикла: {ex!r}')
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join(timeout=settings.celery.SHUTDOWN_TIMEOUT)
+            loop.close()
+            self._loop = None
+            self._thread = None
+
+
 class Celery(celery.Celery):
     """
     Инициализация асинхронного Celery
+
+    Асинхронные задачи выполняются в общем цикле событий
+    :class:`EventLoopThread` процесса воркера. С пулом `threads`
+    несколько задач ввода-вывода выполняются одновременно
+    в одном процессе.
+
+    Корутины из :meth:`Celery.on_loop_shutdown` выполняются
+    при остановке воркера, например закрытие пулов соединений.
     """
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self.loop = asyncio.get_event_loop()
+        self.loop_thread = EventLoopThread()
+        self.shutdown_callbacks: list[Callable[[], Awaitable[Any]]] = []
+
+    def on_loop_shutdown(self,
+                         callback: Callable[[], Awaitable[Any]],
+                         ) -> Callable[[], Awaitable[Any]]:
+        """
+        Регистрация корутины для остановки цикла событий
+        """
+        self.shutdown_callbacks.append(callback)
+        return callback
+
+    def shutdown_loop(self, *args, **kwargs) -> None:
+        """
+        Остановка цикла событий процесса
+        """
+        self.loop_thread.stop(callbacks=self.shutdown_callbacks)
 
     def task(
         self,
@@ -25,12 +139,8 @@ class Celery(celery.Celery):
         def decorator(func: Callable[..., Awaitable]) -> Callable:
             @create_task(**opts)
             @wraps(func)
-            def wrapper(*args,
-                        loop: asyncio.AbstractEventLoop | None = None,
-                        **kwargs,
-                        ):
-                loop = loop or self.loop
-                return loop.run_until_complete(func(*args, **kwargs))
+            def wrapper(*args, **kwargs):
+                return self.loop_thread.run(func(*args, **kwargs))
             return wrapper
 
         if task:
@@ -42,4 +152,8 @@ app = Celery(__name__)
 app.conf.broker_url = settings.rabbit.broker_url
 app.conf.timezone = settings.celery.TIMEZONE
 app.conf.broker_connection_retry_on_startup = True
+app.conf.task_default_queue = settings.celery.QUEUE_ANALYTICS
+app.conf.worker_prefetch_multiplier = 1
 app.autodiscover_tasks(packages=['task_schedule'])
+worker_process_shutdown.connect(app.shutdown_loop, weak=False)
+worker_shutdown.connect(app.shutdown_loop, weak=False)
@@ -39,6 +39,30 @@ class CelerySettings(BaseModel):
                                          hour=2,
                                          )
     TEST_TIMEDELTA: crontab = crontab(minute='*/2')
+    QUEUE_FEEDS: str = 'feeds'
+    QUEUE_ANALYTICS: str = 'analytics'
+    QUEUE_LLM: str = 'llm'
+    LLM_MAX_RETRIES: int = 3
+    SHUTDOWN_TIMEOUT: float = 10.0
+
+
+class HTTPClientSettings(BaseModel):
+    """
+    Настройки HTTP клиента для XML и LLM сервисов
+    """
+    CONNECT_TIMEOUT: float = 5.0
+    READ_TIMEOUT: float = 60.0
+    WRITE_TIMEOUT: float = 30.0
+    POOL_TIMEOUT: float = 10.0
+    LLM_READ_TIMEOUT: float = 600.0
+    MAX_CONNECTIONS: int = 20
+    MAX_KEEPALIVE_CONNECTIONS: int = 10
+    KEEPALIVE_EXPIRY: float = 30.0
+    RETRY_ATTEMPTS: int = 6
+    RETRY_BACKOFF: float = 0.5
+    RETRY_BACKOFF_MAX: float = 30.0
+    RETRY_BUDGET: float = 300.0
+    RETRY_STATUSES: frozenset[int] = frozenset({502, 503, 504})
 
 
 class TestDBSettings(BaseModel):
@@ -95,12 +119,14 @@ class Settings(BaseSettings):
     rabbit: RabbitSettings = RabbitSettings()
     celery: CelerySettings = CelerySettings()
     alembic: AlembicSettings = AlembicSettings()
+    http: HTTPClientSettings = HTTPClientSettings()
     debug: bool = bool(int(config('DEBUG')))
     API_PREFIX: str = '/api/v1'
     regex: Regex = Regex()
     DATE_FORMAT: str = '%Y-%m-%d'
     BASE_DIR: Path = base_dir
     LOG_DIR: Path = log_dir
+    FEEDS_DIR: Path = base_dir.joinpath('feeds')
     CURRENT_ORIGIN: str = config('CURRENT_ORIGIN')
     XML_ORIGIN: str = config('XML_ORIGIN')
     NAME_END_POINT_XML: str = '/xml/get-list'
@@ -109,11 +135,22 @@ class Settings(BaseSettings):
                               NAME_END_POINT_XML)
     TARGET_ITEMS_XML: str = 'product'
     TARGET_ATTRS_XML: str = 'date'
+    INGEST_BATCH_SIZE: int = 5_000
+    INGEST_UPSERT: bool = True
+    SUMMARY_TOP_PRODUCTS: int = 10
+    PAGE_SIZE: int = 100
+    PAGE_SIZE_MAX: int = 1_000
+    EXPORT_YIELD_PER: int = 5_000
+    EXPORT_CHUNK_SIZE: int = 64 * 1024
     LLM_ORIGIN: str = config('LLM_ORIGIN')
     NAME_END_POINT_LLM: str = '/llm/analyst-manager'
     LLM_END_POINT_URL: str = (LLM_ORIGIN +
                               API_PREFIX +
                               NAME_END_POINT_LLM)
+    # Потоковый ответ не объединяется в пачки на стороне LLM,
+    # поэтому по умолчанию используется обычный запрос
+    LLM_STREAM: bool = False
+    LLM_STREAM_END_POINT_URL: str = LLM_END_POINT_URL + '/stream'
 
 
 settings = Settings()
@@ -1,4 +1,4 @@
-from .base_dao import BaseDAO
+from .base_dao import BaseDAO, Page
 
 
-__all__ = ('BaseDAO',)
+__all__ = ('BaseDAO', 'Page')
@@ -1,10 +1,44 @@
+import base64
+import json
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import Select
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Select,
+    Table,
+    column as table_column,
+    table as lightweight_table,
+    text,
+    tuple_,
+    )
 from sqlalchemy.orm import joinedload, selectinload
-from typing import ClassVar, Sequence
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from asyncpg import PostgresError
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Iterable,
+    )
+from typing import Any, ClassVar, NamedTuple, Sequence
 
-from config import BaseModel
+from config import BaseModel, settings
+
+
+BeforeCommit = Callable[[AsyncSession], Awaitable[None]]
+
+
+class Page(NamedTuple):
+    """
+    Страница выборки
+
+    `cursor` - курсор следующей страницы, `None` на последней.
+    """
+    items: list[dict[str, Any]]
+    cursor: str | None
 
 
 class BaseDAO:
@@ -22,8 +56,20 @@ class BaseDAO:
         :class:`BaseDAO.find_all_items_by_args` - множественный поиск
         по переданным аргументам.
 
+        :class:`BaseDAO.find_page` - постраничный поиск по курсору
+        :class:`BaseDAO.page_keys`.
+
+        :class:`BaseDAO.stream_items` - потоковая выборка сущностей
+        серверным курсором.
+
         :class:`BaseDAO.add` - Создание сущности.
 
+        :class:`BaseDAO.copy_multiple` - Массовое создание сущностей
+        через `COPY`.
+
+        :class:`BaseDAO.upsert_multiple` - Массовое создание или
+        обновление сущностей по ключу :class:`BaseDAO.upsert_keys`.
+
     Примеры::
 
         # Поиск сущности
@@ -37,6 +83,12 @@ class BaseDAO:
             one_to_many = (Model.tag,),
             name='model',
         )
+        # Страница сущностей и курсор следующей страницы
+        items, cursor = ModelDAO.find_page(
+            session=session,
+            limit=100,
+            fields=('name',),
+        )
         # Создание сущности
         item = ModelDAO.add(
             session,
@@ -45,6 +97,8 @@ class BaseDAO:
             )
     """
     model: ClassVar[BaseModel | None] = None
+    upsert_keys: ClassVar[tuple[str, ...]] = ()
+    page_keys: ClassVar[tuple[str, ...]] = ('uid',)
 
     @classmethod
     async def find_item_by_args(cls,
@@ -112,6 +166,116 @@ class BaseDAO:
         result = await session.scalars(statement=stmt)
         return list(result)
 
+    @classmethod
+    async def find_page(cls,
+                        session: AsyncSession,
+                        cursor: str | None = None,
+                        limit: int = settings.PAGE_SIZE,
+                        fields: Sequence[str] | None = None,
+                        filters: Sequence[ColumnElement[bool]] = (),
+                        **kwargs: dict[str, str | int],
+                        ) -> Page:
+        """
+        Постраничный поиск сущностей по курсору
+
+        Страницы упорядочены по :class:`BaseDAO.page_keys`, следующая
+        страница выбирается условием `(page_keys) > (курсор)` по
+        индексу, без `OFFSET`. Выбираются только колонки `fields`,
+        строки отдаются словарями без создания ORM объектов.
+
+        Args:
+            session (AsyncSession): Текущая сессия
+
+            cursor (str | None, optional): Курсор из прошлой страницы.
+
+            limit (int, optional): Размер страницы, не больше
+                `settings.PAGE_SIZE_MAX`.
+
+            fields (Sequence[str] | None, optional): Выбранные колонки.
+                По умолчанию все.
+
+            filters (Sequence[ColumnElement[bool]], optional): Условия
+                выборки, например `(Product.date >= date_from,)`.
+
+        Raises:
+            ValueError: Неизвестная колонка или неверный курсор
+
+        Returns:
+            Page: Сущности `колонка -> значение` и курсор \
+                следующей страницы
+        """
+        table = cls.model.__table__
+        keys = [table.c[key] for key in cls.page_keys]
+        columns = select_columns(table=table, fields=fields)
+        limit = max(1, min(limit, settings.PAGE_SIZE_MAX))
+        names = {column.name for column in columns}
+        stmt = (Select(*columns, *(key for key in keys if key.name not in names))
+                .filter_by(**kwargs)
+                .where(*filters)
+                .order_by(*keys)
+                .limit(limit + 1))
+        if cursor is not None:
+            values = decode_cursor(cursor=cursor, columns=keys)
+            stmt = stmt.where(tuple_(*keys) > tuple_(*values))
+        rows = (await session.execute(statement=stmt)).mappings().all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(
+                values=[rows[-1][key.name] for key in keys],
+            )
+        items = [{column.name: row[column.name] for column in columns}
+                 for row
+                 in rows]
+        return Page(items=items, cursor=next_cursor)
+
+    @classmethod
+    async def stream_items(cls,
+                           session: AsyncSession,
+                           fields: Sequence[str] | None = None,
+                           filters: Sequence[ColumnElement[bool]] = (),
+                           yield_per: int = settings.EXPORT_YIELD_PER,
+                           **kwargs: dict[str, str | int],
+                           ) -> AsyncGenerator[dict[str, Any], None]:
+        """
+        Потоковая выборка сущностей
+
+        Строки читаются серверным курсором пачками по `yield_per`
+        в порядке :class:`BaseDAO.page_keys`, поэтому память
+        не растет с размером выборки.
+
+        Args:
+            session (AsyncSession): Текущая сессия
+
+            fields (Sequence[str] | None, optional): Выбранные колонки.
+                По умолчанию все.
+
+            filters (Sequence[ColumnElement[bool]], optional): Условия
+                выборки.
+
+            yield_per (int, optional): Размер пачки курсора.
+                По умолчанию `settings.EXPORT_YIELD_PER`.
+
+        Raises:
+            ValueError: Неизвестная колонка
+
+        Yields:
+            dict[str, Any]: Сущность `колонка -> значение`
+        """
+        table = cls.model.__table__
+        columns = select_columns(table=table, fields=fields)
+        stmt = (Select(*columns)
+                .filter_by(**kwargs)
+                .where(*filters)
+                .order_by(*(table.c[key] for key in cls.page_keys))
+                .execution_options(yield_per=yield_per))
+        result = await session.stream(statement=stmt)
+        try:
+            async for row in result.mappings():
+                yield dict(row)
+        finally:
+            await result.close()
+
     @classmethod
     async def add(cls,
                   session: AsyncSession,
@@ -127,6 +291,296 @@ class BaseDAO:
                 raise ex
             return instance
 
+    @classmethod
+    async def copy_multiple(cls,
+                            session: AsyncSession,
+                            list_values: (Iterable[dict[str, Any]] |
+                                          AsyncIterable[dict[str, Any]]),
+                            batch_size: int = settings.INGEST_BATCH_SIZE,
+                            before_commit: BeforeCommit | None = None,
+                            ) -> int:
+        """
+        Массовое создание сущностей одной транзакцией
+
+        На PostgreSQL (asyncpg) пачки по `batch_size` сущностей
+        передаются через `COPY ... FROM STDIN`
+        (`copy_records_to_table`) минуя unit of work ORM.
+        На остальных движках пачки добавляются через ORM.
+        Весь поток в память не загружается.
+
+        Args:
+            session (AsyncSession): Текущая сессия
+
+            list_values (Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]]):
+                Поток сущностей `колонка -> значение`
+
+            batch_size (int, optional): Размер пачки.
+                По умолчанию `settings.INGEST_BATCH_SIZE`.
+
+            before_commit (BeforeCommit | None, optional):
+                Запись связанных данных в той же транзакции перед commit.
+
+        Returns:
+            int: Количество созданных сущностей
+        """
+        table = cls.model.__table__
+        columns = tuple(column.name
+                        for column
+                        in table.columns
+                        if not column.primary_key)
+        count = 0
+        async with session.begin():
+            connection = await session.connection()
+            driver = None
+            if connection.dialect.driver == 'asyncpg':
+                raw_connection = await connection.get_raw_connection()
+                driver = raw_connection.driver_connection
+            try:
+                async for batch in iter_batches(iterable=list_values,
+                                                size=batch_size):
+                    if driver is None:
+                        session.add_all(cls.model(**value) for value in batch)
+                        await session.flush()
+                    else:
+                        await driver.copy_records_to_table(
+                            table_name=table.name,
+                            schema_name=table.schema,
+                            columns=columns,
+                            records=[tuple(value.get(column)
+                                           for column
+                                           in columns)
+                                     for value
+                                     in batch],
+                        )
+                    count += len(batch)
+                if before_commit is not None:
+                    await before_commit(session)
+                await session.commit()
+            except (SQLAlchemyError, PostgresError) as ex:
+                await session.rollback()
+                raise ex
+        return count
+
+    @classmethod
+    async def upsert_multiple(cls,
+                              session: AsyncSession,
+                              list_values: (Iterable[dict[str, Any]] |
+                                            AsyncIterable[dict[str, Any]]),
+                              batch_size: int = settings.INGEST_BATCH_SIZE,
+                              before_commit: BeforeCommit | None = None,
+                              ) -> int:
+        """
+        Массовое создание или обновление сущностей одной транзакцией
+
+        Пачки по `batch_size` сущностей записываются через
+        `INSERT ... ON CONFLICT (upsert_keys) DO UPDATE`, поэтому
+        повторная загрузка тех же данных не создает дубликатов.
+        Внутри пачки остается последняя сущность с тем же ключом.
+
+        На PostgreSQL (asyncpg) пачка передается через `COPY`
+        во временную таблицу транзакции и записывается одним
+        `INSERT ... SELECT ... ON CONFLICT`. На SQLite - через
+        `executemany`.
+
+        Args:
+            session (AsyncSession): Текущая сессия
+
+            list_values (Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]]):
+                Поток сущностей `колонка -> значение`
+
+            batch_size (int, optional): Размер пачки.
+                По умолчанию `settings.INGEST_BATCH_SIZE`.
+
+            before_commit (BeforeCommit | None, optional):
+                Запись связанных данных в той же транзакции перед commit.
+
+        Raises:
+            ValueError: Не указан `upsert_keys` или движок БД \
+                не поддерживает `ON CONFLICT`
+
+        Returns:
+            int: Количество записанных строк: сумма уникальных ключей \
+                каждой пачки. Ключ, повторенный в разных пачках, \
+                записывается и считается в каждой из них.
+        """
+        keys = cls.upsert_keys
+        if not keys:
+            raise ValueError(f'Не указан upsert_keys для {cls.__name__}')
+        table = cls.model.__table__
+        columns = tuple(column.name
+                        for column
+                        in table.columns
+                        if not column.primary_key)
+        count = 0
+        async with session.begin():
+            connection = await session.connection()
+            dialect = connection.dialect.name
+            insert = DIALECT_INSERTS.get(dialect)
+            if insert is None:
+                raise ValueError(f'{cls.__name__}.upsert_multiple: движок '
+                                 f'{dialect} не поддерживает ON CONFLICT, '
+                                 'используйте copy_multiple')
+            driver = None
+            if connection.dialect.driver == 'asyncpg':
+                raw_connection = await connection.get_raw_connection()
+                driver = raw_connection.driver_connection
+                staging = await cls._create_staging_table(
+                    session=session,
+                    table=table,
+                    columns=columns,
+                )
+                stmt = insert(table).from_select(
+                    names=columns,
+                    select=Select(*staging.c),
+                )
+            else:
+                stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=keys,
+                set_={name: stmt.excluded[name]
+                      for name
+                      in columns
+                      if name not in keys},
+            )
+            try:
+                async for batch in iter_batches(iterable=list_values,
+                                                size=batch_size):
+                    unique_batch = list({
+                        tuple(value[key] for key in keys): value
+                        for value
+                        in batch
+                    }.values())
+                    if driver is None:
+                        await session.execute(stmt, unique_batch)
+                    else:
+                        await driver.copy_records_to_table(
+                            table_name=staging.name,
+                            columns=columns,
+                            records=[tuple(value.get(name)
+                                           for name
+                                           in columns)
+                                     for value
+                                     in unique_batch],
+                        )
+                        await session.execute(stmt)
+                        await session.execute(
+                            text(f'TRUNCATE {staging.name}'),
+                        )
+                    count += len(unique_batch)
+                if before_commit is not None:
+                    await before_commit(session)
+                await session.commit()
+            except (SQLAlchemyError, PostgresError) as ex:
+                await session.rollback()
+                raise ex
+        return count
+
+    @classmethod
+    async def _create_staging_table(cls,
+                                    session: AsyncSession,
+                                    table: Table,
+                                    columns: Sequence[str],
+                                    ) -> Table:
+        """
+        Временная таблица для `COPY` пачки, удаляется при commit
+
+        Колонки и типы как у `table`, без ограничений и индексов.
+        """
+        name = f'{table.name}_staging'
+        preparer = (await session.connection()).dialect.identifier_preparer
+        await session.execute(text(
+            f'CREATE TEMP TABLE {preparer.quote(name)} ON COMMIT DROP AS '
+            f'SELECT {", ".join(map(preparer.quote, columns))} '
+            f'FROM {preparer.format_table(table)} WITH NO DATA'
+        ))
+        return lightweight_table(name,
+                                 *(table_column(column) for column in columns))
+
+
+DIALECT_INSERTS = {
+    'postgresql': postgresql_insert,
+    'sqlite': sqlite_insert,
+}
+
+
+async def iter_batches(iterable: Iterable[Any] | AsyncIterable[Any],
+                       size: int,
+                       ) -> AsyncGenerator[list[Any], None]:
+    """
+    Разбиение синхронного или асинхронного потока на пачки
+
+    Args:
+        iterable (Iterable[Any] | AsyncIterable[Any]): Поток сущностей.
+        size (int): Максимальный размер пачки.
+    """
+    batch = []
+    if isinstance(iterable, AsyncIterable):
+        async for item in iterable:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    else:
+        for item in iterable:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def select_columns(table: Table,
+                   fields: Sequence[str] | None = None,
+                   ) -> list[Column]:
+    """
+    Колонки таблицы для выборки по именам
+
+    Raises:
+        ValueError: Неизвестная колонка
+    """
+    if not fields:
+        return list(table.columns)
+    unknown = [field for field in fields if field not in table.c]
+    if unknown:
+        raise ValueError(f'Неизвестные поля: {", ".join(unknown)}')
+    return [table.c[field] for field in dict.fromkeys(fields)]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Курсор страницы из значений ключей последней сущности
+    """
+    data = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: Sequence[Column]) -> list[Any]:
+    """
+    Значения ключей из курсора с типами колонок `columns`
+
+    Raises:
+        ValueError: Неверный курсор
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, UnicodeError):
+        raise ValueError('Неверный курсор')
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Неверный курсор')
+    result = []
+    for value, column in zip(values, columns):
+        python_type = column.type.python_type
+        try:
+            if hasattr(python_type, 'fromisoformat'):
+                value = python_type.fromisoformat(value)
+            else:
+                value = python_type(value)
+        except (TypeError, ValueError):
+            raise ValueError('Неверный курсор')
+        result.append(value)
+    return result
+
 
 def struct_options_statment(model: BaseModel,
                             one_to_many: Sequence[BaseModel] | None = None,
@@ -28,6 +28,7 @@ class DataBaseHelper:
     ## Методы:
         :function:`DataBaseHelper.session_geter` - Получение генератора текущей сессии.
         :function:`DataBaseHelper.get_scoped_session` - Получение текущей сессии.
+        :function:`DataBaseHelper.session_factory` - Получение фабрики сессий.
         :function:`DataBaseHelper.dispose` - Закрытые соединения.
 
     ## Примеры:
@@ -94,6 +95,15 @@ class DataBaseHelper:
         )
         return session
 
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """
+        Получение фабрики сессий
+
+        Для потоковых ответов, сессия которых должна жить
+        до конца отправки ответа.
+        """
+        return self.session
+
     async def session_geter(self) -> AsyncGenerator[AsyncSession, Any]:
         """
         Получение генератора сессии
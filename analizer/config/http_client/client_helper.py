@@ -0,0 +1,245 @@
+import asyncio
+import json
+import random
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
+from time import monotonic
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from config import settings
+from config.config import HTTPClientSettings
+
+
+HTTP2 = find_spec('h2') is not None
+
+
+class RetryBudgetError(httpx.TransportError):
+    """
+    Исчерпаны попытки или время на повтор запроса
+    """
+
+
+class ServerEventError(Exception):
+    """
+    Событие `error` в потоке server-sent events
+    """
+
+
+async def aiter_sse(response: httpx.Response,
+                    ) -> AsyncGenerator[tuple[str, Any], None]:
+    """
+    События server-sent events из потокового ответа
+
+    Yields:
+        tuple[str, Any]: Имя события (по умолчанию `message`) \
+            и данные из JSON
+    """
+    event, data = 'message', []
+    async for line in response.aiter_lines():
+        if not line:
+            if data:
+                yield event, json.loads('\n'.join(data))
+            event, data = 'message', []
+        elif line.startswith('event:'):
+            event = line[6:].strip()
+        elif line.startswith('data:'):
+            data.append(line[5:].strip())
+    if data:
+        yield event, json.loads('\n'.join(data))
+
+
+class HTTPClientHelper:
+    """
+    Вспомогательный класс для запросов к внешним сервисам.
+
+    Держит один :class:`httpx.AsyncClient` на цикл событий
+    с пулом соединений и keep-alive, HTTP/2 включается если
+    установлен `h2`. Таймауты заданы явно, ошибки соединения
+    и ответы `RETRY_STATUSES` повторяются с экспоненциальной
+    задержкой и разбросом в пределах `RETRY_ATTEMPTS` попыток
+    и `RETRY_BUDGET` секунд.
+
+    ## Методы:
+        :function:`HTTPClientHelper.get_client` - Получение клиента.
+        :function:`HTTPClientHelper.request` - Запрос с повтором.
+        :function:`HTTPClientHelper.stream` - Потоковый запрос с повтором.
+        :function:`HTTPClientHelper.aclose` - Закрытие соединений.
+
+    ## Примеры:
+    ```python
+    from config import http_client
+
+
+    response = await http_client.request(
+        method='PUT',
+        url=settings.LLM_END_POINT_URL,
+        json=prompt,
+    )
+    async with http_client.stream(method='GET',
+                                  url=settings.XML_END_POINT_URL,
+                                  ) as response:
+        async for chunk in response.aiter_bytes():
+            ...
+    ```
+    """
+    def __init__(self,
+                 config: HTTPClientSettings = settings.http,
+                 transport: httpx.AsyncBaseTransport | None = None,
+                 ) -> None:
+        """
+        Args:
+            config (HTTPClientSettings, optional): Настройки клиента.
+            Defaults to settings.http.
+
+            transport (httpx.AsyncBaseTransport | None, optional): Транспорт
+            клиента, по умолчанию пул соединений httpx.
+        """
+        self.config = config
+        self.transport = transport
+        self.timeout = httpx.Timeout(
+            connect=config.CONNECT_TIMEOUT,
+            read=config.READ_TIMEOUT,
+            write=config.WRITE_TIMEOUT,
+            pool=config.POOL_TIMEOUT,
+        )
+        self.limits = httpx.Limits(
+            max_connections=config.MAX_CONNECTIONS,
+            max_keepalive_connections=config.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.KEEPALIVE_EXPIRY,
+        )
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        Получение клиента текущего цикла событий
+
+        Соединения пула привязаны к циклу событий, поэтому
+        при смене цикла создается новый клиент.
+        """
+        loop = asyncio.get_running_loop()
+        if (self._client is None
+                or self._client.is_closed
+                or self._loop is not loop):
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=HTTP2,
+                transport=self.transport,
+            )
+            self._loop = loop
+        return self._client
+
+    def _get_delay(self,
+                   attempt: int,
+                   response: httpx.Response | None = None,
+                   ) -> float:
+        """
+        Задержка перед следующей попыткой
+
+        Полный разброс `[0, RETRY_BACKOFF * 2 ** attempt]`,
+        не больше `RETRY_BACKOFF_MAX`. Заголовок `Retry-After`
+        ответа имеет приоритет.
+        """
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return min(float(retry_after), self.config.RETRY_BACKOFF_MAX)
+        cap = min(self.config.RETRY_BACKOFF_MAX,
+                  self.config.RETRY_BACKOFF * 2 ** attempt)
+        return random.uniform(0, cap)
+
+    async def _backoff(self,
+                       attempt: int,
+                       deadline: float,
+                       url: str,
+                       reason: str,
+                       response: httpx.Response | None = None,
+                       ) -> None:
+        """
+        Ожидание перед повтором или ошибка если бюджет исчерпан
+        """
+        delay = self._get_delay(attempt=attempt, response=response)
+        if (attempt + 1 >= self.config.RETRY_ATTEMPTS
+                or monotonic() + delay > deadline):
+            raise RetryBudgetError(f'{url}: попытки исчерпаны, {reason}')
+        logger.warning(f'{url}: {reason}, повтор через {delay:.1f} сек')
+        await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(self,
+                     method: str,
+                     url: str,
+                     **kwargs: Any,
+                     ) -> AsyncIterator[httpx.Response]:
+        """
+        Потоковый запрос с повтором
+
+        Повторяется только получение ответа, ошибки во время
+        чтения тела передаются вызывающему коду.
+
+        Raises:
+            RetryBudgetError: Попытки или время исчерпаны
+            httpx.HTTPStatusError: Ответ с кодом ошибки
+        """
+        client = self.get_client()
+        deadline = monotonic() + self.config.RETRY_BUDGET
+        attempt = 0
+        while 1:
+            request = client.build_request(method=method, url=url, **kwargs)
+            try:
+                response = await client.send(request=request, stream=True)
+            except httpx.TransportError as ex:
+                await self._backoff(attempt=attempt,
+                                    deadline=deadline,
+                                    url=url,
+                                    reason=repr(ex))
+                attempt += 1
+                continue
+            if response.status_code in self.config.RETRY_STATUSES:
+                await response.aclose()
+                await self._backoff(attempt=attempt,
+                                    deadline=deadline,
+                                    url=url,
+                                    reason=f'статус {response.status_code}',
+                                    response=response)
+                attempt += 1
+                continue
+            try:
+                response.raise_for_status()
+                yield response
+            finally:
+                await response.aclose()
+            return
+
+    async def request(self,
+                      method: str,
+                      url: str,
+                      **kwargs: Any,
+                      ) -> httpx.Response:
+        """
+        Запрос с повтором и прочитанным телом ответа
+
+        Raises:
+            RetryBudgetError: Попытки или время исчерпаны
+            httpx.HTTPStatusError: Ответ с кодом ошибки
+        """
+        async with self.stream(method=method, url=url, **kwargs) as response:
+            await response.aread()
+        return response
+
+    async def aclose(self) -> None:
+        """
+        Закрытие соединений
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+http_helper = HTTPClientHelper()
@@ -1,9 +1,11 @@
 from .base import Base
 from .products import Product
 from .llm_answers import LLMAnswer
+from .daily_sales_summary import DailySalesSummary
 
 
 __all__ = ('Base',
            'Product',
            'LLMAnswer',
+           'DailySalesSummary',
            )
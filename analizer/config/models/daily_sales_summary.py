@@ -0,0 +1,21 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import JSON
+import datetime
+
+from config.models import Base
+
+
+class DailySalesSummary(Base):
+    """
+    Модель сводки продаж за день
+
+    Заполняется при загрузке продуктов в той же транзакции,
+    чтение сводки за день не требует агрегации `products`.
+    """
+    __tablename__ = 'daily_sales_summary'
+
+    date: Mapped[datetime.date] = mapped_column(unique=True)
+    revenue: Mapped[float]
+    item_count: Mapped[int]
+    top_products: Mapped[list[str]] = mapped_column(JSON())
+    category_revenue: Mapped[dict[str, float]] = mapped_column(JSON())
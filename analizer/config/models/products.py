@@ -1,3 +1,4 @@
+from sqlalchemy import Index, UniqueConstraint
 from sqlalchemy.orm import Mapped
 from datetime import date
 
@@ -7,10 +8,40 @@ from config.models import Base
 class Product(Base):
     """
     Модель продукта
+
+    Естественный ключ продукта - `(id, date)`, повторная загрузка
+    фида за тот же день обновляет продукты, а не дублирует их.
+
+    Аналитика идет по одной дате, индексы начинаются с `date`:
+    `(date, quantity DESC)` с `name`, `price` для лучших продуктов
+    и выручки, `(date, category)` для категорий, `(date, uid)`
+    для постраничного вывода.
     """
+    __table_args__ = (
+        UniqueConstraint('id', 'date', name='uq_products_id_date'),
+    )
+
     id: Mapped[int]
     date: Mapped[date]
     name: Mapped[str]
     quantity: Mapped[int]
     price: Mapped[float]
     category: Mapped[str]
+
+
+Index(
+    'ix_products_date_quantity',
+    Product.date,
+    Product.quantity.desc(),
+    postgresql_include=['name', 'price'],
+)
+Index(
+    'ix_products_date_category',
+    Product.date,
+    Product.category,
+)
+Index(
+    'ix_products_date_uid',
+    Product.date,
+    Product.uid,
+)
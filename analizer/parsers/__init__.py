@@ -1,6 +1,15 @@
-from .xml_parser import StringXMLParser, FileXMLParser
+from .xml_parser import (
+    StringXMLParser,
+    FileXMLParser,
+    StreamXMLParser,
+    FeedXMLParser,
+    ShardedXMLParser,
+    )
 
 
 __all__ = ('StringXMLParser',
            'FileXMLParser',
+           'StreamXMLParser',
+           'FeedXMLParser',
+           'ShardedXMLParser',
            )
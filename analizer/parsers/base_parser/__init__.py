@@ -1,4 +1,7 @@
 from .base_xml import BaseXMLParser
+from .base_stream import BaseStreamXMLParser
 
 
-__all__ = ('BaseXMLParser',)
+__all__ = ('BaseXMLParser',
+           'BaseStreamXMLParser',
+           )
@@ -1,5 +1,5 @@
 from io import TextIOWrapper
-from collections.abc import Sequence
+from collections.abc import Sequence, MutableSequence
 from abc import ABC, abstractmethod
 from typing import ClassVar, Generator, Callable
 from xml.dom.minidom import Document
@@ -28,3 +28,9 @@ class AbstractXMLParser(ABC, Sequence):
     @abstractmethod
     def get_generator(self) -> Generator[dict[str, str], None, None] | None:
         pass
+
+    @abstractmethod
+    def get_columns(self,
+                    batch_size: int,
+                    ) -> Generator[dict[str, MutableSequence], None, None]:
+        pass
@@ -0,0 +1,65 @@
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+
+from parsers.base_parser.exeptions import XMLParseError
+
+
+def parse_attr_path(attr: str) -> tuple[tuple[str, ...] | None, str]:
+    """
+    Разбор пути атрибута
+
+    Пример::
+        parse_attr_path('date')
+        # (None, 'date') - атрибут любого элемента
+        parse_attr_path('sales_data/@date')
+        # (('sales_data',), 'date')
+        parse_attr_path('/sales_data/*/@count')
+        # (('sales_data', '*'), 'count')
+    """
+    *tags, name = attr.strip('/').split('/')
+    if tags and not name.startswith('@'):
+        raise XMLParseError(f'Ошибка: путь атрибута {attr} '
+                            'должен оканчиваться на @имя')
+    name = name.removeprefix('@')
+    if not name or not all(tags):
+        raise XMLParseError(f'Ошибка: не верный путь атрибута {attr}')
+    return (tuple(tags) or None, name)
+
+
+class AttrsSelector:
+    """
+    Выборка атрибутов документа за один проход.
+
+    Атрибуты собираются с элементов, открытых до первой целевой
+    сущности. Путь задается по типу `sales_data/@date`, `*` совпадает
+    с любым тегом, имя без пути совпадает с атрибутом любого элемента.
+    Результат хранится под именем атрибута, более глубокий элемент
+    перезаписывает значение.
+    """
+
+    def __init__(self, attrs: Sequence[str]) -> None:
+        self._paths = tuple(parse_attr_path(attr) for attr in attrs)
+        self.result: dict[str, str] = defaultdict(str)
+        for _, name in self._paths:
+            self.result[name]
+
+    def _match_path(self,
+                    tags: tuple[str, ...],
+                    path: tuple[str, ...],
+                    ) -> bool:
+        if len(tags) != len(path):
+            return False
+        return all(tag in ('*', node) for tag, node in zip(tags, path))
+
+    def match(self,
+              path: tuple[str, ...],
+              attributes: Mapping[str, str],
+              ) -> None:
+        """
+        Проверка элемента по пути от корня документа
+        """
+        for tags, name in self._paths:
+            if name not in attributes:
+                continue
+            if tags is None or self._match_path(tags=tags, path=path):
+                self.result[name] = attributes[name]
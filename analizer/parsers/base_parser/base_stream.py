@@ -0,0 +1,187 @@
+from collections.abc import Sequence, Generator, Iterable, Iterator, Callable
+from io import IOBase
+from typing import ClassVar
+from xml.etree.ElementTree import Element, ParseError, fromstring
+
+from parsers.base_parser.base_xml import BaseXMLParser
+from parsers.base_parser.exeptions import XMLParseError
+from parsers.base_parser.parse_except import parse_etree_error
+from parsers.base_converter import BaseTypeConverter
+from parsers.engines import PARSE_ERRORS
+
+
+class BaseStreamXMLParser(BaseXMLParser):
+    """
+    Базовый потоковый XML парсер
+
+    В отличие от :class:`BaseXMLParser` не строит DOM всего
+    документа. Каждая целевая сущность отдается сразу после
+    закрывающего тега, а ее поддерево удаляется из памяти.
+
+    ### Для определения своего класса парсера нужно указать:
+
+    - Движок парсера :class:`BaseStreamXMLParser.PARSER` \
+        по типу :func:`xml.etree.ElementTree.iterparse`, \
+        смотрите :mod:`parsers.engines`
+    - Переопределить :class:`BaseXMLParser._check_xml_instance`
+
+    Для примера смотрите :class:`parsers.StreamXMLParser`
+    """
+
+    EVENTS: ClassVar[tuple[str, ...]] = ('start', 'end')
+
+    def _reset_stream(self) -> None:
+        """
+        Сброс состояния потока
+        """
+        self._stack: list[Element] = []
+        self._depth = 0
+        self._reset_attrs()
+
+    def _element_to_dict(self, element: Element) -> dict[str, str]:
+        return {child.tag: child.text
+                for child
+                in element
+                if child.text is not None and isinstance(child.tag, str)}
+
+    def _read_fragment(self,
+                       fragment: str | bytes,
+                       wrapped: bool,
+                       ) -> dict[str, str]:
+        """
+        Разбор фрагмента с одной сущностью без DOM
+
+        Имена с префиксами пространств имен как при потоковом
+        проходе: `{uri}name`.
+        """
+        try:
+            element = fromstring(fragment)
+        except ParseError as ex:
+            raise XMLParseError(parse_etree_error(ex=ex))
+        if wrapped:
+            element = element[0]
+        return self._element_to_dict(element=element)
+
+    def _handle_event(self,
+                      event: str,
+                      element: Element,
+                      target_items: str,
+                      type_converter: BaseTypeConverter | None,
+                      ) -> dict[str, str] | None:
+        """
+        Обработка одного события парсера
+
+        Возвращает сущность без конвертации типов на закрывающем
+        теге `target_items`, обработанные поддеревья удаляются
+        из родителя. Внутри сущности ведется только счетчик
+        глубины, вложенные `target_items` не выделяются.
+        """
+        if self._depth:
+            if event == 'start':
+                self._depth += 1
+                return None
+            self._depth -= 1
+            if self._depth:
+                return None
+            item = self._element_to_dict(element=element)
+            if self._stack:
+                self._stack[-1].remove(element)
+            return item
+        if event == 'start':
+            if element.tag == target_items:
+                if not self._attrs_ready:
+                    self._finish_attrs(type_converter=type_converter)
+                self._depth = 1
+                return None
+            if not self._attrs_ready:
+                path = tuple(node.tag for node in self._stack)
+                self._collect_attrs(
+                    path=path + (element.tag,),
+                    attributes=element.attrib,
+                )
+            self._stack.append(element)
+            return None
+        self._stack.pop()
+        if self._stack:
+            self._stack[-1].remove(element)
+        return None
+
+    def _get_events(self,
+                    xml: str | IOBase,
+                    parser: Callable[..., Iterable[tuple[str, Element]]],
+                    ) -> Generator[tuple[str, Element], None, None]:
+        try:
+            yield from parser(xml, events=self.EVENTS)
+        except PARSE_ERRORS as ex:
+            msg = parse_etree_error(ex=ex)
+            raise XMLParseError(msg)
+
+    def _stuct_stream_items(self,
+                            events: Iterator[tuple[str, Element]],
+                            target_items: str,
+                            type_converter: BaseTypeConverter | None,
+                            ) -> Generator[dict[str, str], None, None]:
+        """
+        Вывод потока items
+        """
+        items = self._stuct_stream_raw_items(
+            events=events,
+            target_items=target_items,
+            type_converter=type_converter,
+        )
+        return self._convert_items(
+            items=items,
+            type_converter=type_converter,
+        )
+
+    def _stuct_stream_raw_items(self,
+                                events: Iterator[tuple[str, Element]],
+                                target_items: str,
+                                type_converter: BaseTypeConverter | None,
+                                ) -> Generator[dict[str, str], None, None]:
+        for event, element in events:
+            item = self._handle_event(
+                event=event,
+                element=element,
+                target_items=target_items,
+                type_converter=type_converter,
+            )
+            if item is not None:
+                yield item
+
+    def _parse(self,
+               xml: str | IOBase,
+               target_items: str,
+               attrs: Sequence[str] | None,
+               type_converter: BaseTypeConverter | None,
+               ) -> Generator[dict[str, str], None, None] | list[None]:
+        """
+        Метод потокового парсинга данных из XML
+
+        Документ читается до первой целевой сущности, чтобы
+        атрибуты были доступны сразу после инициализации.
+        """
+        parser = self.get_parser()
+        xml = self._get_source(xml=xml)
+        self._reset_stream()
+        events = self._get_events(
+            xml=xml,
+            parser=parser,
+        )
+        for event, element in events:
+            self._handle_event(
+                event=event,
+                element=element,
+                target_items=target_items,
+                type_converter=type_converter,
+            )
+            if self._attrs_ready:
+                break
+        else:
+            self._finish_attrs(type_converter=type_converter)
+            return []
+        return self._stuct_stream_items(
+            events=events,
+            target_items=target_items,
+            type_converter=type_converter,
+        )
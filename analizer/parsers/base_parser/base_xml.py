@@ -1,12 +1,22 @@
 import os
+from array import array
+from mmap import mmap
 import reprlib
 import operator
 from copy import deepcopy
-from io import TextIOWrapper
-from collections.abc import Sequence, Generator, Callable
-from collections import defaultdict
+from io import IOBase, TextIOWrapper
+from collections.abc import (
+    Iterator,
+    Sequence,
+    MutableSequence,
+    Generator,
+    Callable,
+    Iterable,
+    Mapping,
+    )
+from itertools import islice
 from xml.dom.minicompat import NodeList
-from xml.dom.minidom import Document, Element
+from xml.dom.minidom import Document, Element, parseString
 from xml.parsers.expat import ExpatError
 
 from parsers.base_parser.abc import AbstractXMLParser
@@ -15,8 +25,15 @@ from parsers.base_parser.exeptions import (
     XMLParseError,
     )
 from parsers.base_parser.parse_except import parse_expat_error
+from parsers.base_parser.columns import to_columns
+from parsers.base_parser.attrs import AttrsSelector
+from parsers.base_parser.buffers import (
+    item_offsets,
+    namespace_declarations,
+    xml_declaration,
+    )
 from parsers.base_converter import BaseTypeConverter
-from parsers.type_converters import DefaultTypeConverter
+from parsers.type_converters import DefaultTypeConverter, SchemaTypeConverter
 
 
 class BaseXMLParser(AbstractXMLParser):
@@ -41,7 +58,9 @@ class BaseXMLParser(AbstractXMLParser):
                  xml: str | TextIOWrapper,
                  target_items: str,
                  attrs: Sequence[str] | None = None,
-                 type_converter: BaseTypeConverter | None = DefaultTypeConverter,
+                 type_converter: (type[BaseTypeConverter] |
+                                  SchemaTypeConverter |
+                                  None) = DefaultTypeConverter,
                  convert_int: bool = True,
                  convert_float: bool = True,
                  convert_date: bool = True,
@@ -52,8 +71,11 @@ class BaseXMLParser(AbstractXMLParser):
             target_items (str): Имя сущности в XML как целевой объект.
             attrs (Sequence[str] | None, optional): Именованые атрибуты в \
                 XML, получить можно с помощью атрибута `attrs`.
-            type_converter (BaseTypeConverter | None, optional): Конвертер \
-                типов. По умолчанию :class:`parsers.type_converters.DefaultTypeConverter`.
+            type_converter (type[BaseTypeConverter] | SchemaTypeConverter | None, \
+                optional): Конвертер типов. По умолчанию \
+                :class:`parsers.type_converters.DefaultTypeConverter`. \
+                Экземпляр :class:`parsers.type_converters.SchemaTypeConverter` \
+                компилируется один раз на документ.
             convert_int (bool, optional): Конвертация числовых типов. \
                 По умолчания `True`.
             convert_float (bool, optional): Конвертация чисел с плавайщей \
@@ -66,16 +88,25 @@ class BaseXMLParser(AbstractXMLParser):
         self.target_items = target_items
         self.values = tuple(attrs) if attrs else attrs
         self._attrs: dict[str, str] | None = None
-        self._type_converter = type_converter
         self.convert_int = bool(convert_int)
         self.convert_float = bool(convert_float)
         self.convert_date = bool(convert_date)
-        self.items = self._parse(
-            xml=xml,
-            target_items=target_items,
-            attrs=attrs,
-            type_converter=type_converter,
+        if isinstance(type_converter, SchemaTypeConverter):
+            type_converter = type_converter.bind(
+                parse_int=self.convert_int,
+                parse_float=self.convert_float,
+                parse_date=self.convert_date,
             )
+        self._type_converter = type_converter
+        self._items = None
+        self._passes = 0
+        self._length: int | None = None
+        self._offsets: array | None = None
+        self._ends: array | None = None
+        self._namespaces: str | bytes = ''
+        self._reset_attrs()
+        if not self._is_lazy(xml=self.xml):
+            self._prepare_items()
 
     @classmethod
     def get_parser(cls):
@@ -89,12 +120,181 @@ class BaseXMLParser(AbstractXMLParser):
                 )
         return parser
 
-    def __getitem__(self, index):
+    def __getitem__(self, index: int) -> dict[str, str]:
+        """
+        Сущность по индексу
+
+        Для источников с доступом по смещению (строка, путь, \
+        `mmap`) при первом обращении строится индекс смещений \
+        сущностей, разбирается только нужная сущность. \
+        Иначе документ читается до нужной сущности.
+        """
         index = operator.index(index)
-        return self.items[index]
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError('Индекс вне диапазона')
+        offsets = self._get_offsets()
+        if offsets is None:
+            item = next(islice(self._iter_items(), index, None), None)
+            if item is None:
+                raise IndexError('Индекс вне диапазона')
+            return item
+        if index >= len(offsets):
+            raise IndexError('Индекс вне диапазона')
+        self._prepare_converter(offsets=offsets)
+        return self._convert_item(
+            item=self._read_offset(index=index),
+            type_converter=self._type_converter,
+        )
 
     def __len__(self) -> int:
-        return
+        """
+        Количество сущностей
+
+        Берется из первого полного прохода, иначе из индекса \
+        смещений или из отдельного прохода по документу.
+        """
+        if self._length is None:
+            offsets = self._get_offsets()
+            if offsets is not None:
+                self._length = len(offsets)
+            else:
+                for _ in self._iter_items():
+                    pass
+        return self._length
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        return self._iter_items()
+
+    def _is_lazy(self, xml: str | TextIOWrapper | os.PathLike) -> bool:
+        """
+        Ленивый парсинг источника
+
+        Файловые объекты разбираются при инициализации, так как
+        могут быть закрыты до обращения к сущностям.
+        """
+        return not self._is_IO(xml) or isinstance(xml, mmap)
+
+    def _prepare_items(self) -> None:
+        """
+        Подготовка следующего прохода по документу
+        """
+        if self._passes:
+            self._rewind(xml=self.xml)
+        self._items = self._parse(
+            xml=self.xml,
+            target_items=self.target_items,
+            attrs=self.values,
+            type_converter=self._type_converter,
+        )
+
+    def _rewind(self, xml: str | TextIOWrapper | os.PathLike) -> None:
+        """
+        Возврат файлового объекта в начало перед повторным проходом
+        """
+        if not self._is_IO(xml) or isinstance(xml, mmap):
+            return
+        if xml.closed or not xml.seekable():
+            raise XMLParseError(f'Ошибка: повторный проход по {xml} '
+                                'невозможен, файл закрыт или не '
+                                'поддерживает seek')
+        xml.seek(0)
+
+    def _iter_items(self) -> Generator[dict[str, str], None, None]:
+        """
+        Один проход по сущностям документа
+
+        После полного прохода количество сущностей кэшируется.
+        """
+        if self._items is None:
+            self._prepare_items()
+        items, self._items = self._items, None
+        self._passes += 1
+        count = 0
+        for count, item in enumerate(items, 1):
+            yield item
+        self._length = count
+
+    def _get_buffer(self) -> str | bytes | mmap | None:
+        """
+        Документ с доступом по смещению для индекса сущностей
+
+        По умолчанию `None` - индекс не строится.
+        """
+        return None
+
+    def _get_offsets(self) -> array | None:
+        """
+        Кэшированный индекс смещений сущностей
+        """
+        if self._offsets is None:
+            buffer = self._get_buffer()
+            if buffer is None:
+                return None
+            self._offsets, self._ends = item_offsets(
+                buffer=buffer,
+                target_items=self.target_items,
+            )
+            if self._offsets:
+                self._namespaces = namespace_declarations(
+                    buffer=buffer,
+                    end=self._offsets[0],
+                )
+        return self._offsets
+
+    def _read_offset(self, index: int) -> dict[str, str]:
+        """
+        Разбор одной сущности по индексу смещений без конвертации типов
+
+        Если в заголовке документа объявлены пространства имен,
+        сущность разбирается внутри элемента с этими объявлениями.
+        """
+        buffer = self._get_buffer()
+        fragment = buffer[self._offsets[index]:self._ends[index]]
+        namespaces = self._namespaces
+        if namespaces:
+            if isinstance(buffer, str):
+                fragment = f'<root{namespaces}>{fragment}</root>'
+            else:
+                fragment = b'<root' + namespaces + b'>' + fragment + b'</root>'
+        if not isinstance(buffer, str):
+            fragment = xml_declaration(buffer) + fragment
+        return self._read_fragment(fragment=fragment,
+                                   wrapped=bool(namespaces))
+
+    def _read_fragment(self,
+                       fragment: str | bytes,
+                       wrapped: bool,
+                       ) -> dict[str, str]:
+        """
+        Разбор фрагмента с одной сущностью
+
+        `wrapped` - сущность внутри элемента с объявлениями
+        пространств имен.
+        """
+        document = self._get_document(xml=fragment, parser=parseString)
+        element = document.documentElement
+        if wrapped:
+            element = next(node
+                           for node
+                           in element.childNodes
+                           if node.nodeType == node.ELEMENT_NODE)
+        item, = self._stuct_list_items(list_elements=(element,))
+        return item
+
+    def _prepare_converter(self, offsets: array) -> None:
+        """
+        Вывод типов :class:`SchemaTypeConverter` по первым сущностям
+        """
+        type_converter = self._type_converter
+        if (isinstance(type_converter, SchemaTypeConverter)
+                and not type_converter.inferred):
+            type_converter.infer(rows=[
+                self._read_offset(index=index)
+                for index
+                in range(min(len(offsets), type_converter.infer_rows))
+            ])
 
     def _check_xml_instance(self, xml: str | TextIOWrapper) -> None:
         """
@@ -113,11 +313,20 @@ class BaseXMLParser(AbstractXMLParser):
         return isinstance(xml, os.PathLike)
 
     def _is_IO(self, xml: str | TextIOWrapper | os.PathLike) -> bool:
-        return isinstance(xml, TextIOWrapper)
+        return isinstance(xml, IOBase | mmap)
+
+    def _get_source(self,
+                    xml: str | TextIOWrapper | os.PathLike,
+                    ) -> str | IOBase:
+        """
+        Источник данных для движка парсера
+        """
+        if self._is_path_like(xml):
+            return str(xml)
+        return xml
 
     def _stuct_list_items(self,
-                          list_elements: NodeList[Element],
-                          type_converter: BaseTypeConverter | None,
+                          list_elements: Iterable[Element],
                           ) -> Generator[dict[str, str], None, None]:
         """
         Вывод списка items
@@ -127,44 +336,100 @@ class BaseXMLParser(AbstractXMLParser):
             for item in element.childNodes:
                 if item.firstChild:
                     parsed_dict[item.nodeName] = item.firstChild.nodeValue
-            if type_converter:
-                converter = type_converter(
-                    parsed_dict,
-                    self.convert_int,
-                    self.convert_float,
-                    self.convert_date,
-                )
-                yield converter.convert()
-            else:
-                yield parsed_dict
+            yield parsed_dict
+
+    def _convert_items(self,
+                       items: Iterable[dict[str, str]],
+                       type_converter: (type[BaseTypeConverter] |
+                                        SchemaTypeConverter |
+                                        None),
+                       ) -> Generator[dict[str, str], None, None]:
+        """
+        Конвертация типов потока сущностей
+        """
+        if isinstance(type_converter, SchemaTypeConverter):
+            yield from type_converter.convert_many(rows=items)
+            return
+        for item in items:
+            yield self._convert_item(
+                item=item,
+                type_converter=type_converter,
+            )
+
+    def _convert_item(self,
+                      item: dict[str, str],
+                      type_converter: (type[BaseTypeConverter] |
+                                       SchemaTypeConverter |
+                                       None),
+                      ) -> dict[str, str]:
+        """
+        Конвертация типов одной сущности
+        """
+        if not type_converter:
+            return item
+        if isinstance(type_converter, SchemaTypeConverter):
+            return type_converter.convert(row=item)
+        converter = type_converter(
+            item,
+            self.convert_int,
+            self.convert_float,
+            self.convert_date,
+        )
+        return converter.convert()
+
+    def _reset_attrs(self) -> None:
+        """
+        Сброс состояния выборки атрибутов
+        """
+        self._attrs_ready = False
+        self._attrs_selector = AttrsSelector(attrs=self.values or ())
+
+    def _collect_attrs(self,
+                       path: tuple[str, ...],
+                       attributes: Mapping[str, str],
+                       ) -> None:
+        if self.values:
+            self._attrs_selector.match(path=path, attributes=attributes)
+
+    def _finish_attrs(self,
+                      type_converter: BaseTypeConverter | None,
+                      ) -> None:
+        """
+        Фиксация атрибутов документа до первой целевой сущности
+        """
+        self._attrs_ready = True
+        if self.values:
+            self._attrs = self._convert_item(
+                item=self._attrs_selector.result,
+                type_converter=type_converter,
+            )
 
     def _get_attrs(self,
                    document: Document,
-                   attrs: Sequence[str],
-                   type_converter: DefaultTypeConverter | None,
+                   target_items: str,
+                   type_converter: BaseTypeConverter | None,
                    ) -> None:
-        result = defaultdict(str)
-        for attr in attrs:
-            result[attr]
-            curr_nodes = document.childNodes
-            while curr_nodes:
-                for node in curr_nodes:
-                    if attr in node.attributes:
-                        result.update({attr: node.attributes.get(attr).nodeValue})
-                curr_nodes = [node
-                              for node
-                              in curr_nodes[0].childNodes
-                              if node.firstChild]
-        if type_converter:
-            converter = type_converter(
-                result,
-                self.convert_int,
-                self.convert_float,
-                self.convert_date,
+        """
+        Выборка атрибутов за один проход до первой целевой сущности
+
+        Обходит только элементы открытые до первой сущности,
+        все запрошенные атрибуты проверяются за один проход.
+        """
+        stack = [(document.documentElement, ())]
+        while stack:
+            node, path = stack.pop()
+            if node.tagName == target_items:
+                break
+            path = path + (node.tagName,)
+            self._collect_attrs(
+                path=path,
+                attributes=dict(node.attributes.items()),
             )
-            self._attrs = converter.convert()
-        else:
-            self._attrs = result
+            stack.extend((child, path)
+                         for child
+                         in reversed(node.childNodes)
+                         if child.nodeType == child.ELEMENT_NODE)
+        self._finish_attrs(type_converter=type_converter)
 
     def _get_items_target(self,
                           document: Document,
@@ -194,16 +459,16 @@ class BaseXMLParser(AbstractXMLParser):
         Метод парсинга данных из XML
         """
         parser = self.get_parser()
-        if self._is_path_like(xml):
-            xml = str(xml)
+        xml = self._get_source(xml=xml)
         document = self._get_document(
             xml=xml,
             parser=parser,
         )
+        self._reset_attrs()
         if attrs:
             self._get_attrs(
                 document=document,
-                attrs=attrs,
+                target_items=target_items,
                 type_converter=type_converter,
             )
         list_elements = self._get_items_target(
@@ -213,27 +478,59 @@ class BaseXMLParser(AbstractXMLParser):
         if list_elements:
             list_parse_items = self._stuct_list_items(
                 list_elements=list_elements,
+            )
+            return self._convert_items(
+                items=list_parse_items,
                 type_converter=type_converter,
             )
-            return list_parse_items
         return []
 
+    @property
+    def items(self) -> Generator[dict[str, str], None, None]:
+        """
+        Новый проход по сущностям документа
+        """
+        return self._iter_items()
+
     @property
     def attrs(self) -> dict[str, str]:
+        if not self._passes and self._items is None:
+            self._prepare_items()
         return self._attrs
 
     def get_list(self) -> list[dict[str, str] | None]:
         """
         Возвращает список после парсинга
         """
-        return list(self.items)
+        return list(self._iter_items())
 
-    def get_generator(self) -> (Generator[dict[str, str], None, None] |
-                                list[None]):
+    def get_generator(self) -> Generator[dict[str, str], None, None]:
         """
         Возвращает генератор после парсинга
+
+        Каждый вызов - новый проход по документу, \
+        документ разбирается при первом обращении.
+        """
+        return self._iter_items()
+
+    def get_columns(self,
+                    batch_size: int = 10_000,
+                    use_numpy: bool | None = None,
+                    ) -> Generator[dict[str, MutableSequence], None, None]:
+        """
+        Возвращает генератор пачек в колоночном виде
+
+        Числовые колонки отдаются как :class:`array.array` или \
+        `numpy.ndarray`, даты как `datetime64[D]` при `numpy`.
+
+        Args:
+            batch_size (int, optional): Размер пачки. По умолчанию `10_000`.
+            use_numpy (bool | None, optional): Колонки `numpy.ndarray`. \
+                По умолчанию - если `numpy` установлен.
         """
-        return self.items
+        items = iter(self.get_generator())
+        while batch := list(islice(items, batch_size)):
+            yield to_columns(rows=batch, use_numpy=use_numpy)
 
     def _custom_repr(self) -> reprlib.Repr:
         CustomRepr = deepcopy(reprlib.aRepr)
@@ -0,0 +1,278 @@
+import mmap
+import re
+from array import array
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from io import RawIOBase, SEEK_SET, SEEK_CUR, SEEK_END
+from os import PathLike
+
+from parsers.base_parser.exeptions import XMLParseError
+
+
+Buffer = bytes | bytearray | memoryview | mmap.mmap
+
+TAG_ENDS = frozenset(b'> \t\r\n/')
+
+RELEASE_SIZE = 8 * 1024 * 1024
+
+# Комментарии, CDATA и инструкции обработки пропускаются целиком,
+# теги внутри них не являются сущностями документа
+SKIPPED_SPANS = r'<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>'
+
+NAMESPACE_DECLARATION = r'\sxmlns(?::[\w.-]+)?\s*=\s*(?:"[^"]*"|\'[^\']*\')'
+
+
+def map_file(path: str | PathLike) -> mmap.mmap:
+    """
+    Отображение файла в память только для чтения
+
+    Страницы файла подгружаются ОС по мере чтения и могут быть
+    выгружены, поэтому память процесса не растет с размером файла.
+    Отображение закрывается вызовом `close` или сборщиком мусора.
+    """
+    with open(path, mode='rb') as file_:
+        try:
+            return mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise XMLParseError('Ошибка: файл пустой')
+
+
+@contextmanager
+def open_mapped(path: str | PathLike) -> Iterator[mmap.mmap]:
+    """
+    Контекстный менеджер для :func:`map_file`
+    """
+    mapped = map_file(path)
+    try:
+        yield mapped
+    finally:
+        mapped.close()
+
+
+def find_item_start(buffer: Buffer,
+                    target_items: str,
+                    start: int = 0,
+                    end: int | None = None,
+                    ) -> int:
+    """
+    Позиция открывающего тега `target_items` начиная со `start`
+
+    Теги с тем же префиксом (`<products>` для `product`)
+    пропускаются. Возвращает `-1` если тег не найден.
+    """
+    tag = b'<' + target_items.encode()
+    end = len(buffer) if end is None else end
+    position = buffer.find(tag, start, end)
+    while position != -1:
+        next_char = position + len(tag)
+        if next_char < len(buffer) and buffer[next_char] in TAG_ENDS:
+            return position
+        position = buffer.find(tag, next_char, end)
+    return -1
+
+
+def _compile(pattern: str, buffer: str | Buffer) -> re.Pattern:
+    if not isinstance(buffer, str):
+        pattern = pattern.encode()
+    return re.compile(pattern, flags=re.DOTALL)
+
+
+def item_offsets(buffer: str | Buffer,
+                 target_items: str,
+                 ) -> tuple[array, array]:
+    """
+    Границы сущностей `target_items` за один проход
+
+    Теги внутри комментариев, CDATA и инструкций обработки
+    не учитываются. Для строки смещения в символах, для байтов -
+    в байтах.
+
+    Returns:
+        tuple[array, array]: Начала открывающих и концы закрывающих \
+            тегов сущностей в порядке документа.
+    """
+    tag = re.escape(target_items)
+    regex = _compile(
+        pattern=(f'{SKIPPED_SPANS}'
+                 f'|(?P<open><{tag}(?:\\s[^>]*?)?(?P<empty>/)?>)'
+                 f'|(?P<close></{tag}\\s*>)'),
+        buffer=buffer,
+    )
+    spans = []
+    opened = []
+    for match in regex.finditer(buffer):
+        if match.start('open') != -1:
+            if match.start('empty') != -1:
+                spans.append((match.start(), match.end()))
+            else:
+                opened.append(match.start())
+        elif match.start('close') != -1 and opened:
+            spans.append((opened.pop(), match.end()))
+    if opened:
+        raise XMLParseError('Ошибка: не найден закрывающий тег '
+                            f'сущности {target_items}')
+    spans.sort()
+    return (array('q', (start for start, _ in spans)),
+            array('q', (end for _, end in spans)))
+
+
+def namespace_declarations(buffer: str | Buffer,
+                           end: int,
+                           ) -> str | bytes:
+    """
+    Объявления `xmlns` в заголовке документа до смещения `end`
+
+    Нужны для разбора отдельной сущности, если в ней
+    используются префиксы, объявленные в корне документа.
+    """
+    regex = _compile(pattern=NAMESPACE_DECLARATION, buffer=buffer)
+    separator = '' if isinstance(buffer, str) else b''
+    return separator.join(match.group()
+                          for match
+                          in regex.finditer(buffer, 0, end))
+
+
+def split_ranges(buffer: Buffer,
+                 target_items: str,
+                 shard_size: int,
+                 ) -> tuple[int, list[tuple[int, int]]]:
+    """
+    Разбиение буфера на диапазоны по границам `target_items`
+
+    Каждый диапазон начинается с открывающего тега сущности
+    и заканчивается перед следующим диапазоном, последний -
+    после последнего закрывающего тега.
+
+    Returns:
+        tuple[int, list[tuple[int, int]]]: Конец заголовка документа \
+            (начало первой сущности) и диапазоны `(start, end)`.
+    """
+    first = find_item_start(buffer=buffer, target_items=target_items)
+    if first == -1:
+        return len(buffer), []
+    close_tag = f'</{target_items}>'.encode()
+    last = buffer.rfind(close_tag, first)
+    if last == -1:
+        raise XMLParseError('Ошибка: не найден закрывающий тег '
+                            f'{close_tag.decode()}')
+    last += len(close_tag)
+    ranges = []
+    start = first
+    while start < last:
+        end = find_item_start(
+            buffer=buffer,
+            target_items=target_items,
+            start=min(start + shard_size, last),
+            end=last,
+        )
+        if end == -1:
+            end = last
+        ranges.append((start, end))
+        start = end
+    return first, ranges
+
+
+def xml_declaration(buffer: Buffer) -> bytes:
+    """
+    Заголовок `<?xml ... ?>` документа, если он есть
+    """
+    if not buffer[:5] == b'<?xml':
+        return b''
+    end = buffer.find(b'?>', 0, 1024)
+    if end == -1:
+        return b''
+    return bytes(buffer[:end + 2])
+
+
+class BufferReader(RawIOBase):
+    """
+    Файловый объект для чтения диапазона буфера без копирования
+
+    Диапазон `buffer[start:end]` читается через `memoryview`,
+    `prefix` и `suffix` добавляются до и после него. Подходит
+    как источник для потоковых парсеров.
+
+    Прочитанные страницы :class:`mmap.mmap` отпускаются каждые
+    `RELEASE_SIZE` байт, поэтому память процесса ограничена
+    при последовательном чтении файла любого размера.
+    """
+
+    def __init__(self,
+                 buffer: Buffer,
+                 start: int = 0,
+                 end: int | None = None,
+                 prefix: bytes = b'',
+                 suffix: bytes = b'',
+                 ) -> None:
+        self._parts = (memoryview(prefix),
+                       memoryview(buffer)[start:end],
+                       memoryview(suffix),
+                       )
+        self._size = sum(map(len, self._parts))
+        self._position = 0
+        self._mapped = buffer if isinstance(buffer, mmap.mmap) else None
+        self._start = start
+        self._released = start - start % mmap.PAGESIZE
+        if self._mapped is not None:
+            self._mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        if whence == SEEK_CUR:
+            offset += self._position
+        elif whence == SEEK_END:
+            offset += self._size
+        self._position = max(0, min(offset, self._size))
+        return self._position
+
+    def _iter_parts(self) -> Generator[memoryview, None, None]:
+        offset = self._position
+        for part in self._parts:
+            if offset < len(part):
+                yield part[offset:]
+                offset = 0
+            else:
+                offset -= len(part)
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:
+        target = memoryview(buffer).cast('B')
+        size = 0
+        for part in self._iter_parts():
+            chunk = part[:len(target) - size]
+            target[size:size + len(chunk)] = chunk
+            size += len(chunk)
+            if size == len(target):
+                break
+        self._position += size
+        if self._mapped is not None:
+            self._release_pages()
+        return size
+
+    def _release_pages(self) -> None:
+        """
+        Освобождение прочитанных страниц отображения
+        """
+        offset = min(self._position - len(self._parts[0]),
+                     len(self._parts[1]))
+        offset += self._start
+        offset -= offset % mmap.PAGESIZE
+        if offset - self._released >= RELEASE_SIZE:
+            self._mapped.madvise(mmap.MADV_DONTNEED,
+                                 self._released,
+                                 offset - self._released)
+            self._released = offset
+
+    def close(self) -> None:
+        if not self.closed:
+            for part in self._parts:
+                part.release()
+            self._mapped = None
+        super().close()
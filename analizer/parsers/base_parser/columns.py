@@ -0,0 +1,76 @@
+from array import array
+from collections.abc import Iterable, Mapping, MutableSequence
+from datetime import date
+from typing import Any
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _to_column(values: list[Any],
+               use_numpy: bool,
+               ) -> MutableSequence[Any]:
+    """
+    Типизированная колонка по типам значений
+
+    Колонки `int` и `float` отдаются как :class:`array.array`
+    или `numpy.ndarray`, колонки `date` как `datetime64[D]`.
+    Смешанные типы и пропуски остаются списком.
+    """
+    kinds = set(map(type, values))
+    try:
+        if kinds == {int}:
+            if use_numpy:
+                return numpy.array(values, dtype=numpy.int64)
+            return array('q', values)
+        if kinds == {float} or kinds == {int, float}:
+            if use_numpy:
+                return numpy.array(values, dtype=numpy.float64)
+            return array('d', values)
+    except OverflowError:
+        return values
+    if kinds == {date} and use_numpy:
+        return numpy.array(values, dtype='datetime64[D]')
+    return values
+
+
+def to_columns(rows: Iterable[Mapping[str, Any]],
+               use_numpy: bool | None = None,
+               ) -> dict[str, MutableSequence[Any]]:
+    """
+    Перевод пачки сущностей в колонки
+
+    Args:
+        rows (Iterable[Mapping[str, Any]]): Сущности пачки.
+        use_numpy (bool | None, optional): Колонки `numpy.ndarray`. \
+            По умолчанию `None` - если `numpy` установлен.
+
+    Returns:
+        dict[str, MutableSequence[Any]]: Словарь `колонка -> значения`, \
+            отсутствующие в сущности значения равны `None`.
+
+    Пример::
+        columns = to_columns([dict(id=1, price=3.5), dict(id=2)])
+        # {'id': array('q', [1, 2]), 'price': [3.5, None]}
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ImportError('Для колонок numpy.ndarray установите numpy')
+    columns: dict[str, list[Any]] = {}
+    count = 0
+    for row in rows:
+        for column, value in row.items():
+            values = columns.get(column)
+            if values is None:
+                values = columns[column] = [None] * count
+            values.append(value)
+        count += 1
+        for values in columns.values():
+            if len(values) < count:
+                values.append(None)
+    return {column: _to_column(values=values, use_numpy=use_numpy)
+            for column, values
+            in columns.items()}
@@ -1,4 +1,5 @@
 from xml.parsers.expat import ExpatError
+from xml.etree.ElementTree import ParseError
 
 
 def parse_expat_error(ex: ExpatError) -> str:
@@ -10,3 +11,13 @@ def parse_expat_error(ex: ExpatError) -> str:
     column = ex.offset
     msg = f'Код проблемы {code}: На линии {line} в колонке {column} ошибка'
     return msg
+
+
+def parse_etree_error(ex: ParseError) -> str:
+    """
+    Парсинг сообщения об ошибке ParseError
+    """
+    code = ex.code
+    line, column = ex.position
+    msg = f'Код проблемы {code}: На линии {line} в колонке {column} ошибка'
+    return msg
@@ -0,0 +1,97 @@
+"""
+Движки потоковых XML парсеров.
+
+Если установлен `lxml` (libxml2), по умолчанию используются его
+`iterparse` и `XMLPullParser` с `huge_tree`, иначе движки
+:mod:`xml.etree.ElementTree`. Движок задается через `PARSER`:
+
+```python
+from parsers import StreamXMLParser
+from parsers.engines import etree_iterparse
+
+
+class EtreeStreamXMLParser(StreamXMLParser):
+    PARSER = etree_iterparse
+```
+"""
+
+from collections.abc import Iterable, Sequence
+from io import IOBase, TextIOBase
+from xml.etree.ElementTree import (
+    Element,
+    ParseError,
+    XMLPullParser,
+    iterparse as etree_iterparse,
+    )
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+
+__all__ = ('etree_iterparse',
+           'etree_pull_parser',
+           'lxml_iterparse',
+           'lxml_pull_parser',
+           'ITERPARSE',
+           'PULL_PARSER',
+           'PARSE_ERRORS',
+           'LXML_AVAILABLE',
+           )
+
+
+LXML_AVAILABLE = lxml_etree is not None
+
+
+def etree_pull_parser(events: Sequence[str]) -> XMLPullParser:
+    """
+    Push парсер :class:`xml.etree.ElementTree.XMLPullParser`
+    """
+    return XMLPullParser(events=events)
+
+
+def lxml_iterparse(source: str | IOBase,
+                   events: Sequence[str],
+                   ) -> Iterable[tuple[str, Element]]:
+    """
+    Потоковый парсер `lxml.etree.iterparse` с `huge_tree`
+
+    `lxml` читает только байты, текстовые файлы читаются через
+    их буфер, остальные текстовые потоки через движок
+    :func:`xml.etree.ElementTree.iterparse`.
+    """
+    if isinstance(source, TextIOBase):
+        buffer = getattr(source, 'buffer', None)
+        if buffer is None:
+            return etree_iterparse(source, events=events)
+        source = buffer
+    return lxml_etree.iterparse(
+        source,
+        events=events,
+        huge_tree=True,
+        resolve_entities=False,
+        no_network=True,
+    )
+
+
+def lxml_pull_parser(events: Sequence[str]) -> 'lxml_etree.XMLPullParser':
+    """
+    Push парсер `lxml.etree.XMLPullParser` с `huge_tree`
+    """
+    return lxml_etree.XMLPullParser(
+        events=events,
+        huge_tree=True,
+        resolve_entities=False,
+        no_network=True,
+    )
+
+
+if LXML_AVAILABLE:
+    ITERPARSE = lxml_iterparse
+    PULL_PARSER = lxml_pull_parser
+    PARSE_ERRORS = (ParseError, lxml_etree.ParseError)
+else:
+    ITERPARSE = etree_iterparse
+    PULL_PARSER = etree_pull_parser
+    PARSE_ERRORS = (ParseError,)
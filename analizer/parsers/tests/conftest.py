@@ -31,3 +31,29 @@ def file_xml(load_xml):
     with load_xml.open(encoding='utf-8') as file_:
         xml = file_.read()
     return xml
+
+
+@pytest.fixture(scope='class')
+def xml_many_data():
+    items = ''.join(f'''
+    <product>
+    <id>{index}</id>
+    <name>Product {index}</name>
+    <quantity>{index * 10}</quantity>
+    <price>{index}00.50</price>
+    <category>Electronics</category>
+    </product>''' for index in range(1, 101))
+    data = f'''<?xml version="1.0" encoding="utf-8"?>
+    <sales_data date="2024-01-01">
+    <products>{items}
+    </products>
+    </sales_data>'''
+    return data
+
+
+@pytest.fixture(scope='class')
+def load_many_xml(tmpdir_factory, xml_many_data):
+    tmp_path = tmpdir_factory.mktemp('data').join('many_xml.xml')
+    with tmp_path.open(mode='w+', encoding='utf-8') as file_:
+        file_.write(xml_many_data)
+    return tmp_path
@@ -1,8 +1,37 @@
+import mmap
 import pytest
 import datetime
+from array import array
 from collections import abc
 
-from parsers import FileXMLParser, StringXMLParser
+from parsers import (
+    FileXMLParser,
+    StringXMLParser,
+    StreamXMLParser,
+    FeedXMLParser,
+    ShardedXMLParser,
+    )
+from parsers.base_parser.exeptions import XMLParseError
+from parsers.base_converter.exeptions import TypeConvertError
+from parsers.type_converters import SchemaTypeConverter
+from parsers.base_parser.columns import to_columns
+from parsers.base_parser import buffers
+from parsers.base_parser.buffers import BufferReader, split_ranges
+from parsers.engines import (
+    etree_iterparse,
+    etree_pull_parser,
+    lxml_iterparse,
+    lxml_pull_parser,
+    LXML_AVAILABLE,
+    )
+
+
+ENGINES = [pytest.param((etree_iterparse, etree_pull_parser), id='etree'),
+           pytest.param((lxml_iterparse, lxml_pull_parser),
+                        id='lxml',
+                        marks=pytest.mark.skipif(not LXML_AVAILABLE,
+                                                 reason='lxml не установлен'),
+                        )]
 
 
 class TestParser:
@@ -83,3 +112,587 @@ class TestParser:
                                  convert_date=False,
                                  )
         assert parser.attrs['date'] == '2024-01-01'
+
+
+class TestStreamParser:
+    """
+    Тесты потокового парсера
+    """
+
+    @pytest.mark.parser
+    def test_parse_item_with_path_file(self, load_xml):
+        parser = StreamXMLParser(load_xml, 'product')
+        assert parser.get_list() == [dict(id=1,
+                                          name='Product A',
+                                          quantity=100,
+                                          price=1500.00,
+                                          category='Electronics',
+                                          )]
+
+    @pytest.mark.parser
+    def test_parse_item_with_binary_file(self, load_xml):
+        with load_xml.open(mode='rb') as _file:
+            parser = StreamXMLParser(_file, 'product', attrs=('date',))
+            assert parser.attrs['date'] == datetime.date(2024, 1, 1)
+            assert parser.get_list()[0]['name'] == 'Product A'
+
+    @pytest.mark.parser
+    def test_parse_items_same_as_dom(self, load_many_xml):
+        parser = StreamXMLParser(load_many_xml, 'product', attrs=('date',))
+        dom_parser = FileXMLParser(load_many_xml, 'product', attrs=('date',))
+        assert isinstance(parser.get_generator(), abc.Generator)
+        assert parser.attrs == dom_parser.attrs
+        assert parser.get_list() == dom_parser.get_list()
+
+    @pytest.mark.parser
+    def test_parse_items_without_converter(self, load_xml):
+        parser = StreamXMLParser(load_xml, 'product', type_converter=None)
+        assert parser.get_list()[0] == dict(id='1',
+                                            name='Product A',
+                                            quantity='100',
+                                            price='1500.00',
+                                            category='Electronics',
+                                            )
+
+    @pytest.mark.parser
+    def test_parse_broken_xml(self, tmp_path):
+        path = tmp_path.joinpath('broken.xml')
+        path.write_text('<?xml version="1.0"?><sales_data><product><id>1</id>',
+                        encoding='utf-8')
+        with pytest.raises(XMLParseError):
+            StreamXMLParser(path, 'product').get_list()
+
+
+class TestFeedParser:
+    """
+    Тесты парсера с подачей данных частями
+    """
+
+    @pytest.mark.parser
+    def test_feed_chunks(self, xml_many_data):
+        data = xml_many_data.encode('utf-8')
+        parser = FeedXMLParser(None, 'product', attrs=('date',))
+        items = []
+        for index in range(0, len(data), 7):
+            items.extend(parser.feed(data[index:index + 7]))
+        items.extend(parser.close())
+        assert parser.attrs['date'] == datetime.date(2024, 1, 1)
+        assert items == StringXMLParser(xml_many_data, 'product').get_list()
+
+    @pytest.mark.parser
+    def test_parse_iterable_chunks(self, file_xml):
+        data = file_xml.encode('utf-8')
+        chunks = (data[index:index + 16] for index in range(0, len(data), 16))
+        parser = FeedXMLParser(chunks, 'product')
+        assert parser.get_list() == StringXMLParser(file_xml,
+                                                    'product',
+                                                    ).get_list()
+
+    @pytest.mark.asyncio
+    async def test_parse_async_chunks(self, xml_many_data):
+        async def chunks():
+            data = xml_many_data.encode('utf-8')
+            for index in range(0, len(data), 1024):
+                yield data[index:index + 1024]
+
+        parser = FeedXMLParser(chunks(), 'product', attrs=('date',))
+        items = [item async for item in parser.aiter_items()]
+        assert len(items) == 100
+        assert parser.attrs['date'] == datetime.date(2024, 1, 1)
+
+    @pytest.mark.parser
+    def test_feed_string_error(self, file_xml):
+        with pytest.raises(XMLParseError):
+            FeedXMLParser(file_xml, 'product')
+
+
+class TestSchemaConverter:
+    """
+    Тесты конвертера типов по схеме
+    """
+
+    @pytest.mark.parser
+    def test_inferred_same_as_default(self, xml_many_data):
+        converter = SchemaTypeConverter(infer_rows=10)
+        parser = StringXMLParser(xml_many_data,
+                                 'product',
+                                 attrs=('date',),
+                                 type_converter=converter,
+                                 )
+        default_parser = StringXMLParser(xml_many_data,
+                                         'product',
+                                         attrs=('date',),
+                                         )
+        assert parser.attrs == default_parser.attrs
+        assert parser.get_list() == default_parser.get_list()
+
+    @pytest.mark.parser
+    def test_declared_schema(self, load_xml):
+        converter = SchemaTypeConverter(schema=dict(id=str, price=float))
+        parser = StreamXMLParser(load_xml, 'product', type_converter=converter)
+        assert parser.get_list()[0] == dict(id='1',
+                                            name='Product A',
+                                            quantity=100,
+                                            price=1500.00,
+                                            category='Electronics',
+                                            )
+
+    @pytest.mark.parser
+    def test_feed_schema(self, xml_many_data):
+        converter = SchemaTypeConverter(infer_rows=1000)
+        data = xml_many_data.encode('utf-8')
+        chunks = (data[index:index + 512] for index in range(0, len(data), 512))
+        parser = FeedXMLParser(chunks, 'product', type_converter=converter)
+        assert parser.get_list() == StringXMLParser(xml_many_data,
+                                                    'product',
+                                                    ).get_list()
+
+    @pytest.mark.parser
+    def test_schema_without_int_converter(self, file_xml):
+        parser = StringXMLParser(file_xml,
+                                 'product',
+                                 type_converter=SchemaTypeConverter(),
+                                 convert_int=False,
+                                 )
+        assert parser.get_list()[0]['quantity'] == '100'
+
+    @pytest.mark.parser
+    def test_schema_error(self):
+        converter = SchemaTypeConverter(schema=dict(quantity=int))
+        with pytest.raises(TypeConvertError):
+            converter.convert(dict(quantity='many'))
+
+
+class TestColumns:
+    """
+    Тесты колоночного вывода
+    """
+
+    @pytest.mark.parser
+    def test_columns_batches(self, xml_many_data):
+        parser = StringXMLParser(xml_many_data, 'product')
+        batches = list(parser.get_columns(batch_size=30, use_numpy=False))
+        assert [len(batch['id']) for batch in batches] == [30, 30, 30, 10]
+        assert isinstance(batches[0]['quantity'], array)
+        assert batches[0]['quantity'].typecode == 'q'
+        assert batches[0]['price'].typecode == 'd'
+        assert batches[0]['name'][:2] == ['Product 1', 'Product 2']
+
+    @pytest.mark.parser
+    def test_columns_numpy(self, load_many_xml):
+        numpy = pytest.importorskip('numpy')
+        parser = StreamXMLParser(load_many_xml, 'product')
+        columns = next(parser.get_columns(batch_size=1000, use_numpy=True))
+        assert columns['quantity'].dtype == numpy.int64
+        assert columns['price'].dtype == numpy.float64
+        assert columns['quantity'].sum() == sum(range(10, 1010, 10))
+
+    @pytest.mark.parser
+    def test_columns_missing_values(self):
+        columns = to_columns([dict(id=1, date=datetime.date(2024, 1, 1)),
+                              dict(id=2, price=1.5)],
+                             use_numpy=False,
+                             )
+        assert list(columns['id']) == [1, 2]
+        assert columns['price'] == [None, 1.5]
+        assert columns['date'] == [datetime.date(2024, 1, 1), None]
+
+
+class TestAttrs:
+    """
+    Тесты выборки атрибутов
+    """
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('attr', ['date',
+                                      '@date',
+                                      'sales_data/@date',
+                                      '/sales_data/@date',
+                                      '*/@date',
+                                      ])
+    def test_attr_paths(self, load_xml, attr):
+        dom_parser = FileXMLParser(load_xml, 'product', attrs=(attr,))
+        stream_parser = StreamXMLParser(load_xml, 'product', attrs=(attr,))
+        assert dom_parser.attrs == dict(date=datetime.date(2024, 1, 1))
+        assert stream_parser.attrs == dom_parser.attrs
+
+    @pytest.mark.parser
+    def test_attr_wrong_path(self, file_xml):
+        parser = StringXMLParser(file_xml,
+                                 'product',
+                                 attrs=('products/@date',),
+                                 type_converter=None,
+                                 )
+        assert parser.attrs == dict(date='')
+
+    @pytest.mark.parser
+    def test_attr_path_error(self, file_xml):
+        with pytest.raises(XMLParseError):
+            StringXMLParser(file_xml, 'product', attrs=('sales_data/date',))
+
+
+class TestEngines:
+    """
+    Тесты движков потоковых парсеров
+    """
+
+    @pytest.fixture(params=ENGINES)
+    def engine(self, request):
+        iterparse, pull_parser = request.param
+        stream = type('EngineStreamXMLParser',
+                      (StreamXMLParser,),
+                      dict(PARSER=iterparse))
+        feed = type('EngineFeedXMLParser',
+                    (FeedXMLParser,),
+                    dict(PARSER=pull_parser))
+        return stream, feed
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('options, expected', [
+        (dict(), dict(id=1,
+                      name='Product A',
+                      quantity=100,
+                      price=1500.00,
+                      category='Electronics')),
+        (dict(type_converter=None), dict(id='1',
+                                         name='Product A',
+                                         quantity='100',
+                                         price='1500.00',
+                                         category='Electronics')),
+        (dict(convert_int=False), dict(id='1',
+                                       name='Product A',
+                                       quantity='100',
+                                       price=1500.00,
+                                       category='Electronics')),
+        (dict(convert_float=False), dict(id=1,
+                                         name='Product A',
+                                         quantity=100,
+                                         price='1500.00',
+                                         category='Electronics')),
+    ])
+    def test_items(self, engine, load_xml, options, expected):
+        stream, feed = engine
+        with load_xml.open(encoding='utf-8') as _file:
+            assert stream(_file, 'product', **options).get_list() == [expected]
+        assert stream(load_xml, 'product', **options).get_list() == [expected]
+        with load_xml.open(mode='rb') as _file:
+            assert feed(iter(_file), 'product', **options).get_list() == [expected]
+
+    @pytest.mark.parser
+    def test_attrs(self, engine, load_xml):
+        stream, feed = engine
+        parser = stream(load_xml, 'product', attrs=('date',))
+        assert parser.attrs['date'] == datetime.date(2024, 1, 1)
+        parser = stream(load_xml,
+                        'product',
+                        attrs=('date',),
+                        convert_date=False,
+                        )
+        assert parser.attrs['date'] == '2024-01-01'
+
+    @pytest.mark.parser
+    def test_many_items(self, engine, load_many_xml, xml_many_data):
+        stream, feed = engine
+        expected = StringXMLParser(xml_many_data, 'product').get_list()
+        assert stream(load_many_xml, 'product').get_list() == expected
+        data = xml_many_data.encode('utf-8')
+        chunks = (data[index:index + 100] for index in range(0, len(data), 100))
+        assert feed(chunks, 'product').get_list() == expected
+
+    @pytest.mark.parser
+    def test_comments_skipped(self, engine, tmp_path):
+        stream, feed = engine
+        path = tmp_path.joinpath('comments.xml')
+        path.write_text('<?xml version="1.0"?><sales_data><!-- head -->'
+                        '<product><id>1</id><!-- note --></product>'
+                        '</sales_data>',
+                        encoding='utf-8')
+        assert stream(path, 'product').get_list() == [dict(id=1)]
+
+    @pytest.mark.parser
+    def test_broken_xml(self, engine):
+        stream, feed = engine
+        with pytest.raises(XMLParseError):
+            parser = feed(None, 'product')
+            parser.feed(b'<?xml version="1.0"?><sales_data><product></sales')
+            parser.close()
+
+
+class TestSharded:
+    """
+    Тесты параллельного парсера
+    """
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('max_workers, shard_size', [
+        (1, 500),
+        (2, 500),
+        (2, 10 ** 9),
+    ])
+    def test_same_as_stream(self,
+                            load_many_xml,
+                            max_workers,
+                            shard_size):
+        expected = StreamXMLParser(load_many_xml, 'product').get_list()
+        parser = ShardedXMLParser(load_many_xml,
+                                  'product',
+                                  attrs=('date',),
+                                  max_workers=max_workers,
+                                  shard_size=shard_size,
+                                  )
+        assert parser.attrs == dict(date=datetime.date(2024, 1, 1))
+        assert parser.get_list() == expected
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('max_workers', [1, 2])
+    def test_schema_same_as_stream(self, tmp_path, max_workers):
+        items = ''.join(f'''
+        <product>
+        <id>{index}</id>
+        <price>{1 if index < 50 else 1.5}</price>
+        </product>''' for index in range(100))
+        path = tmp_path.joinpath('prices.xml')
+        path.write_text('<?xml version="1.0" encoding="utf-8"?>'
+                        f'<sales_data><products>{items}</products>'
+                        '</sales_data>',
+                        encoding='utf-8')
+        expected = StreamXMLParser(path,
+                                   'product',
+                                   type_converter=SchemaTypeConverter(),
+                                   ).get_list()
+        parser = ShardedXMLParser(path,
+                                  'product',
+                                  type_converter=SchemaTypeConverter(),
+                                  max_workers=max_workers,
+                                  shard_size=1500,
+                                  )
+        items = parser.get_list()
+        assert items == expected
+        assert {type(item['price']) for item in items} == {float}
+
+    @pytest.mark.parser
+    def test_bytes(self, xml_many_data):
+        parser = ShardedXMLParser(xml_many_data.encode(),
+                                  'product',
+                                  attrs=('sales_data/@date',),
+                                  max_workers=1,
+                                  shard_size=1000,
+                                  )
+        items = parser.get_list()
+        assert parser.attrs == dict(date=datetime.date(2024, 1, 1))
+        assert [item['id'] for item in items] == list(range(1, 101))
+
+    @pytest.mark.parser
+    def test_ranges_on_item_bounds(self, xml_many_data):
+        data = xml_many_data.encode()
+        head_end, ranges = split_ranges(data, 'product', shard_size=300)
+        assert data[head_end:].startswith(b'<product>')
+        assert all(data[start:].startswith(b'<product>')
+                   for start, _ in ranges)
+        assert ranges[-1][1] == data.rindex(b'</product>') + len(b'</product>')
+        assert len(ranges) > 1
+
+    @pytest.mark.parser
+    def test_no_items(self, tmp_path):
+        path = tmp_path.joinpath('empty.xml')
+        path.write_text('<?xml version="1.0"?><sales_data date="2024-01-01">'
+                        '<products></products></sales_data>',
+                        encoding='utf-8')
+        parser = ShardedXMLParser(path, 'product', attrs=('date',))
+        assert parser.get_list() == []
+        assert parser.attrs == dict(date=datetime.date(2024, 1, 1))
+
+    @pytest.mark.parser
+    def test_broken_shard(self):
+        data = (b'<?xml version="1.0"?><sales_data><product><id>1</id>'
+                b'</product><product><id>2</id></prod></product></sales_data>')
+        parser = ShardedXMLParser(data, 'product', max_workers=1)
+        with pytest.raises(XMLParseError):
+            parser.get_list()
+
+    @pytest.mark.parser
+    def test_buffer_reader(self):
+        with BufferReader(b'0123456789', 2, 6, prefix=b'<', suffix=b'>') as reader:
+            assert reader.read(3) == b'<23'
+            assert reader.read() == b'45>'
+            reader.seek(0)
+            assert reader.read() == b'<2345>'
+
+
+class TestMemoryMap:
+    """
+    Тесты чтения файлов отображенных в память
+    """
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('parser_cls', [FileXMLParser, StreamXMLParser])
+    def test_memory_map_path(self, load_many_xml, parser_cls):
+        expected = parser_cls(load_many_xml, 'product').get_list()
+        parser = parser_cls(load_many_xml,
+                            'product',
+                            attrs=('date',),
+                            memory_map=True,
+                            )
+        assert parser.attrs == dict(date=datetime.date(2024, 1, 1))
+        assert parser.get_list() == expected
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('parser_cls', [FileXMLParser, StreamXMLParser])
+    def test_mmap_object(self, load_xml, parser_cls):
+        with open(load_xml, mode='rb') as file_:
+            mapped = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        parser = parser_cls(mapped, 'product', attrs=('date',))
+        assert parser.get_list() == [dict(id=1,
+                                          name='Product A',
+                                          quantity=100,
+                                          price=1500.00,
+                                          category='Electronics',
+                                          )]
+        assert parser.attrs == dict(date=datetime.date(2024, 1, 1))
+
+    @pytest.mark.parser
+    def test_release_pages(self, load_many_xml, monkeypatch):
+        monkeypatch.setattr(buffers, 'RELEASE_SIZE', mmap.PAGESIZE)
+        data = load_many_xml.read_binary()
+        with buffers.open_mapped(load_many_xml) as mapped:
+            with BufferReader(mapped, suffix=b'!') as reader:
+                assert reader.read() == data + b'!'
+                assert reader._released > 0
+                reader.seek(0)
+                assert reader.read(10) == data[:10]
+
+    @pytest.mark.parser
+    def test_empty_file(self, tmp_path):
+        path = tmp_path.joinpath('empty.xml')
+        path.write_bytes(b'')
+        with pytest.raises(XMLParseError):
+            StreamXMLParser(path, 'product', memory_map=True).get_list()
+
+
+class TestLazy:
+    """
+    Тесты ленивого и повторного прохода по документу
+    """
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('parser_cls', [FileXMLParser,
+                                            StreamXMLParser,
+                                            ShardedXMLParser])
+    def test_reiterable(self, load_many_xml, parser_cls):
+        parser = parser_cls(load_many_xml, 'product')
+        assert parser._items is None
+        first = list(parser.get_generator())
+        assert parser.get_list() == first
+        assert list(parser) == first
+        assert len(first) == 100
+
+    @pytest.mark.parser
+    def test_reiterable_string(self, xml_many_data):
+        parser = StringXMLParser(xml_many_data, 'product', attrs=('date',))
+        assert parser.attrs == dict(date=datetime.date(2024, 1, 1))
+        assert len(parser.get_list()) == len(parser.get_list()) == 100
+
+    @pytest.mark.parser
+    def test_len_without_parse(self, load_many_xml, xml_many_data):
+        parser = StreamXMLParser(load_many_xml, 'product')
+        assert len(parser) == 100
+        assert parser._passes == 0
+        assert len(StringXMLParser(xml_many_data, 'product')) == 100
+
+    @pytest.mark.parser
+    def test_len_after_pass(self, xml_many_data):
+        parser = FeedXMLParser(iter([xml_many_data.encode()]), 'product')
+        with pytest.raises(TypeError):
+            len(parser)
+        parser.get_list()
+        assert len(parser) == 100
+        with pytest.raises(XMLParseError):
+            parser.get_list()
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('parser_cls', [FileXMLParser, StreamXMLParser])
+    def test_getitem(self, load_many_xml, parser_cls):
+        expected = parser_cls(load_many_xml, 'product').get_list()
+        parser = parser_cls(load_many_xml, 'product')
+        assert parser[0] == expected[0]
+        assert parser[42] == expected[42]
+        assert parser[-1] == expected[-1]
+        assert parser._passes == 0
+        with pytest.raises(IndexError):
+            parser[100]
+
+    @pytest.mark.parser
+    def test_getitem_schema(self, xml_many_data):
+        parser = StringXMLParser(xml_many_data,
+                                 'product',
+                                 type_converter=SchemaTypeConverter(),
+                                 )
+        assert parser[1] == dict(id=2,
+                                 name='Product 2',
+                                 quantity=20,
+                                 price=200.50,
+                                 category='Electronics',
+                                 )
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('parser_cls', [StringXMLParser,
+                                            FileXMLParser,
+                                            StreamXMLParser])
+    def test_index_skips_comments(self, tmp_path, parser_cls):
+        xml = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sales_data date="2024-01-01">\n'
+            '<!-- <product><id>9</id></product> -->\n'
+            '<products>\n'
+            '<product><id>1</id>'
+            '<note><![CDATA[<product>x</product>]]></note></product>\n'
+            '<?note <product>?>\n'
+            '<product><id>2</id><note>n</note></product>\n'
+            '</products>\n'
+            '</sales_data>'
+        )
+        if parser_cls is StringXMLParser:
+            source = xml
+        else:
+            source = tmp_path.joinpath('feed.xml')
+            source.write_text(xml, encoding='utf-8')
+        expected = parser_cls(source, 'product').get_list()
+        parser = parser_cls(source, 'product')
+        assert len(parser) == len(expected) == 2
+        assert parser._passes == 0
+        assert [parser[0], parser[1]] == expected
+        assert parser[0]['note'] == '<product>x</product>'
+
+    @pytest.mark.parser
+    @pytest.mark.parametrize('parser_cls', [StringXMLParser,
+                                            FileXMLParser,
+                                            StreamXMLParser])
+    def test_getitem_namespaces(self, tmp_path, parser_cls):
+        xml = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<feed xmlns:g="http://base.google.com/ns/1.0">'
+               '<product><id>1</id><g:price>10</g:price></product>'
+               '<product><id>2</id><g:price>20</g:price></product>'
+               '</feed>')
+        if parser_cls is StringXMLParser:
+            source = xml
+        else:
+            source = tmp_path.joinpath('feed.xml')
+            source.write_text(xml, encoding='utf-8')
+        expected = parser_cls(source, 'product').get_list()
+        parser = parser_cls(source, 'product')
+        assert [parser[0], parser[-1]] == expected
+
+    @pytest.mark.parser
+    def test_getitem_file_object(self, load_many_xml):
+        with load_many_xml.open(mode='rb') as file_:
+            parser = StreamXMLParser(file_, 'product')
+            assert parser[5]['id'] == 6
+            assert len(parser) == 100
+
+    @pytest.mark.parser
+    def test_closed_file_second_pass(self, load_xml):
+        with load_xml.open(encoding='utf-8') as file_:
+            parser = FileXMLParser(file_, 'product')
+        assert len(parser.get_list()) == 1
+        with pytest.raises(XMLParseError):
+            parser.get_list()
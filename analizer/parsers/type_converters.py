@@ -1,8 +1,19 @@
-from collections.abc import MutableMapping
-from datetime import date
+from collections import defaultdict
+from collections.abc import (
+    Callable,
+    Generator,
+    Iterable,
+    Mapping,
+    MutableMapping,
+    )
+from datetime import date, datetime
+from itertools import islice
+from typing import Any
 
+from config import settings
 from parsers.base_converter import BaseTypeConverter
 from parsers.base_converter.exeptions import TypeConvertError
+from parsers.base_converter.utils import raise_type_convert_error
 
 
 class DefaultTypeConverter(BaseTypeConverter):
@@ -75,3 +86,226 @@ class DefaultTypeConverter(BaseTypeConverter):
                 parse_date=self.parse_date,
             )
         return self.contaiter
+
+
+def _convert_date(value: str) -> date:
+    return datetime.strptime(value, settings.DATE_FORMAT).date()
+
+
+CASTS: dict[type, Callable[[str], Any] | None] = {
+    int: int,
+    float: float,
+    date: (date.fromisoformat
+           if settings.DATE_FORMAT == '%Y-%m-%d'
+           else _convert_date),
+    str: None,
+}
+
+
+class SchemaTypeConverter:
+    """
+    Конвертер типов по схеме.
+
+    В отличие от :class:`DefaultTypeConverter` не перебирает типы
+    для каждого значения. Схема `колонка -> тип` задается явно или
+    выводится по первым `infer_rows` сущностям, затем один раз
+    компилируется в кортеж функций приведения для каждой колонки.
+
+    Вывод типов повторяет правила :class:`DefaultTypeConverter`.
+    Колонка, в которой встретились `int` и `float`, приводится к
+    `float`, любые другие смешанные типы остаются строкой.
+
+    ## Пример:
+    ```python
+    converter = SchemaTypeConverter(
+        schema=dict(id=int, price=float, date=date),
+        infer_rows=100,
+    )
+    parser = StreamXMLParser(xml='items.xml',
+                             target_items='product',
+                             type_converter=converter,
+                             )
+    ```
+    """
+
+    def __init__(self,
+                 schema: Mapping[str, type | Callable[[str], Any]] | None = None,
+                 infer_rows: int = 100,
+                 parse_int: bool = True,
+                 parse_float: bool = True,
+                 parse_date: bool = True,
+                 ) -> None:
+        """
+        Args:
+            schema (Mapping[str, type | Callable[[str], Any]] | None, optional): \
+                Схема колонок. Типы `int`, `float`, `date`, `str` или \
+                функция приведения.
+            infer_rows (int, optional): Количество сущностей для вывода \
+                типов колонок которых нет в схеме. По умолчанию `100`.
+            parse_int (bool, optional): Вывод числовых типов. \
+                По умолчания `True`.
+            parse_float (bool, optional): Вывод чисел с плавайщей \
+                точкой. По умолчания `True`.
+            parse_date (bool, optional): Вывод Времени типа `datetime.date`. \
+                По умолчания `True`.
+        """
+        self.schema = dict(schema or {})
+        self.infer_rows = max(int(infer_rows), 1)
+        self.parse_int = bool(parse_int)
+        self.parse_float = bool(parse_float)
+        self.parse_date = bool(parse_date)
+        self._casts = {column: CASTS.get(type_, type_)
+                       for column, type_
+                       in self.schema.items()}
+        self._inferred = False
+        self._pending: list[dict[str, str]] = []
+        self._default = DefaultTypeConverter({})
+        self._columns: tuple[str, ...] = ()
+        self._column_casts: tuple[Callable[[str], Any] | None, ...] = ()
+
+    def bind(self,
+             parse_int: bool = True,
+             parse_float: bool = True,
+             parse_date: bool = True,
+             ) -> 'SchemaTypeConverter':
+        """
+        Новый экземпляр с той же схемой для одного документа
+        """
+        return type(self)(
+            schema=self.schema,
+            infer_rows=self.infer_rows,
+            parse_int=parse_int,
+            parse_float=parse_float,
+            parse_date=parse_date,
+        )
+
+    def with_inferred(self,
+                      rows: Iterable[Mapping[str, str]],
+                      ) -> 'SchemaTypeConverter':
+        """
+        Новый экземпляр со схемой, дополненной типами по `rows`
+
+        Колонки из `rows` уже есть в его схеме, поэтому он
+        приводит их одинаково в любом процессе, независимо
+        от того, какие сущности попали к нему первыми.
+        """
+        inferred = self.infer(rows=rows)
+        return type(self)(
+            schema={**self.schema, **inferred},
+            infer_rows=self.infer_rows,
+            parse_int=self.parse_int,
+            parse_float=self.parse_float,
+            parse_date=self.parse_date,
+        )
+
+    @property
+    def inferred(self) -> bool:
+        """
+        Типы колонок уже выведены
+        """
+        return self._inferred
+
+    def _infer_type(self, value: str) -> type:
+        value = self._default._convert_types(
+            value=value,
+            parse_int=self.parse_int,
+            parse_float=self.parse_float,
+            parse_date=self.parse_date,
+        )
+        return type(value)
+
+    def infer(self, rows: Iterable[Mapping[str, str]]) -> dict[str, type]:
+        """
+        Вывод типов колонок которых нет в схеме
+
+        Returns:
+            dict[str, type]: Выведенные типы колонок.
+        """
+        found = defaultdict(set)
+        for row in rows:
+            for column, value in row.items():
+                if column not in self.schema:
+                    found[column].add(self._infer_type(value))
+        inferred = {}
+        for column, types in found.items():
+            if len(types) == 1:
+                inferred[column] = types.pop()
+            elif types == {int, float}:
+                inferred[column] = float
+            else:
+                inferred[column] = str
+        self._casts.update({column: CASTS.get(type_)
+                            for column, type_
+                            in inferred.items()})
+        self._inferred = True
+        self._columns = ()
+        return inferred
+
+    def _compile(self, row: Mapping[str, str]) -> None:
+        """
+        Компиляция кортежа функций приведения под порядок колонок
+        """
+        for column, value in row.items():
+            if column not in self._casts:
+                self._casts[column] = CASTS.get(self._infer_type(value))
+        self._columns = tuple(row)
+        self._column_casts = tuple(self._casts[column]
+                                   for column
+                                   in self._columns)
+
+    def convert(self, row: Mapping[str, str]) -> dict[str, Any]:
+        """
+        Приведение типов одной сущности по скомпилированной схеме
+        """
+        if tuple(row) != self._columns:
+            self._compile(row=row)
+        try:
+            return {column: cast(value) if cast else value
+                    for column, cast, value
+                    in zip(self._columns, self._column_casts, row.values())}
+        except (ValueError, TypeError):
+            for column, cast in zip(self._columns, self._column_casts):
+                try:
+                    cast and cast(row[column])
+                except (ValueError, TypeError):
+                    raise_type_convert_error(
+                        value=f'{row[column]!r} колонки {column}',
+                        type_=cast.__name__,
+                    )
+            raise
+
+    def push(self, rows: list[Mapping[str, str]]) -> list[dict[str, Any]]:
+        """
+        Приведение пачки сущностей
+
+        Пока типы не выведены сущности копятся, результат может
+        быть пустым. Остаток отдает :meth:`SchemaTypeConverter.flush`.
+        """
+        if self._inferred:
+            return [self.convert(row) for row in rows]
+        self._pending.extend(rows)
+        if len(self._pending) < self.infer_rows:
+            return []
+        return self.flush()
+
+    def flush(self) -> list[dict[str, Any]]:
+        """
+        Вывод типов по накопленным сущностям и их приведение
+        """
+        rows, self._pending = self._pending, []
+        if not self._inferred:
+            self.infer(rows=rows)
+        return [self.convert(row) for row in rows]
+
+    def convert_many(self,
+                     rows: Iterable[Mapping[str, str]],
+                     ) -> Generator[dict[str, Any], None, None]:
+        """
+        Приведение потока сущностей
+        """
+        rows = iter(rows)
+        if not self._inferred:
+            head = list(islice(rows, self.infer_rows))
+            self.infer(rows=head)
+            yield from map(self.convert, head)
+        yield from map(self.convert, rows)
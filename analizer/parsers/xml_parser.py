@@ -1,10 +1,35 @@
+import mmap
 import pathlib
 import os
-from typing import TextIO
+from collections import deque
+from collections.abc import (
+    AsyncIterable,
+    AsyncGenerator,
+    Iterable,
+    Iterator,
+    Generator,
+    Sequence,
+    )
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, closing, contextmanager, nullcontext
+from itertools import islice
+from typing import Any, TextIO, BinaryIO
 from xml.dom.minidom import parse, parseString
 
-from parsers.base_parser import BaseXMLParser
+from parsers.base_parser import BaseXMLParser, BaseStreamXMLParser
 from parsers.base_parser.exeptions import XMLParseError
+from parsers.base_parser.parse_except import parse_etree_error
+from parsers.base_parser.buffers import (
+    Buffer,
+    BufferReader,
+    map_file,
+    open_mapped,
+    split_ranges,
+    xml_declaration,
+    )
+from parsers.base_converter import BaseTypeConverter
+from parsers.type_converters import DefaultTypeConverter, SchemaTypeConverter
+from parsers.engines import ITERPARSE, PULL_PARSER, PARSE_ERRORS
 from api_v1.regex import check_xml_file
 
 
@@ -40,6 +65,9 @@ class StringXMLParser(BaseXMLParser):
             raise XMLParseError('Ошибка: XML файл должен иметь заголовок по '
                                 'типу <?xml version="1.0" encoding="utf-8"?>')
 
+    def _get_buffer(self) -> str:
+        return self.xml
+
 
 class FileXMLParser(BaseXMLParser):
     """
@@ -47,7 +75,13 @@ class FileXMLParser(BaseXMLParser):
 
     (str): Путь к файлу
 
-    (TextIO): Объект файла
+    (TextIO | BinaryIO): Объект файла
+
+    (mmap): Файл отображенный в память
+
+    С `memory_map=True` файл по пути отображается в память и
+    отдается движку байтами, без декодирования текста и копии
+    файла в памяти процесса.
 
     ## Пример:
     ```python
@@ -67,7 +101,38 @@ class FileXMLParser(BaseXMLParser):
     """
     PARSER = parse
 
-    def _is_file(self, xml: str | TextIO) -> bool:
+    def __init__(self,
+                 xml: str | os.PathLike | TextIO | BinaryIO | mmap.mmap,
+                 target_items: str,
+                 attrs: Sequence[str] | None = None,
+                 type_converter: (type[BaseTypeConverter] |
+                                  SchemaTypeConverter |
+                                  None) = DefaultTypeConverter,
+                 convert_int: bool = True,
+                 convert_float: bool = True,
+                 convert_date: bool = True,
+                 memory_map: bool = False,
+                 ) -> None:
+        """
+        Args:
+            memory_map (bool, optional): Отображение файла по пути \
+                в память. По умолчанию `False`.
+
+        Остальные аргументы смотрите в :class:`BaseXMLParser`
+        """
+        self.memory_map = bool(memory_map)
+        self._buffer: mmap.mmap | None = None
+        super().__init__(
+            xml=xml,
+            target_items=target_items,
+            attrs=attrs,
+            type_converter=type_converter,
+            convert_int=convert_int,
+            convert_float=convert_float,
+            convert_date=convert_date,
+        )
+
+    def _is_file(self, xml: str | TextIO | BinaryIO) -> bool:
         if isinstance(xml, os.PathLike | str):
             self.xml = str(xml)
             path = pathlib.Path(xml)
@@ -83,14 +148,531 @@ class FileXMLParser(BaseXMLParser):
             else:
                 raise XMLParseError(f'Ошибка: {path.as_posix()} не файл')
         else:
-            xml_name = pathlib.Path(xml.name)
-            is_xml = check_xml_file(xml_name.name)
-            if not is_xml:
-                raise XMLParseError(f'Ошибка: не верный формат файла {xml_name.name}')
+            name = getattr(xml, 'name', None)
+            if isinstance(name, str):
+                xml_name = pathlib.Path(name)
+                is_xml = check_xml_file(xml_name.name)
+                if not is_xml:
+                    raise XMLParseError('Ошибка: не верный формат файла '
+                                        f'{xml_name.name}')
             first_char = xml.read(1)
             if not first_char:
                 raise XMLParseError('Ошибка: файл пустой')
             xml.seek(0)
 
-    def _check_xml_instance(self, xml: str | TextIO) -> None:
+    def _check_xml_instance(self,
+                            xml: str | TextIO | BinaryIO | mmap.mmap,
+                            ) -> None:
+        if isinstance(xml, mmap.mmap):
+            return
+        self._is_file(xml=xml)
+
+    def _get_source(self,
+                    xml: str | TextIO | BinaryIO | mmap.mmap,
+                    ) -> str | TextIO | BinaryIO:
+        """
+        Отображенный в память файл читается через
+        :class:`parsers.base_parser.buffers.BufferReader`
+        """
+        if isinstance(xml, mmap.mmap):
+            return BufferReader(buffer=xml)
+        if self.memory_map and isinstance(xml, os.PathLike | str):
+            return BufferReader(buffer=map_file(xml))
+        return super()._get_source(xml=xml)
+
+    def _get_buffer(self) -> mmap.mmap | None:
+        """
+        Файл отображенный в память для индекса сущностей
+        """
+        xml = self.xml
+        if isinstance(xml, mmap.mmap):
+            return xml
+        if self._buffer is None:
+            if isinstance(xml, os.PathLike | str):
+                self._buffer = map_file(xml)
+            else:
+                try:
+                    self._buffer = mmap.mmap(xml.fileno(),
+                                             0,
+                                             access=mmap.ACCESS_READ)
+                except (AttributeError, OSError, ValueError):
+                    return None
+        return self._buffer
+
+
+class StreamXMLParser(BaseStreamXMLParser, FileXMLParser):
+    """
+    Потоковый XML парсер файлового типа
+
+    Не строит DOM документа: каждая сущность отдается сразу после
+    закрывающего тега и затем удаляется из памяти. Подходит для
+    больших XML файлов. Движок - `lxml` если установлен, иначе
+    :mod:`xml.etree.ElementTree`, смотрите :mod:`parsers.engines`.
+
+    (str): Путь к файлу
+
+    (TextIO | BinaryIO): Объект файла
+
+    ## Пример:
+    ```python
+    from pathlib import Path
+    from parsers import StreamXMLParser
+
+
+    path = Path('some_xml.xml')
+    with path.open(mode='rb') as file_:
+        parser = StreamXMLParser(xml=file_,
+                                 target_items=settings.TARGET_ITEMS_XML,
+                                 attrs=(settings.TARGET_ATTRS_XML,),
+                                 )
+        attrs = parser.attrs
+        for item in parser.get_generator():
+            ...
+    ```
+    """
+    PARSER = ITERPARSE
+
+
+class FeedXMLParser(BaseStreamXMLParser):
+    """
+    XML парсер с подачей данных частями.
+
+    Принимает байты по мере их получения (например из
+    :meth:`httpx.Response.aiter_bytes`) и отдает сущности сразу
+    после закрывающего тега, не дожидаясь окончания загрузки.
+
+    (None): Данные подаются вручную через :meth:`FeedXMLParser.feed`
+
+    (Iterable[bytes]): Части документа, сущности доступны через \
+        :meth:`FeedXMLParser.get_generator`
+
+    (AsyncIterable[bytes]): Части документа, сущности доступны через \
+        :meth:`FeedXMLParser.aiter_items`
+
+    ## Пример:
+    ```python
+    from parsers import FeedXMLParser
+
+
+    async with client.stream('GET', url) as response:
+        parser = FeedXMLParser(xml=response.aiter_bytes(),
+                               target_items=settings.TARGET_ITEMS_XML,
+                               attrs=(settings.TARGET_ATTRS_XML,),
+                               )
+        async for item in parser.aiter_items():
+            attrs = parser.attrs
+            ...
+    ```
+    """
+    PARSER = PULL_PARSER
+
+    def _check_xml_instance(self,
+                            xml: Iterable[bytes] | AsyncIterable[bytes] | None,
+                            ) -> None:
+        if xml is None or isinstance(xml, AsyncIterable):
+            return
+        if isinstance(xml, str | bytes) or not isinstance(xml, Iterable):
+            cls = type(self).__name__
+            raise XMLParseError('Ошибка: Не возможно обработать '
+                                f'{type(xml).__name__} с помощью {cls} '
+                                f'попробуйте {StringXMLParser.__name__}')
+
+    def _is_lazy(self, xml: Iterable[bytes] | AsyncIterable[bytes] | None) -> bool:
+        return False
+
+    def _prepare_items(self) -> None:
+        """
+        Поток читается один раз, повторный проход невозможен
+        """
+        if self._passes:
+            raise XMLParseError('Ошибка: поток уже прочитан, '
+                                'повторный проход невозможен')
+        super()._prepare_items()
+
+    def __len__(self) -> int:
+        if self._length is None:
+            cls = type(self).__name__
+            raise TypeError(f'Количество сущностей {cls} известно '
+                            'только после чтения потока')
+        return self._length
+
+    def _read_items(self) -> list[dict[str, str]]:
+        items = []
+        try:
+            for event, element in self._pull_parser.read_events():
+                item = self._handle_event(
+                    event=event,
+                    element=element,
+                    target_items=self.target_items,
+                    type_converter=self._type_converter,
+                )
+                if item is not None:
+                    items.append(item)
+        except PARSE_ERRORS as ex:
+            msg = parse_etree_error(ex=ex)
+            raise XMLParseError(msg)
+        type_converter = self._type_converter
+        if isinstance(type_converter, SchemaTypeConverter):
+            return type_converter.push(rows=items)
+        return [self._convert_item(item=item, type_converter=type_converter)
+                for item
+                in items]
+
+    def feed(self, chunk: bytes | str) -> list[dict[str, str]]:
+        """
+        Подача части документа
+
+        Returns:
+            list[dict[str, str]]: Сущности, закрытые в этой части.
+        """
+        try:
+            self._pull_parser.feed(chunk)
+        except PARSE_ERRORS as ex:
+            msg = parse_etree_error(ex=ex)
+            raise XMLParseError(msg)
+        return self._read_items()
+
+    def close(self) -> list[dict[str, str]]:
+        """
+        Завершение документа
+
+        Returns:
+            list[dict[str, str]]: Оставшиеся сущности.
+        """
+        try:
+            self._pull_parser.close()
+        except PARSE_ERRORS as ex:
+            msg = parse_etree_error(ex=ex)
+            raise XMLParseError(msg)
+        items = self._read_items()
+        if not self._attrs_ready:
+            self._finish_attrs(type_converter=self._type_converter)
+        if isinstance(self._type_converter, SchemaTypeConverter):
+            items.extend(self._type_converter.flush())
+        return items
+
+    def _stuct_feed_items(self,
+                          chunks: Iterable[bytes],
+                          ) -> Generator[dict[str, str], None, None]:
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
+
+    async def aiter_items(self) -> AsyncGenerator[dict[str, str], None]:
+        """
+        Асинхронный вывод сущностей из `AsyncIterable[bytes]`
+        """
+        async for chunk in self.xml:
+            for item in self.feed(chunk):
+                yield item
+        for item in self.close():
+            yield item
+
+    def _parse(self,
+               xml: Iterable[bytes] | AsyncIterable[bytes] | None,
+               target_items: str,
+               attrs: Iterable[str] | None,
+               type_converter: BaseTypeConverter | None,
+               ) -> Generator[dict[str, str], None, None] | list[None]:
+        self._reset_stream()
+        self._pull_parser = self.get_parser()(events=self.EVENTS)
+        if xml is None or isinstance(xml, AsyncIterable):
+            return []
+        return self._stuct_feed_items(chunks=xml)
+
+    def __str__(self) -> str:
+        return repr(self)
+
+    def __repr__(self) -> str:
+        cls_name = type(self).__name__
+        return f'{cls_name}({self.target_items!r})'
+
+
+def _parse_shard(parser_cls: type[StreamXMLParser],
+                 source: str | bytes,
+                 start: int,
+                 end: int | None,
+                 prefix: bytes,
+                 options: dict[str, Any],
+                 ) -> list[dict[str, str]]:
+    """
+    Парсинг диапазона документа, выполняется в процессе пула
+
+    Путь к файлу отображается в память в самом процессе,
+    байты передаются уже вырезанным диапазоном.
+    """
+    with ExitStack() as stack:
+        buffer = source
+        if isinstance(source, str):
+            buffer = stack.enter_context(open_mapped(source))
+        reader = stack.enter_context(BufferReader(
+            buffer=buffer,
+            start=start,
+            end=end,
+            prefix=prefix,
+            suffix=ShardedXMLParser.SHARD_END,
+        ))
+        parser = parser_cls(xml=reader, **options)
+        return parser.get_list()
+
+
+class ShardedXMLParser(BaseStreamXMLParser, FileXMLParser):
+    """
+    Параллельный XML парсер файлового типа
+
+    Документ отображается в память и делится по границам
+    `target_items` на диапазоны около `shard_size` байт, которые
+    разбираются в :class:`concurrent.futures.ProcessPoolExecutor`
+    парсером :class:`ShardedXMLParser.SHARD_PARSER`. Порядок
+    сущностей сохраняется, атрибуты читаются один раз из
+    заголовка документа. Сущности должны идти подряд в одном
+    родителе, конвертация типов выполняется в процессах пула,
+    типы :class:`SchemaTypeConverter` выводятся заранее по первым
+    сущностям документа.
+
+    (str): Путь к файлу
+
+    (bytes | mmap): Документ в памяти
+
+    ## Пример:
+    ```python
+    from parsers import ShardedXMLParser
+
+
+    parser = ShardedXMLParser(xml='some_xml.xml',
+                              target_items=settings.TARGET_ITEMS_XML,
+                              attrs=(settings.TARGET_ATTRS_XML,),
+                              max_workers=4,
+                              )
+    attrs = parser.attrs
+    for item in parser.get_generator():
+        ...
+    ```
+    """
+    PARSER = PULL_PARSER
+    SHARD_PARSER = StreamXMLParser
+    SHARD_SIZE = 16 * 1024 * 1024
+    SHARD_START = b'<__shard__>'
+    SHARD_END = b'</__shard__>'
+
+    def __init__(self,
+                 xml: str | os.PathLike | Buffer,
+                 target_items: str,
+                 attrs: Sequence[str] | None = None,
+                 type_converter: (type[BaseTypeConverter] |
+                                  SchemaTypeConverter |
+                                  None) = DefaultTypeConverter,
+                 convert_int: bool = True,
+                 convert_float: bool = True,
+                 convert_date: bool = True,
+                 max_workers: int | None = None,
+                 shard_size: int = SHARD_SIZE,
+                 ) -> None:
+        """
+        Args:
+            max_workers (int | None, optional): Количество процессов. \
+                По умолчанию - количество ядер, при `1` документ \
+                разбирается в текущем процессе.
+            shard_size (int, optional): Примерный размер диапазона \
+                в байтах. По умолчанию `16 MiB`.
+
+        Остальные аргументы смотрите в :class:`BaseXMLParser`
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shard_size = max(int(shard_size), 1)
+        super().__init__(
+            xml=xml,
+            target_items=target_items,
+            attrs=attrs,
+            type_converter=type_converter,
+            convert_int=convert_int,
+            convert_float=convert_float,
+            convert_date=convert_date,
+        )
+
+    def _check_xml_instance(self, xml: str | os.PathLike | Buffer) -> None:
+        if isinstance(xml, bytes | bytearray | mmap.mmap):
+            if not len(xml):
+                raise XMLParseError('Ошибка: документ пустой')
+            return
+        if not isinstance(xml, os.PathLike | str):
+            cls = type(self).__name__
+            raise XMLParseError('Ошибка: Не возможно обработать '
+                                f'{type(xml).__name__} с помощью {cls} '
+                                f'попробуйте {StreamXMLParser.__name__}')
         self._is_file(xml=xml)
+
+    def _get_buffer(self) -> Buffer | None:
+        if isinstance(self.xml, bytes | bytearray):
+            return self.xml
+        return super()._get_buffer()
+
+    @contextmanager
+    def _open_buffer(self,
+                     xml: str | Buffer,
+                     ) -> Iterator[Buffer]:
+        if isinstance(xml, str):
+            with open_mapped(xml) as buffer:
+                yield buffer
+        else:
+            with nullcontext(xml) as buffer:
+                yield buffer
+
+    def _read_head(self,
+                   head: bytes,
+                   type_converter: BaseTypeConverter | None,
+                   ) -> None:
+        """
+        Выборка атрибутов из заголовка документа до первой сущности
+        """
+        if self.values:
+            pull_parser = self.get_parser()(events=self.EVENTS)
+            try:
+                pull_parser.feed(head)
+                for event, element in pull_parser.read_events():
+                    self._handle_event(
+                        event=event,
+                        element=element,
+                        target_items=self.target_items,
+                        type_converter=type_converter,
+                    )
+            except PARSE_ERRORS as ex:
+                msg = parse_etree_error(ex=ex)
+                raise XMLParseError(msg)
+        self._finish_attrs(type_converter=type_converter)
+
+    def _iter_shards(self,
+                     xml: str | Buffer,
+                     ranges: list[tuple[int, int]],
+                     prefix: bytes,
+                     options: dict[str, Any],
+                     ) -> Generator[tuple[Any, ...], None, None]:
+        """
+        Аргументы :func:`_parse_shard` для каждого диапазона
+
+        Диапазоны байтов вырезаются по мере отправки в пул.
+        """
+        for start, end in ranges:
+            if isinstance(xml, str):
+                yield (self.SHARD_PARSER, xml, start, end, prefix, options)
+            else:
+                yield (self.SHARD_PARSER,
+                       bytes(xml[start:end]),
+                       0,
+                       None,
+                       prefix,
+                       options,
+                       )
+
+    def _shard_converter(self,
+                         buffer: Buffer,
+                         ranges: list[tuple[int, int]],
+                         prefix: bytes,
+                         target_items: str,
+                         type_converter: BaseTypeConverter | None,
+                         ) -> BaseTypeConverter | None:
+        """
+        Конвертер типов для процессов пула
+
+        Типы :class:`SchemaTypeConverter` выводятся один раз
+        по первым сущностям документа, в процессы уходит
+        конвертер с готовой схемой. Иначе каждый процесс выводил
+        бы типы по своему диапазону и одна колонка получала бы
+        разные типы в зависимости от границ диапазонов.
+        """
+        if not isinstance(type_converter, SchemaTypeConverter):
+            return type_converter
+        with BufferReader(
+            buffer=buffer,
+            start=ranges[0][0],
+            end=ranges[-1][1],
+            prefix=prefix,
+            suffix=self.SHARD_END,
+        ) as reader:
+            parser = self.SHARD_PARSER(xml=reader,
+                                       target_items=target_items,
+                                       type_converter=None,
+                                       )
+            with closing(parser.get_generator()) as items:
+                head = list(islice(items, type_converter.infer_rows))
+        return type_converter.with_inferred(rows=head)
+
+    def _struct_shard_items(self,
+                           shards: Iterable[tuple[Any, ...]],
+                           workers: int,
+                           ) -> Generator[dict[str, str], None, None]:
+        """
+        Вывод сущностей диапазонов в исходном порядке
+
+        В пуле одновременно находится не больше `2 * workers`
+        диапазонов, что ограничивает память под результаты.
+        """
+        if workers == 1:
+            for shard in shards:
+                yield from _parse_shard(*shard)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            try:
+                for shard in shards:
+                    pending.append(executor.submit(_parse_shard, *shard))
+                    if len(pending) >= workers * 2:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _parse(self,
+               xml: str | os.PathLike | Buffer,
+               target_items: str,
+               attrs: Sequence[str] | None,
+               type_converter: BaseTypeConverter | None,
+               ) -> Generator[dict[str, str], None, None] | list[None]:
+        """
+        Метод параллельного парсинга данных из XML
+
+        Границы диапазонов и атрибуты определяются сразу,
+        диапазоны разбираются при чтении генератора.
+        """
+        if self._is_path_like(xml):
+            xml = str(xml)
+        self._reset_stream()
+        with self._open_buffer(xml=xml) as buffer:
+            head_end, ranges = split_ranges(
+                buffer=buffer,
+                target_items=target_items,
+                shard_size=self.shard_size,
+            )
+            self._read_head(
+                head=bytes(buffer[:head_end]),
+                type_converter=type_converter,
+            )
+            prefix = xml_declaration(buffer) + self.SHARD_START
+            if not ranges:
+                return []
+            type_converter = self._shard_converter(
+                buffer=buffer,
+                ranges=ranges,
+                prefix=prefix,
+                target_items=target_items,
+                type_converter=type_converter,
+            )
+        options = dict(
+            target_items=target_items,
+            type_converter=type_converter,
+            convert_int=self.convert_int,
+            convert_float=self.convert_float,
+            convert_date=self.convert_date,
+        )
+        shards = self._iter_shards(
+            xml=xml,
+            ranges=ranges,
+            prefix=prefix,
+            options=options,
+        )
+        return self._struct_shard_items(
+            shards=shards,
+            workers=min(self.max_workers, len(ranges)),
+        )
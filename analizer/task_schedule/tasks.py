@@ -1,105 +1,284 @@
-import httpx
-from httpx import ConnectError, Timeout
-from time import sleep
-from loguru import logger
+import hashlib
+import os
+import tempfile
+from datetime import date as date_type
+from functools import partial
+from pathlib import Path
+from celery import chain
+from celery.canvas import Signature
+from httpx import Timeout, TransportError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import (
     celery_app,
     settings,
     db_connection,
+    http_client,
     )
+from config.http_client.client_helper import ServerEventError, aiter_sse
 from api_v1.products.dao import ProductDAO
+from config.models import Product
 from api_v1.llm_answers.dao import AnswerDAO
-from parsers import StringXMLParser
+from api_v1.sales_summary.dao import DailySalesSummaryDAO
+from parsers import StreamXMLParser
+from parsers.type_converters import SchemaTypeConverter
+from parsers.base_converter.exeptions import TypeConvertError
 from parsers.base_parser.exeptions import NoDataParseError
-from task_schedule.utils import union_each_one_data
+from task_schedule.utils import get_model_schema, aiter_in_thread
 from task_schedule.utils import ProductPromptMaker
 
 
-@celery_app.task
-async def get_analize_products_endpoint_task():
-    """
-    Задача по получении сущностей из энд поинта.
+celery_app.on_loop_shutdown(db_connection.dispose)
+celery_app.on_loop_shutdown(http_client.aclose)
 
-    Сущности являются (XML) структурой которые в последствии
-    парсятся в Dictiontary модель данных с конвертацие типов.
 
-    Затем сущности сохраняются в базу данных.
+def get_feed_path(feed_hash: str) -> Path:
+    """
+    Путь к скачанному фиду по его хэшу
+    """
+    return settings.FEEDS_DIR.joinpath(f'{feed_hash}.xml')
 
-    Идет аналитическая выборка из базы даных всех
-    сущностей для анализа.
 
-    После всех действий данные отдаются LLM модели,
-    которая в свою очередь анализирует данные по промпру
-    и выводит результат.
+async def stream_llm_answer(prompt: list[dict[str, str]]) -> str:
+    """
+    Ответ LLM модели из потока server-sent events
 
-    Результат сохраняется в отдельную таблицу в базе данных,
-    и может помочь при дальнейшем анализе.
+    Куски текста приходят по мере генерации, поэтому таймаут
+    чтения - пауза между кусками, а не вся генерация.
+
+    Raises:
+        ServerEventError: Событие `error` от LLM сервиса
     """
-    while 1:
-        try:
-            async with httpx.AsyncClient(timeout=Timeout(None)) as client:
-                response = await client.get(url=settings.XML_END_POINT_URL)
-                await client.aclose()
+    parts = []
+    async with http_client.stream(
+        method='PUT',
+        url=settings.LLM_STREAM_END_POINT_URL,
+        json=prompt,
+    ) as response:
+        async for event, data in aiter_sse(response=response):
+            if event == 'error':
+                raise ServerEventError(data.get('message'))
+            if event == 'done':
                 break
-        except ConnectError:
-            logger.warning('Connection attempt failed, try 30 sec')
-            await client.aclose()
-            sleep(30.0)
-
-    body = response.content.decode(encoding='utf-8')
-    parser = StringXMLParser(xml=body,
-                             target_items=settings.TARGET_ITEMS_XML,
-                             attrs=(settings.TARGET_ATTRS_XML,),
-                             )
-    parsed_items = parser.get_generator()
-    attrs = parser.attrs
-    date = attrs.get('date')
-    values_to_save = union_each_one_data(
-        data=attrs,
-        data_to_each=parsed_items,
-    )
+            parts.append(data['text'])
+    return ''.join(parts)
 
-    if not parsed_items:
-        raise NoDataParseError('Нет данных для обработки')
+
+async def refresh_summary(session: AsyncSession,
+                          date: date_type,
+                          ) -> None:
+    """
+    Пересчет сводки за дату фида в транзакции загрузки
+    """
+    await DailySalesSummaryDAO.refresh(session=session, dates=(date,))
+
+
+def open_feed(path: Path) -> tuple[StreamXMLParser, date_type]:
+    """
+    Парсер скачанного фида и его дата
+
+    Дата проверяется до загрузки: без нее продукты
+    не отнести ни к одному дню сводки.
+
+    Raises:
+        NoDataParseError: В фиде нет даты или она не разбирается
+    """
+    type_converter = SchemaTypeConverter(schema=get_model_schema(Product))
+    try:
+        parser = StreamXMLParser(
+            xml=path,
+            target_items=settings.TARGET_ITEMS_XML,
+            attrs=(settings.TARGET_ATTRS_XML,),
+            type_converter=type_converter,
+            memory_map=True,
+            )
+        date = parser.attrs.get('date')
+    except TypeConvertError as ex:
+        raise NoDataParseError(f'Дата фида {path.name} не разбирается: {ex}')
+    if not isinstance(date, date_type):
+        raise NoDataParseError(f'В фиде {path.name} нет даты: '
+                               f'атрибуты {parser.attrs}')
+    return parser, date
+
+
+@celery_app.task(queue=settings.celery.QUEUE_FEEDS)
+async def fetch_feed_task() -> str:
+    """
+    Скачивание XML фида потоком в `settings.FEEDS_DIR`
+
+    Returns:
+        str: SHA-256 фида, имя файла для следующего этапа
+    """
+    settings.FEEDS_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    # Уникальный файл: с пулом `threads` несколько загрузок
+    # выполняются в одном процессе одновременно
+    file_ = tempfile.NamedTemporaryFile(dir=settings.FEEDS_DIR,
+                                        suffix='.xml.part',
+                                        delete=False)
+    tmp_path = Path(file_.name)
+    try:
+        with file_:
+            async with http_client.stream(
+                method='GET',
+                url=settings.XML_END_POINT_URL,
+            ) as response:
+                async for chunk in response.aiter_bytes():
+                    digest.update(chunk)
+                    file_.write(chunk)
+        feed_hash = digest.hexdigest()
+        os.replace(tmp_path, get_feed_path(feed_hash=feed_hash))
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return feed_hash
+
+
+@celery_app.task(queue=settings.celery.QUEUE_FEEDS)
+async def ingest_feed_task(feed_hash: str) -> str:
+    """
+    Парсинг фида и сохранение продуктов одной транзакцией
+
+    Вместе с продуктами пересчитывается сводка за день.
+    После сохранения файл фида удаляется.
+
+    Returns:
+        str: Дата фида в формате ISO
+
+    Raises:
+        NoDataParseError: В фиде нет даты или продуктов
+    """
+    path = get_feed_path(feed_hash=feed_hash)
+    parser, date = open_feed(path=path)
+    values_to_save = (parser.attrs | item
+                      async for item
+                      in aiter_in_thread(parser.get_generator(),
+                                         size=settings.INGEST_BATCH_SIZE))
+    save_items = (ProductDAO.upsert_multiple
+                  if settings.INGEST_UPSERT
+                  else ProductDAO.copy_multiple)
     async with db_connection.session() as session:
-        await ProductDAO.add_multiple(
+        parsed_count = await save_items(
             session=session,
             list_values=values_to_save,
+            batch_size=settings.INGEST_BATCH_SIZE,
+            before_commit=partial(
+                refresh_summary,
+                date=date,
+            ),
         )
+    if not parsed_count:
+        raise NoDataParseError('Нет данных для обработки')
+    path.unlink(missing_ok=True)
+    return date.isoformat()
+
+
+@celery_app.task(queue=settings.celery.QUEUE_ANALYTICS)
+async def aggregate_task(date: str) -> dict[str, str | list[dict[str, str]]]:
+    """
+    Составление запроса для LLM по сводке за день
+
+    Returns:
+        dict[str, str | list[dict[str, str]]]: Дата и запрос
+    """
+    async with db_connection.session() as session:
         prompt_maker = ProductPromptMaker(
             session=session,
-            date=date
+            date=date_type.fromisoformat(date),
         )
-    prompt = await prompt_maker.get_prompt()
-
-    while 1:
-        try:
-            async with httpx.AsyncClient(timeout=Timeout(None)) as client:
-                llm_response = await client.put(
-                    url=settings.LLM_END_POINT_URL,
-                    json=prompt,
-                )
-                await client.aclose()
-                break
-        except ConnectError:
-            logger.warning('Connection attempt failed, try 30 sec')
-            await client.aclose()
-            sleep(30.0)
-
-    answer = llm_response.json()
-    if answer:
-        answer = answer[0]
+        prompt = await prompt_maker.get_prompt()
+    return dict(date=date, prompt=prompt)
+
+
+@celery_app.task(
+    queue=settings.celery.QUEUE_LLM,
+    acks_late=True,
+    autoretry_for=(TransportError,),
+    retry_backoff=True,
+    max_retries=settings.celery.LLM_MAX_RETRIES,
+)
+async def llm_analyze_task(payload: dict[str, str | list[dict[str, str]]],
+                           ) -> dict[str, str] | None:
+    """
+    Запрос к LLM модели
+
+    С `settings.LLM_STREAM` ответ читается потоком
+    :func:`stream_llm_answer`.
+
+    Returns:
+        dict[str, str] | None: Дата и ответ модели, `None` \
+            если модель не ответила
+    """
+    if settings.LLM_STREAM:
+        answer = await stream_llm_answer(prompt=payload['prompt'])
     else:
+        llm_response = await http_client.request(
+            method='PUT',
+            url=settings.LLM_END_POINT_URL,
+            json=payload['prompt'],
+            timeout=Timeout(
+                timeout=settings.http.READ_TIMEOUT,
+                connect=settings.http.CONNECT_TIMEOUT,
+                read=settings.http.LLM_READ_TIMEOUT,
+            ),
+        )
+        answer = next(iter(llm_response.json()), None)
+    if not answer:
+        return None
+    return dict(date=payload['date'], answer=answer)
+
+
+@celery_app.task(queue=settings.celery.QUEUE_ANALYTICS)
+async def persist_answer_task(payload: dict[str, str] | None) -> None:
+    """
+    Сохранение ответа LLM модели
+    """
+    if payload is None:
         return
     async with db_connection.session() as session:
         await AnswerDAO.add(
             session=session,
-            date=date,
-            answer=answer,
+            date=date_type.fromisoformat(payload['date']),
+            answer=payload['answer'],
             )
 
 
+def analize_pipeline() -> Signature:
+    """
+    Цепочка задач анализа продаж
+
+    Этапы передают друг другу только хэш фида, дату
+    и небольшие запрос и ответ LLM, поэтому падение этапа
+    повторяет только его. Каждый этап маршрутизируется
+    в свою очередь, см. `settings.celery`.
+    """
+    return chain(
+        fetch_feed_task.s(),
+        ingest_feed_task.s(),
+        aggregate_task.s(),
+        llm_analyze_task.s(),
+        persist_answer_task.s(),
+    )
+
+
+@celery_app.task(queue=settings.celery.QUEUE_ANALYTICS)
+async def get_analize_products_endpoint_task() -> str:
+    """
+    Задача по анализу продаж за день.
+
+    Запускает цепочку :func:`analize_pipeline`:
+    скачивание фида, парсинг и сохранение продуктов
+    вместе со сводкой за день, составление запроса,
+    запрос к LLM модели и сохранение ответа.
+
+    Результат сохраняется в отдельную таблицу в базе данных,
+    и может помочь при дальнейшем анализе.
+
+    Returns:
+        str: ID последней задачи цепочки
+    """
+    return analize_pipeline().apply_async().id
+
+
 celery_app.conf.beat_schedule = {
     'task-every-day-analizer': {
         'task': 'task_schedule.tasks.get_analize_products_endpoint_task',
@@ -0,0 +1,38 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config.celery.connection import EventLoopThread
+
+
+class TestEventLoopThread:
+    """
+    Тесты цикла событий воркера
+    """
+
+    def test_run_concurrent(self):
+        loop_thread = EventLoopThread()
+
+        async def sleep() -> int:
+            await asyncio.sleep(0.2)
+            return id(asyncio.get_running_loop())
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            loops = list(executor.map(lambda _: loop_thread.run(sleep()),
+                                      range(4)))
+        assert time.perf_counter() - start < 0.6
+        assert len(set(loops)) == 1
+        loop_thread.stop(callbacks=[])
+
+    def test_stop_callbacks(self):
+        loop_thread = EventLoopThread()
+        closed = []
+
+        async def close() -> None:
+            closed.append(True)
+
+        loop_thread.run(asyncio.sleep(0))
+        loop_thread.stop(callbacks=[close])
+        assert closed == [True]
+        assert not loop_thread.is_running
@@ -0,0 +1,34 @@
+import datetime
+
+import pytest
+
+from parsers.base_parser.exeptions import NoDataParseError
+from task_schedule.tasks import open_feed
+
+
+def write_feed(tmp_path, attrs: str):
+    path = tmp_path.joinpath('feed.xml')
+    path.write_text(f'''<?xml version="1.0" encoding="utf-8"?>
+    <sales_data {attrs}>
+    <products>
+    <product>
+    <id>1</id>
+    <name>Product A</name>
+    <quantity>100</quantity>
+    <price>1500.00</price>
+    <category>Electronics</category>
+    </product>
+    </products>
+    </sales_data>''', encoding='utf-8')
+    return path
+
+
+def test_open_feed(tmp_path):
+    _, date = open_feed(path=write_feed(tmp_path, 'date="2024-01-01"'))
+    assert date == datetime.date(2024, 1, 1)
+
+
+@pytest.mark.parametrize('attrs', ['', 'date="yesterday"'])
+def test_open_feed_without_date(tmp_path, attrs):
+    with pytest.raises(NoDataParseError):
+        open_feed(path=write_feed(tmp_path, attrs))
@@ -0,0 +1,89 @@
+import httpx
+import pytest
+
+from config import settings
+from config.http_client.client_helper import (
+    HTTPClientHelper,
+    RetryBudgetError,
+    aiter_sse,
+    )
+
+
+def make_client(responses: list[httpx.Response | Exception],
+                **config,
+                ) -> tuple[HTTPClientHelper, list[httpx.Request]]:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client = HTTPClientHelper(
+        config=settings.http.model_copy(update=dict(RETRY_BACKOFF=0.0,
+                                                    **config)),
+        transport=httpx.MockTransport(handler),
+    )
+    return client, requests
+
+
+class TestHTTPClient:
+    """
+    Тесты HTTP клиента с повтором запросов
+    """
+
+    @pytest.mark.asyncio
+    async def test_retry_connect_error(self):
+        client, requests = make_client([
+            httpx.ConnectError('refused'),
+            httpx.Response(503),
+            httpx.Response(200, json=['answer']),
+        ])
+        response = await client.request(method='PUT', url='http://llm/')
+        assert response.json() == ['answer']
+        assert len(requests) == 3
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_retry_budget(self):
+        client, requests = make_client(
+            [httpx.ConnectError('refused')] * 5,
+            RETRY_ATTEMPTS=3,
+        )
+        with pytest.raises(RetryBudgetError):
+            await client.request(method='GET', url='http://xml/')
+        assert len(requests) == 3
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_status_error(self):
+        client, _ = make_client([httpx.Response(404)])
+        with pytest.raises(httpx.HTTPStatusError):
+            async with client.stream(method='GET', url='http://xml/'):
+                pass
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_reuse_client(self):
+        client, _ = make_client([httpx.Response(200), httpx.Response(200)])
+        await client.request(method='GET', url='http://xml/')
+        first = client.get_client()
+        await client.request(method='GET', url='http://xml/')
+        assert client.get_client() is first
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_server_events(self):
+        content = (': ping\n\n'
+                   'data: {"text": "Hello"}\n\n'
+                   'data: {"text": ", world"}\n\n'
+                   'event: done\ndata: {}\n\n')
+        client, _ = make_client([httpx.Response(200, text=content)])
+        async with client.stream(method='PUT', url='http://llm/') as response:
+            events = [event async for event in aiter_sse(response=response)]
+        assert events == [('message', {'text': 'Hello'}),
+                          ('message', {'text': ', world'}),
+                          ('done', {})]
+        await client.aclose()
@@ -38,9 +38,9 @@ This is very important for my career""",
 @pytest.mark.asyncio
 async def test_prompt_maker_best(client, get_async_session, get_list_items):
     values = (value for value in get_list_items)
-    await ProductDAO.add_multiple(session=get_async_session,
-                                  list_values=values,
-                                  )
+    await ProductDAO.copy_multiple(session=get_async_session,
+                                   list_values=values,
+                                   )
     date = datetime.date(2024, 1, 1)
     three_best = await (ProductPromptMaker(
         session=get_async_session,
@@ -82,6 +82,34 @@ async def test_prompt_maker_categories(client,
                           'Tools']
 
 
+@pytest.mark.asyncio
+async def test_prompt_maker_aggregate(client,
+                                      get_async_session,
+                                      get_list_items,
+                                      ):
+    date = datetime.date(2024, 1, 1)
+    prompt_maker = ProductPromptMaker(
+        session=get_async_session,
+        date=date,
+        )
+    aggregate = await prompt_maker.get_daily_aggregate(
+        session=get_async_session,
+        date=date,
+        )
+    assert aggregate.top_products == await prompt_maker.get_three_best_price(
+        session=get_async_session,
+        date=date,
+        )
+    assert aggregate.revenue == await prompt_maker.get_total_revenue(
+        session=get_async_session,
+        date=date,
+        )
+    assert aggregate.categories == await prompt_maker.get_categories(
+        session=get_async_session,
+        date=date,
+        )
+
+
 @pytest.mark.asyncio
 async def test_prompt_maker(client, get_async_session, get_list_items):
     date = datetime.date(2024, 1, 1)
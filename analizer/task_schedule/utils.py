@@ -1,11 +1,15 @@
+import asyncio
+from itertools import islice
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import Select, desc
+from sqlalchemy import Select
 from sqlalchemy.sql import func
 from datetime import date
-from typing import Iterable, Generator
+from typing import Any, AsyncGenerator, Iterable, Generator
 
 from .task_types import TD, TemplateFunc
-from config.models import Product
+from config.models import Product, Base
+from api_v1.products.schemas import DailyAggregateSchema
+from api_v1.sales_summary.dao import DailySalesSummaryDAO
 from .promts import analysys_prompt
 
 
@@ -45,6 +49,42 @@ def union_each_one_data(data: TD,
         yield data | each
 
 
+def get_model_schema(model: type[Base]) -> dict[str, type[Any]]:
+    """
+    Схема типов колонок модели для
+    :class:`parsers.type_converters.SchemaTypeConverter`
+
+    Args:
+        model (type[Base]): Модель таблицы.
+
+    Returns:
+        dict[str, type[Any]]: Словарь `колонка -> тип Python`.
+    """
+    return {column.name: column.type.python_type
+            for column
+            in model.__table__.columns}
+
+
+async def aiter_in_thread(iterable: Iterable[Any],
+                          size: int,
+                          ) -> AsyncGenerator[Any, None]:
+    """
+    Асинхронный вывод синхронного потока
+
+    Пачки по `size` сущностей читаются в пуле потоков, поэтому
+    парсинг не блокирует общий цикл событий воркера.
+
+    Args:
+        iterable (Iterable[Any]): Синхронный поток, например \
+            генератор парсера.
+        size (int): Размер пачки.
+    """
+    iterator = iter(iterable)
+    while batch := await asyncio.to_thread(list, islice(iterator, size)):
+        for item in batch:
+            yield item
+
+
 class ProductPromptMaker:
     """
     Класс генерации запроса для LLM.
@@ -96,7 +136,7 @@ class ProductPromptMaker:
         """
         stmt = (Select(self.model.name, self.model.quantity)
                 .where(self.model.date == date)
-                .order_by(desc(self.model.quantity))
+                .order_by(*DailySalesSummaryDAO.top_order())
                 .limit(3))
         result = await session.scalars(statement=stmt)
         return list(result)
@@ -126,31 +166,50 @@ class ProductPromptMaker:
         result = await session.scalars(statement=stmt)
         return list(result)
 
+    async def get_daily_aggregate(self,
+                                  session: AsyncSession,
+                                  date: date,
+                                  top: int = 3,
+                                  ) -> DailyAggregateSchema:
+        """
+        Лучшие продукты, общая выручка и категории за один запрос
+
+        Та же агрегация, что и у дневной сводки,
+        :class:`DailySalesSummaryDAO.aggregate`, поэтому запрос
+        со сводкой и без нее одинаковый.
+        """
+        values = await DailySalesSummaryDAO.aggregate(session=session,
+                                                      date=date,
+                                                      top=top)
+        if values is None:
+            return DailyAggregateSchema(date=date,
+                                        revenue=None,
+                                        top_products=[],
+                                        categories=[])
+        return DailySalesSummaryDAO.to_aggregate(
+            date=date,
+            revenue=values['revenue'],
+            top_products=values['top_products'],
+            category_revenue=values['category_revenue'],
+            top=top,
+        )
+
     async def get_prompt(self) -> list[dict[str, str]]:
         """
         Получение готового запроса для LLM
         со всеми готовыми данными
+
+        Данные берутся из сводки за день, если ее нет -
+        агрегируются из продуктов.
         """
-        date = self.date.strftime('%Y-%m-%d')
-        best_tree = await self.get_three_best_price(
+        aggregate = await DailySalesSummaryDAO.get_aggregate(
             session=self._session,
             date=self.date,
         )
-        best_tree = ', '.join(best_tree)
-        revenue = await self.get_total_revenue(
-            session=self._session,
-            date=self.date,
-        )
-        revenue = str(revenue)
-        categories = await self.get_categories(
-            session=self._session,
-            date=self.date,
-        )
-        categories = ', '.join(categories)
-        prompt = self.template(
-            date=date,
-            revenue=revenue,
-            products=best_tree,
-            categories=categories,
-        )
+        if aggregate is None:
+            aggregate = await self.get_daily_aggregate(
+                session=self._session,
+                date=self.date,
+            )
+        prompt = self.template(**aggregate.template_values())
         return prompt
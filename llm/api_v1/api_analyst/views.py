@@ -1,6 +1,16 @@
-from fastapi import APIRouter
+import asyncio
+import json
+import threading
+from collections.abc import AsyncGenerator, AsyncIterable
+from http import HTTPStatus
+from typing import Annotated
+from fastapi import APIRouter, Header, Response
+from fastapi.responses import StreamingResponse
 
-from llm_analizer import Qwen
+from config import settings
+from config.setup_logs.logging import logger
+from llm_analizer import executor, registry, response_cache
+from llm_analizer.exeptions import ModelNotReadyError
 from .schemas import GetDataAnalystSchema
 
 
@@ -13,7 +23,174 @@ router = APIRouter(prefix='/llm',
             description='Send Prompt to Analyst',
             name='Request to Analyst',
             )
-async def request_analys(message: list[GetDataAnalystSchema]) -> list[str]:
-    analyst = Qwen
-    response = analyst.send_answer(message)
-    return response
+async def request_analys(
+    message: list[GetDataAnalystSchema],
+    response: Response,
+    cache_control: Annotated[str | None, Header()] = None,
+) -> list[str]:
+    analyst = registry.get()
+    key = analyst.cache_key(message)
+    bypass = is_cache_bypass(cache_control=cache_control)
+    answer = None if bypass else await response_cache.get(key)
+    response.headers['X-Cache'] = cache_status(answer=answer, bypass=bypass)
+    if answer is not None:
+        return [answer]
+    answer = await executor.submit(analyst.send_answers, message)
+    if answer.complete:
+        await response_cache.set(key, answer.texts[0])
+    return answer.texts
+
+
+def is_cache_bypass(cache_control: str | None) -> bool:
+    """
+    Запрос без чтения кэша: `Cache-Control: no-cache`
+
+    Новый ответ все равно сохраняется в кэш.
+    """
+    return cache_control is not None and 'no-cache' in cache_control.lower()
+
+
+def cache_status(answer: str | None, bypass: bool) -> str:
+    """
+    Значение заголовка `X-Cache` ответа
+    """
+    if bypass:
+        return 'BYPASS'
+    return 'MISS' if answer is None else 'HIT'
+
+
+def sse_event(data: dict, event: str | None = None) -> str:
+    """
+    Событие server-sent events
+    """
+    head = f'event: {event}\n' if event else ''
+    return f'{head}data: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+SSE_PING = ': ping\n\n'
+
+
+async def with_keepalive(tokens: AsyncIterable[str],
+                         interval: float,
+                         ) -> AsyncGenerator[str | None, None]:
+    """
+    Куски ответа и `None` каждые `interval` секунд без них
+
+    Пока запрос ждет поток модели или первый токен, клиент
+    получает keep-alive и не закрывает соединение по таймауту
+    чтения. При закрытии ожидание следующего куска отменяется.
+    """
+    iterator = aiter(tokens)
+    pending = None
+    try:
+        while 1:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(iterator))
+            done, _ = await asyncio.wait((pending,), timeout=interval)
+            if not done:
+                yield None
+                continue
+            task, pending = pending, None
+            try:
+                text = task.result()
+            except StopAsyncIteration:
+                return
+            yield text
+    finally:
+        if pending is not None:
+            pending.cancel()
+            await asyncio.wait((pending,))
+        if hasattr(iterator, 'aclose'):
+            await iterator.aclose()
+
+
+async def sse_tokens(tokens: AsyncIterable[str],
+                     key: str | None = None,
+                     complete: threading.Event | None = None,
+                     ping: float = settings.LLM.STREAM_PING_INTERVAL,
+                     ) -> AsyncGenerator[str, None]:
+    """
+    Куски ответа модели событиями `data`, в конце `done` или `error`
+
+    Без новых кусков каждые `ping` секунд отдается комментарий
+    `: ping`. Ответ сохраняется в кэш по `key`, только если
+    установлено событие `complete`: генерация закончилась сама,
+    а не по `max_time` или отключению клиента.
+    """
+    parts = []
+    try:
+        async for text in with_keepalive(tokens=tokens, interval=ping):
+            if text is None:
+                yield SSE_PING
+                continue
+            parts.append(text)
+            yield sse_event(dict(text=text))
+    except Exception as ex:
+        logger.exception(ex)
+        yield sse_event(dict(message=getattr(ex, 'detail', repr(ex))),
+                        event='error')
+        return
+    if key is not None and complete is not None and complete.is_set():
+        await response_cache.set(key, ''.join(parts))
+    yield sse_event({}, event='done')
+
+
+async def cached_tokens(answer: str) -> AsyncGenerator[str, None]:
+    """
+    Ответ из кэша одним куском
+    """
+    yield answer
+
+
+@router.put(path='/analyst-manager/stream',
+            description='Send Prompt to Analyst, stream answer as SSE',
+            name='Streaming request to Analyst',
+            response_class=StreamingResponse,
+            )
+async def stream_analys(
+    message: list[GetDataAnalystSchema],
+    cache_control: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    analyst = registry.get()
+    key = analyst.cache_key(message)
+    bypass = is_cache_bypass(cache_control=cache_control)
+    answer = None if bypass else await response_cache.get(key)
+    if answer is not None:
+        content = sse_tokens(tokens=cached_tokens(answer=answer))
+    else:
+        complete = threading.Event()
+
+        def stream_answer(answer, **kwargs) -> None:
+            if analyst.stream_answer(answer, **kwargs):
+                complete.set()
+
+        tokens = executor.stream(stream_answer, message)
+        content = sse_tokens(tokens=tokens, key=key, complete=complete)
+    return StreamingResponse(
+        content=content,
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache',
+                 'X-Accel-Buffering': 'no',
+                 'X-Cache': cache_status(answer=answer, bypass=bypass)},
+    )
+
+
+@router.get(path='/ready',
+            description='Models and tokenizers are loaded',
+            name='Readiness',
+            )
+async def get_ready() -> dict[str, dict[str, bool]]:
+    if not registry.ready:
+        raise ModelNotReadyError(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail=registry.status(),
+        )
+    return registry.status()
+
+
+@router.get(path='/queue',
+            description='Inference queue state',
+            name='Inference queue',
+            )
+async def get_queue() -> dict[str, int]:
+    return executor.status()
@@ -73,7 +73,9 @@ def register_errors(app: FastAPI) -> None:
             error_code=exc.status_code,
             message=exc.detail,
         )
-        return JSONResponse(response)
+        return JSONResponse(response,
+                            status_code=exc.status_code,
+                            headers=exc.headers)
 
     @app.exception_handler(Exception)
     async def error_handler(
@@ -105,4 +107,6 @@ def register_errors(app: FastAPI) -> None:
             error_code=exc.status_code,
             message=exc.detail,
         )
-        return JSONResponse(response)
+        return JSONResponse(response,
+                            status_code=exc.status_code,
+                            headers=exc.headers)
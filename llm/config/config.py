@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import BaseModel
 from starlette.config import Config
@@ -7,6 +8,7 @@ from starlette.config import Config
 base_dir = Path(__file__).resolve().parent.parent
 log_dir = base_dir.joinpath('logs')
 cache_dir_model = base_dir.joinpath('llm_analizer', 'qwen')
+cache_dir_answers = base_dir.joinpath('cache')
 
 
 config = Config('.env')
@@ -21,6 +23,21 @@ class QWEN2Settings(BaseModel):
     CACHE_DIR: Path = cache_dir_model.absolute()
 
 
+class CacheSettings(BaseModel):
+    """
+    Настройки кэша ответов LLM модели
+    """
+    BACKEND: Literal['memory', 'sqlite', 'postgres', 'none'] = config(
+        'LLM_CACHE_BACKEND',
+        default='memory',
+    )
+    TTL: int = 7 * 24 * 60 * 60
+    MAX_SIZE: int = 1_024
+    SQLITE_PATH: Path = cache_dir_answers.joinpath('answers.sqlite3')
+    POSTGRES_DSN: str | None = config('LLM_CACHE_POSTGRES_DSN', default=None)
+    POSTGRES_TABLE: str = 'llm_answer_cache'
+
+
 class LLMSettings(BaseModel):
     """
     Настройки LLM моделей
@@ -30,6 +47,14 @@ class LLMSettings(BaseModel):
     TORCH_DTYPE: str = config('TORCH_DTYPE')
     DEVICE_MAP: str = config('DEVICE_MAP')
     REVISION: str = config('REVISION')
+    WARMUP: bool = True
+    INFERENCE_WORKERS: int = 1
+    MAX_QUEUE: int = 8
+    REQUEST_TIMEOUT: float = 300.0
+    BATCH_SIZE: int = 4
+    BATCH_WAIT_MS: float = 20.0
+    STREAM_PING_INTERVAL: float = 15.0
+    CACHE: CacheSettings = CacheSettings()
 
 
 class Settings(BaseSettings):
@@ -1,4 +1,11 @@
 from .llm import Qwen
+from .registry import registry
+from .executor import executor
+from .cache import response_cache
 
 
-__all__ = ('Qwen',)
+__all__ = ('Qwen',
+           'registry',
+           'executor',
+           'response_cache',
+           )
@@ -0,0 +1,308 @@
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from time import monotonic, time
+
+from prometheus_client import Counter
+
+from config import settings
+from config.config import CacheSettings
+from config.setup_logs.logging import logger
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+
+CACHE_HITS = Counter('llm_cache_hits_total',
+                     'Ответы LLM модели из кэша',
+                     ['backend'])
+CACHE_MISSES = Counter('llm_cache_misses_total',
+                       'Запросы к LLM модели без ответа в кэше',
+                       ['backend'])
+CACHE_ERRORS = Counter('llm_cache_errors_total',
+                       'Ошибки хранилища кэша ответов LLM модели',
+                       ['backend', 'operation'])
+
+
+class CacheBackend(ABC):
+    """
+    Хранилище ответов: ключ -> текст, с TTL и ограничением размера
+    """
+    name: str
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """
+    LRU кэш в памяти процесса
+    """
+    name = 'memory'
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> str | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._items[key] = (monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Кэш в файле SQLite, переживает перезапуск сервиса
+
+    Запросы к файлу выполняются в отдельном потоке, при
+    превышении `max_size` удаляются давно не читанные ответы.
+    """
+    name = 'sqlite'
+
+    def __init__(self, path: Path, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS answers ('
+                'key TEXT PRIMARY KEY, '
+                'value TEXT NOT NULL, '
+                'created REAL NOT NULL, '
+                'used REAL NOT NULL)'
+            )
+
+    def _get(self, key: str) -> str | None:
+        now = time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                'SELECT value, created FROM answers WHERE key = ?', (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if created + self.ttl < now:
+                self._connection.execute(
+                    'DELETE FROM answers WHERE key = ?', (key,),
+                )
+                return None
+            self._connection.execute(
+                'UPDATE answers SET used = ? WHERE key = ?', (now, key),
+            )
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        now = time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)',
+                (key, value, now, now),
+            )
+            self._connection.execute(
+                'DELETE FROM answers WHERE created < ? OR key IN ('
+                'SELECT key FROM answers ORDER BY used DESC '
+                'LIMIT -1 OFFSET ?)',
+                (now - self.ttl, self.max_size),
+            )
+
+    async def get(self, key: str) -> str | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, key, value)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class PostgresCache(CacheBackend):
+    """
+    Кэш в Postgres анализатора, общий для нескольких экземпляров
+
+    Требует `asyncpg`, таблица создается при первом запросе.
+    Миграции анализатора ее не трогают: имя по умолчанию
+    исключено в `async_alembic/env.py`, другое имя нужно
+    добавить туда же.
+    """
+    name = 'postgres'
+
+    def __init__(self, dsn: str, table: str, ttl: float, max_size: int,
+                 ) -> None:
+        if asyncpg is None:
+            raise RuntimeError('Для кэша в Postgres установите asyncpg')
+        self.dsn = dsn
+        self.table = table
+        self.ttl = ttl
+        self.max_size = max_size
+        self._pool: asyncpg.Pool | None = None
+        self._pool_lock = asyncio.Lock()
+
+    async def _get_pool(self) -> 'asyncpg.Pool':
+        async with self._pool_lock:
+            if self._pool is None:
+                pool = await asyncpg.create_pool(dsn=self.dsn,
+                                                 min_size=1,
+                                                 max_size=2)
+                await pool.execute(
+                    f'CREATE TABLE IF NOT EXISTS {self.table} ('
+                    'key TEXT PRIMARY KEY, '
+                    'value TEXT NOT NULL, '
+                    'created TIMESTAMPTZ NOT NULL DEFAULT now(), '
+                    'used TIMESTAMPTZ NOT NULL DEFAULT now())'
+                )
+                self._pool = pool
+        return self._pool
+
+    async def get(self, key: str) -> str | None:
+        pool = await self._get_pool()
+        return await pool.fetchval(
+            f'UPDATE {self.table} SET used = now() '
+            'WHERE key = $1 '
+            "AND created > now() - $2 * interval '1 second' "
+            'RETURNING value',
+            key,
+            self.ttl,
+        )
+
+    async def set(self, key: str, value: str) -> None:
+        pool = await self._get_pool()
+        async with pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.execute(
+                    f'INSERT INTO {self.table} (key, value) VALUES ($1, $2) '
+                    'ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, '
+                    'created = now(), used = now()',
+                    key,
+                    value,
+                )
+                await connection.execute(
+                    f'DELETE FROM {self.table} '
+                    "WHERE created < now() - $1 * interval '1 second' "
+                    f'OR key IN (SELECT key FROM {self.table} '
+                    'ORDER BY used DESC OFFSET $2)',
+                    self.ttl,
+                    self.max_size,
+                )
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def create_backend(config: CacheSettings) -> CacheBackend | None:
+    """
+    Хранилище по настройке `BACKEND`, `none` - без кэша
+    """
+    match config.BACKEND:
+        case 'memory':
+            return MemoryCache(ttl=config.TTL, max_size=config.MAX_SIZE)
+        case 'sqlite':
+            return SQLiteCache(path=config.SQLITE_PATH,
+                               ttl=config.TTL,
+                               max_size=config.MAX_SIZE)
+        case 'postgres':
+            return PostgresCache(dsn=config.POSTGRES_DSN,
+                                 table=config.POSTGRES_TABLE,
+                                 ttl=config.TTL,
+                                 max_size=config.MAX_SIZE)
+    return None
+
+
+class ResponseCache:
+    """
+    Кэш ответов LLM модели по хэшу запроса.
+
+    Один и тот же запрос (например повторный анализ за ту же
+    дату) дает тот же ответ, поэтому генерация не повторяется.
+    Ключ - :class:`Qwen2LLM.cache_key`: хэш запроса после шаблона
+    чата, имени и ревизии модели и параметров генерации.
+    Попадания и промахи считаются в метриках
+    `llm_cache_hits_total` и `llm_cache_misses_total`.
+
+    Ошибки хранилища (файл заблокирован, Postgres недоступен)
+    не прерывают запрос: они пишутся в лог и метрику
+    `llm_cache_errors_total`, неудачное чтение считается
+    промахом, неудачная запись пропускается.
+
+    ## Примеры:
+    ```python
+    key = analyst.cache_key(message)
+    answer = await response_cache.get(key)
+    if answer is None:
+        answer = ...
+        await response_cache.set(key, answer)
+    ```
+    """
+
+    def __init__(self, backend: CacheBackend | None) -> None:
+        self.backend = backend
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _error(self, ex: Exception, operation: str) -> None:
+        logger.exception(f'Ошибка кэша {self.backend.name} '
+                         f'при {operation}: {ex!r}')
+        CACHE_ERRORS.labels(backend=self.backend.name,
+                            operation=operation).inc()
+
+    async def get(self, key: str) -> str | None:
+        if self.backend is None:
+            return None
+        try:
+            value = await self.backend.get(key)
+        except Exception as ex:
+            self._error(ex=ex, operation='get')
+            value = None
+        counter = CACHE_MISSES if value is None else CACHE_HITS
+        counter.labels(backend=self.backend.name).inc()
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(key, value)
+        except Exception as ex:
+            self._error(ex=ex, operation='set')
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+response_cache = ResponseCache(backend=create_backend(settings.LLM.CACHE))
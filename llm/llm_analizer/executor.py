@@ -0,0 +1,275 @@
+import asyncio
+import threading
+import weakref
+from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from time import monotonic
+from typing import Any, Callable
+
+from config import settings
+from .exeptions import InferenceTimeoutError, QueueFullError
+
+
+BatchFunc = Callable[..., list[Any]]
+StreamFunc = Callable[..., None]
+
+_STREAM_END = object()
+
+
+@dataclass
+class _Job:
+    item: Any
+    deadline: float
+    future: asyncio.Future = field(repr=False)
+
+
+class InferenceExecutor:
+    """
+    Исполнитель запросов к LLM модели с объединением в пачки.
+
+    `generate()` блокирует поток на все время генерации, поэтому
+    пачки выполняются в отдельных потоках `workers`, а цикл
+    событий uvicorn остается свободным для других запросов.
+
+    Одновременные запросы к одной функции собираются в пачку
+    до `batch_size` запросов или `batch_wait_ms` после первого
+    и выполняются одним вызовом `func(items, max_time=...)`,
+    результаты раздаются в порядке запросов. Пока все потоки
+    заняты, пачка продолжает набираться.
+
+    Одновременно ожидают и выполняются не больше `max_queue`
+    запросов, остальные сразу получают `503` с `Retry-After`.
+    Запрос ограничен `timeout` секунд вместе с ожиданием
+    в очереди: пачка получает `max_time` по самому раннему
+    сроку, а запрос, не дождавшийся своей пачки, отменяется.
+
+    Потоковый запрос :class:`InferenceExecutor.stream` занимает
+    поток целиком и отдает текст по мере генерации.
+
+    ## Примеры:
+    ```python
+    answer = await executor.submit(llm.send_answers, message)
+    async for text in executor.stream(llm.stream_answer, message):
+        ...
+    ```
+    """
+
+    def __init__(self,
+                 workers: int = settings.LLM.INFERENCE_WORKERS,
+                 max_queue: int = settings.LLM.MAX_QUEUE,
+                 timeout: float = settings.LLM.REQUEST_TIMEOUT,
+                 batch_size: int = settings.LLM.BATCH_SIZE,
+                 batch_wait_ms: float = settings.LLM.BATCH_WAIT_MS,
+                 ) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self.pending = 0
+        self.batches = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix='inference')
+        self._queues: dict[BatchFunc, asyncio.Queue[_Job]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._slots: asyncio.Semaphore | None = None
+
+    @property
+    def busy(self) -> bool:
+        return self.pending >= self.max_queue
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        return self._slots
+
+    def _check_queue(self) -> None:
+        if self.busy:
+            raise QueueFullError(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Очередь запросов к модели заполнена',
+                headers={'Retry-After': str(int(self.timeout // 10) or 1)},
+            )
+
+    def _timeout_error(self) -> InferenceTimeoutError:
+        return InferenceTimeoutError(
+            status_code=HTTPStatus.GATEWAY_TIMEOUT,
+            detail=f'Запрос к модели дольше {self.timeout} сек',
+        )
+
+    def _get_queue(self, func: BatchFunc) -> asyncio.Queue[_Job]:
+        queue = self._queues.get(func)
+        if queue is None:
+            self._get_slots()
+            queue = self._queues[func] = asyncio.Queue()
+            self._create_task(self._dispatch(func=func, queue=queue))
+        return queue
+
+    def _create_task(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _collect(self,
+                       queue: asyncio.Queue[_Job],
+                       first: _Job,
+                       ) -> list[_Job]:
+        """
+        Сбор пачки: первый запрос и те, что придут за `batch_wait`
+        """
+        jobs = [first]
+        end = monotonic() + self.batch_wait
+        while len(jobs) < self.batch_size:
+            timeout = end - monotonic()
+            try:
+                if timeout > 0:
+                    job = await asyncio.wait_for(queue.get(), timeout=timeout)
+                else:
+                    job = queue.get_nowait()
+            except (TimeoutError, asyncio.QueueEmpty):
+                break
+            jobs.append(job)
+        return [job for job in jobs if not job.future.done()]
+
+    async def _dispatch(self,
+                        func: BatchFunc,
+                        queue: asyncio.Queue[_Job],
+                        ) -> None:
+        while 1:
+            # Поток занимается только при наличии запроса,
+            # иначе ожидающий диспетчер блокирует потоковые запросы
+            first = await queue.get()
+            await self._slots.acquire()
+            jobs = await self._collect(queue=queue, first=first)
+            if not jobs:
+                self._slots.release()
+                continue
+            self._create_task(self._run_batch(func=func, jobs=jobs))
+
+    async def _run_batch(self, func: BatchFunc, jobs: list[_Job]) -> None:
+        loop = asyncio.get_running_loop()
+        max_time = max(0.0, min(job.deadline for job in jobs) - monotonic())
+        self.batches += 1
+        try:
+            results = await loop.run_in_executor(
+                self._executor,
+                lambda: func([job.item for job in jobs], max_time=max_time),
+            )
+        except Exception as ex:
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(ex)
+        else:
+            for job, result in zip(jobs, results):
+                if not job.future.done():
+                    job.future.set_result(result)
+        finally:
+            self._slots.release()
+
+    async def submit(self, func: BatchFunc, item: Any) -> Any:
+        """
+        Выполнение `item` в пачке `func(items, max_time=...)`
+
+        Raises:
+            QueueFullError: Очередь заполнена
+            InferenceTimeoutError: Превышено время запроса
+        """
+        self._check_queue()
+        self.pending += 1
+        job = _Job(item=item,
+                   deadline=monotonic() + self.timeout,
+                   future=asyncio.get_running_loop().create_future())
+        try:
+            self._get_queue(func=func).put_nowait(job)
+            return await asyncio.wait_for(job.future, timeout=self.timeout)
+        except TimeoutError:
+            raise self._timeout_error()
+        finally:
+            self.pending -= 1
+
+    def stream(self,
+               func: StreamFunc,
+               item: Any,
+               ) -> AsyncGenerator[str, None]:
+        """
+        Потоковое выполнение `func(item, on_text, max_time, stop)`
+
+        Очередь проверяется сразу, до начала ответа. Место
+        в очереди освобождается и если генератор не был запущен.
+
+        Raises:
+            QueueFullError: Очередь заполнена
+        """
+        self._check_queue()
+        self.pending += 1
+        released = threading.Event()
+
+        def release() -> None:
+            if not released.is_set():
+                released.set()
+                self.pending -= 1
+
+        tokens = self._stream(func=func, item=item, release=release)
+        weakref.finalize(tokens, release)
+        return tokens
+
+    async def _stream(self,
+                      func: StreamFunc,
+                      item: Any,
+                      release: Callable[[], None],
+                      ) -> AsyncGenerator[str, None]:
+        """
+        Текст из потока генерации через очередь цикла событий
+
+        При закрытии генератора (отключение клиента) генерация
+        останавливается событием `stop`, поток освобождается
+        после ее завершения.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = monotonic() + self.timeout
+        slots = self._get_slots()
+        queue: asyncio.Queue[Any] = asyncio.Queue()
+        stop = threading.Event()
+        try:
+            try:
+                await asyncio.wait_for(slots.acquire(), timeout=self.timeout)
+            except TimeoutError:
+                raise self._timeout_error()
+
+            def put(value: Any) -> None:
+                loop.call_soon_threadsafe(queue.put_nowait, value)
+
+            def run() -> None:
+                try:
+                    func(item,
+                         on_text=put,
+                         max_time=max(0.0, deadline - monotonic()),
+                         stop=stop)
+                finally:
+                    put(_STREAM_END)
+
+            future = loop.run_in_executor(self._executor, run)
+            future.add_done_callback(lambda _: slots.release())
+            while (text := await queue.get()) is not _STREAM_END:
+                yield text
+            await future
+        finally:
+            stop.set()
+            release()
+
+    def status(self) -> dict[str, int]:
+        return dict(pending=self.pending,
+                    max_queue=self.max_queue,
+                    workers=self.workers,
+                    batch_size=self.batch_size,
+                    batches=self.batches)
+
+    def shutdown(self) -> None:
+        for task in tuple(self._tasks):
+            task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+executor = InferenceExecutor()
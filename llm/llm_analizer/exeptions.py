@@ -0,0 +1,25 @@
+from starlette.exceptions import HTTPException
+
+
+class ModelNotReadyError(HTTPException):
+    """
+    Исключение вызванное не загруженной моделью
+    """
+
+    pass
+
+
+class QueueFullError(HTTPException):
+    """
+    Исключение вызванное переполненной очередью запросов к модели
+    """
+
+    pass
+
+
+class InferenceTimeoutError(HTTPException):
+    """
+    Исключение вызванное превышением времени запроса к модели
+    """
+
+    pass
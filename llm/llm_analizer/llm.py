@@ -1,3 +1,6 @@
+import hashlib
+import json
+import threading
 from pathlib import Path
 from transformers import (
     AutoTokenizer,
@@ -5,10 +8,60 @@ from transformers import (
     AutoModelForCausalLM,
     PreTrainedTokenizer,
     PreTrainedTokenizerFast,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextStreamer,
     )
-from typing import ClassVar
+from http import HTTPStatus
+from typing import Callable, ClassVar, NamedTuple
 
 from config import settings
+from config.setup_logs.logging import logger
+from .exeptions import ModelNotReadyError
+
+
+class CallbackStreamer(TextStreamer):
+    """
+    Передача готовых кусков текста в `on_text` во время генерации
+
+    Вызывается в потоке `generate()`, запрос и служебные
+    токены пропускаются.
+    """
+
+    def __init__(self,
+                 tokenizer: PreTrainedTokenizer | PreTrainedTokenizerFast,
+                 on_text: Callable[[str], None],
+                 ) -> None:
+        super().__init__(tokenizer, skip_prompt=True, skip_special_tokens=True)
+        self.on_text = on_text
+
+    def on_finalized_text(self, text: str, stream_end: bool = False) -> None:
+        if text:
+            self.on_text(text)
+
+
+class StopEventCriteria(StoppingCriteria):
+    """
+    Остановка генерации по событию, например при отключении клиента
+    """
+
+    def __init__(self, stop: threading.Event) -> None:
+        self.stop = stop
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.stop.is_set()
+
+
+class Answer(NamedTuple):
+    """
+    Ответ модели на запрос
+
+    `complete` - генерация закончилась на EOS или `max_new_tokens`,
+    а не по `max_time` или событию `stop`. Только такой ответ
+    можно сохранять в кэш.
+    """
+    texts: list[str]
+    complete: bool
 
 
 class Qwen2LLM:
@@ -25,8 +78,10 @@ class Qwen2LLM:
     - Обработка запроса LLM моделью.
 
     ## Методы:
-    - :class:`Qwen2LLM.load_model()` - загрузка модели локально\
-        в кэш.
+    - :class:`Qwen2LLM.load_model()` - загрузка модели и токенайзера\
+        в память процесса, один раз при старте приложения.
+    - :class:`Qwen2LLM.warmup()` - пробный запрос к модели.
+    - :class:`Qwen2LLM.is_ready()` - загружены ли модель и токенайзер.
     - :class:`Qwen2LLM.get_model_name_cache()` - вывод имени модели\
         которое будет использоваться для загрузки.
     - :class:`Qwen2LLM.get_locks_dir()` - вывод пути к папке модели\
@@ -35,6 +90,11 @@ class Qwen2LLM:
         которая будет использоваться для загрузки модели.
     - :class:`Qwen2LLM.send_answer(answer)` - запрос к LLM модели\
         для обрабоки данных.
+    - :class:`Qwen2LLM.send_answers(answers)` - пачка запросов\
+        одним вызовом `generate()`.
+    - :class:`Qwen2LLM.stream_answer(answer, on_text)` - запрос\
+        с передачей текста по мере генерации.
+    - :class:`Qwen2LLM.cache_key(answer)` - ключ ответа в кэше.
 
     ## Примеры:
     ```python
@@ -55,13 +115,26 @@ class Qwen2LLM:
     model_name: ClassVar[str] = settings.LLM.QWEN2.NAME
     cache_dir: ClassVar[Path] = settings.LLM.QWEN2.CACHE_DIR
     model: ClassVar[PreTrainedModel | None] = None
+    tokenizer: ClassVar[PreTrainedTokenizer |
+                        PreTrainedTokenizerFast |
+                        None] = None
+    warm: ClassVar[bool] = False
     torch_dtype: str = settings.LLM.TORCH_DTYPE
     device_map: str = settings.LLM.DEVICE_MAP
     revision: str = settings.LLM.REVISION
     max_tokens: int = settings.LLM.QWEN2.MAX_TOKENS
 
     @classmethod
-    def load_model(cls):
+    def load_model(cls) -> None:
+        """
+        Загрузка модели и токенайзера в память процесса
+
+        Модель скачивается в `cache_dir`, если ее там нет.
+        """
+        if cls.is_ready():
+            return
+        if not cls.get_cache_model_dir().exists():
+            logger.info(f'Модель {cls.model_name} не найдена в кэше, загрузка')
         cls.model = AutoModelForCausalLM.from_pretrained(
             cls.model_name,
             cache_dir=cls.cache_dir,
@@ -69,6 +142,30 @@ class Qwen2LLM:
             device_map=cls.device_map,
             revision=cls.revision,
         )
+        cls.model.eval()
+        cls.tokenizer = cls._get_tokinazer(cls.model_name)
+        # Пачка запросов дополняется слева, чтобы генерация
+        # продолжала каждый запрос сразу после его токенов
+        cls.tokenizer.padding_side = 'left'
+        if cls.tokenizer.pad_token is None:
+            cls.tokenizer.pad_token = cls.tokenizer.eos_token
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls.model is not None and cls.tokenizer is not None
+
+    @classmethod
+    def warmup(cls) -> None:
+        """
+        Пробный запрос на один токен
+
+        Первый `generate()` инициализирует ядра и кэши,
+        поэтому он выполняется до первого запроса.
+        """
+        model_inputs = cls.tokenizer(['warmup'],
+                                     return_tensors='pt').to(cls.model.device)
+        cls.model.generate(**model_inputs, max_new_tokens=1)
+        cls.warm = True
 
     @classmethod
     def _get_tokinazer(cls,
@@ -86,7 +183,7 @@ class Qwen2LLM:
                               tokenizer: (PreTrainedTokenizer |
                                           PreTrainedTokenizerFast),
                               message: list[dict[str, str]],
-                              ) -> list[int]:
+                              ) -> str:
         return tokenizer.apply_chat_template(
             message,
             tokenize=False,
@@ -98,17 +195,43 @@ class Qwen2LLM:
                   tokenizer: (PreTrainedTokenizer |
                               PreTrainedTokenizerFast),
                   model: PreTrainedModel,
-                  chat: list[str],
-                  ) -> str:
-        model_inputs = tokenizer([chat], return_tensors="pt").to(model.device)
+                  chats: list[str],
+                  max_time: float | None = None,
+                  ) -> list[Answer]:
+        model_inputs = tokenizer(chats,
+                                 return_tensors="pt",
+                                 padding=True).to(model.device)
         generated_ids = model.generate(
             **model_inputs,
             max_new_tokens=cls.max_tokens,
+            max_time=max_time,
             )
         generated_ids = [output_ids[len(input_ids):] for
                          input_ids, output_ids in
                          zip(model_inputs.input_ids, generated_ids)]
-        return tokenizer.batch_decode(generated_ids, skip_special_tokens=True)
+        texts = tokenizer.batch_decode(generated_ids, skip_special_tokens=True)
+        return [Answer(texts=[text], complete=cls._is_complete(ids))
+                for text, ids
+                in zip(texts, generated_ids)]
+
+    @classmethod
+    def _is_complete(cls, generated_ids) -> bool:
+        """
+        Генерация закончилась на EOS или `max_new_tokens`
+
+        Иначе ее остановили `max_time` или `stop`, и ответ
+        обрезан. В пачке после EOS идут `pad_token_id`.
+        """
+        if len(generated_ids) >= cls.max_tokens:
+            return True
+        config = cls.model.generation_config
+        stop_ids = set()
+        for token_id in (config.eos_token_id, config.pad_token_id):
+            if isinstance(token_id, int):
+                stop_ids.add(token_id)
+            elif token_id is not None:
+                stop_ids.update(token_id)
+        return not stop_ids.isdisjoint(generated_ids.tolist())
 
     @classmethod
     def get_model_name_cache(cls) -> str:
@@ -124,23 +247,108 @@ class Qwen2LLM:
         return cls.cache_dir.joinpath(cache_name)
 
     @classmethod
-    def send_answer(cls, answer: list[dict[str, str]]) -> list[str]:
-        if (not cls.get_locks_dir().exists() or
-            not cls.get_cache_model_dir().exists() or
-            not cls.model
-        ):
-            cls.load_model()
-        tokenizer = cls._get_tokinazer(cls.model_name)
-        chat = cls._apply_chat_tokenizer(
-            tokenizer=tokenizer,
-            message=answer,
+    def cache_key(cls, answer: list[dict[str, str]]) -> str:
+        """
+        Ключ ответа в кэше
+
+        Хэш запроса после шаблона чата, модели, ревизии
+        и параметров генерации: при смене любого из них
+        ответ генерируется заново.
+        """
+        generation = cls.model.generation_config.to_diff_dict()
+        generation.pop('transformers_version', None)
+        key = dict(
+            model=cls.model_name,
+            revision=cls.revision,
+            max_new_tokens=cls.max_tokens,
+            generation=generation,
+            chat=cls._apply_chat_tokenizer(tokenizer=cls.tokenizer,
+                                           message=answer),
         )
-        response = cls._response(
-            tokenizer=tokenizer,
+        return hashlib.sha256(
+            json.dumps(key, sort_keys=True, default=str).encode(),
+        ).hexdigest()
+
+    @classmethod
+    def send_answer(cls,
+                    answer: list[dict[str, str]],
+                    max_time: float | None = None,
+                    ) -> Answer:
+        """
+        Запрос к LLM модели
+
+        `max_time` - ограничение генерации в секундах, ответ
+        обрезается по истечении времени и не считается полным.
+        """
+        return cls.send_answers(answers=[answer], max_time=max_time)[0]
+
+    @classmethod
+    def send_answers(cls,
+                     answers: list[list[dict[str, str]]],
+                     max_time: float | None = None,
+                     ) -> list[Answer]:
+        """
+        Пачка запросов к LLM модели одним вызовом `generate()`
+
+        Ответы возвращаются в порядке запросов, у каждого
+        отмечено, закончилась ли генерация сама.
+        """
+        if not cls.is_ready():
+            raise ModelNotReadyError(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=f'Модель {cls.model_name} не загружена',
+            )
+        chats = [cls._apply_chat_tokenizer(tokenizer=cls.tokenizer,
+                                           message=answer)
+                 for answer
+                 in answers]
+        return cls._response(
+            tokenizer=cls.tokenizer,
             model=cls.model,
-            chat=chat
+            chats=chats,
+            max_time=max_time,
+        )
+
+    @classmethod
+    def stream_answer(cls,
+                      answer: list[dict[str, str]],
+                      on_text: Callable[[str], None],
+                      max_time: float | None = None,
+                      stop: threading.Event | None = None,
+                      ) -> bool:
+        """
+        Запрос к LLM модели с передачей текста по мере генерации
+
+        Куски текста передаются в `on_text` из потока генерации,
+        генерация прерывается установкой события `stop`.
+
+        Returns:
+            bool: Генерация закончилась на EOS или `max_new_tokens`, \
+                а не по `max_time` или `stop`.
+        """
+        if not cls.is_ready():
+            raise ModelNotReadyError(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=f'Модель {cls.model_name} не загружена',
+            )
+        chat = cls._apply_chat_tokenizer(tokenizer=cls.tokenizer,
+                                         message=answer)
+        model_inputs = cls.tokenizer([chat],
+                                     return_tensors="pt").to(cls.model.device)
+        stopping_criteria = StoppingCriteriaList()
+        if stop is not None:
+            stopping_criteria.append(StopEventCriteria(stop=stop))
+        generated_ids = cls.model.generate(
+            **model_inputs,
+            max_new_tokens=cls.max_tokens,
+            max_time=max_time,
+            streamer=CallbackStreamer(tokenizer=cls.tokenizer,
+                                      on_text=on_text),
+            stopping_criteria=stopping_criteria,
+            )
+        return cls._is_complete(
+            generated_ids[0][len(model_inputs.input_ids[0]):],
         )
-        return response
 
 
 Qwen = Qwen2LLM()
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+from config import settings
+from config.setup_logs.logging import logger
+from .exeptions import ModelNotReadyError
+from .llm import Qwen2LLM, Qwen
+
+
+class LLMRegistry:
+    """
+    Реестр LLM моделей процесса.
+
+    Модели и токенайзеры загружаются один раз при старте
+    приложения и хранятся в памяти процесса, запросы берут
+    готовую модель без обращений к диску.
+
+    ## Методы:
+    - :class:`LLMRegistry.register(name, llm)` - регистрация модели.
+    - :class:`LLMRegistry.load()` - загрузка и прогрев всех моделей.
+    - :class:`LLMRegistry.get(name)` - готовая модель по имени.
+    - :class:`LLMRegistry.status()` - состояние моделей.
+
+    ## Примеры:
+    ```python
+    registry.load()
+    answer = registry.get().send_answer(question)
+    ```
+    """
+
+    def __init__(self) -> None:
+        self._models: dict[str, Qwen2LLM] = {}
+
+    def register(self, name: str, llm: Qwen2LLM) -> None:
+        self._models[name] = llm
+
+    def load(self, warmup: bool = settings.LLM.WARMUP) -> None:
+        """
+        Загрузка моделей и токенайзеров, и пробный запрос
+        """
+        for name, llm in self._models.items():
+            logger.info(f'Загрузка модели {name}')
+            llm.load_model()
+            if warmup:
+                llm.warmup()
+            logger.info(f'Модель {name} готова')
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._models) and all(llm.is_ready()
+                                          for llm
+                                          in self._models.values())
+
+    def get(self, name: str = settings.LLM.MODEL) -> Qwen2LLM:
+        """
+        Готовая модель по имени
+
+        Raises:
+            ModelNotReadyError: Модель не зарегистрирована \
+                или не загружена
+        """
+        llm = self._models.get(name)
+        if llm is None or not llm.is_ready():
+            raise ModelNotReadyError(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=f'Модель {name} не готова',
+            )
+        return llm
+
+    def status(self) -> dict[str, dict[str, bool]]:
+        return {name: dict(ready=llm.is_ready(), warm=llm.warm)
+                for name, llm
+                in self._models.items()}
+
+
+registry = LLMRegistry()
+registry.register(settings.LLM.MODEL, Qwen)
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
@@ -5,25 +6,30 @@ from api_v1 import register_routers
 from app_includes import (
     register_errors,
     register_middlewares,
+    register_prometheus,
     )
-from llm_analizer import Qwen
+from llm_analizer import executor, registry, response_cache
 
 
 def start_app() -> FastAPI:
     """
     Создание приложения со всеми настройками
     """
-    Qwen.load_model()
     app = FastAPI(lifespan=lifespan)
     register_routers(app=app)
     register_errors(app=app)
     register_middlewares(app=app)
+    register_prometheus(app=app)
     return app
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Модели и токенайзеры загружаются один раз до приема запросов
+    await asyncio.to_thread(registry.load)
     yield
+    executor.shutdown()
+    await response_cache.close()
 
 
 app = start_app()
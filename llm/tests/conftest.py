@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+from llm_analizer import cache
+
+
+class Clock:
+    """
+    Часы кэша, время идет только по `tick`
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def tick(self, seconds: float = 1.0) -> None:
+        self.now += seconds
+
+
+class FailingCache(cache.CacheBackend):
+    """
+    Хранилище, недоступное на каждый запрос
+    """
+    name = 'failing'
+
+    async def get(self, key: str) -> str | None:
+        raise sqlite3.OperationalError('database is locked')
+
+    async def set(self, key: str, value: str) -> None:
+        raise sqlite3.OperationalError('database is locked')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'monotonic', clock)
+    monkeypatch.setattr(cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def failing_cache():
+    return FailingCache()
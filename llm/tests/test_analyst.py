@@ -0,0 +1,145 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+
+from api_v1.api_analyst import views
+from llm_analizer.cache import MemoryCache, ResponseCache, SQLiteCache
+from llm_analizer.llm import Answer
+
+
+class FakeAnalyst:
+    """
+    Модель, отвечающая номером вызова
+    """
+
+    def __init__(self, complete: bool = True) -> None:
+        self.complete = complete
+        self.calls = 0
+
+    def cache_key(self, answer) -> str:
+        return 'key'
+
+    def send_answers(self, answers, max_time=None) -> list[Answer]:
+        self.calls += 1
+        return [Answer(texts=[f'answer {self.calls}'], complete=self.complete)
+                for _ in answers]
+
+    def stream_answer(self, answer, on_text, max_time=None, stop=None):
+        self.calls += 1
+        on_text(f'answer {self.calls}')
+        return self.complete
+
+
+class FakeExecutor:
+    """
+    Выполнение без очереди и пачек
+    """
+
+    async def submit(self, func, item):
+        return func([item])[0]
+
+    async def stream(self, func, item):
+        texts = []
+        func(item, on_text=texts.append, max_time=None,
+             stop=threading.Event())
+        for text in texts:
+            yield text
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def response_cache(request, tmp_path, monkeypatch):
+    if request.param == 'memory':
+        backend = MemoryCache(ttl=60, max_size=10)
+    else:
+        backend = SQLiteCache(path=tmp_path.joinpath('answers.sqlite3'),
+                              ttl=60,
+                              max_size=10)
+    response_cache = ResponseCache(backend=backend)
+    monkeypatch.setattr(views, 'response_cache', response_cache)
+    monkeypatch.setattr(views, 'executor', FakeExecutor())
+    yield response_cache
+    asyncio.run(response_cache.close())
+
+
+def use_analyst(monkeypatch, analyst: FakeAnalyst) -> None:
+    registry = SimpleNamespace(get=lambda: analyst)
+    monkeypatch.setattr(views, 'registry', registry)
+
+
+def request_analys(cache_control: str | None = None,
+                   ) -> tuple[list[str], str]:
+    response = Response()
+    answers = asyncio.run(views.request_analys(message=[],
+                                               response=response,
+                                               cache_control=cache_control))
+    return answers, response.headers['X-Cache']
+
+
+def stream_analys(cache_control: str | None = None,
+                  ) -> tuple[str, str]:
+    async def run():
+        response = await views.stream_analys(message=[],
+                                             cache_control=cache_control)
+        content = ''.join([event async for event in response.body_iterator])
+        return content, response.headers['X-Cache']
+
+    return asyncio.run(run())
+
+
+class TestAnalystCache:
+    """
+    Тесты кэша ответов в запросах к модели
+    """
+
+    def test_hit(self, response_cache, monkeypatch):
+        use_analyst(monkeypatch, FakeAnalyst())
+        assert request_analys() == (['answer 1'], 'MISS')
+        assert request_analys() == (['answer 1'], 'HIT')
+
+    def test_bypass(self, response_cache, monkeypatch):
+        analyst = FakeAnalyst()
+        use_analyst(monkeypatch, analyst)
+        request_analys()
+        assert request_analys(cache_control='no-cache') == (['answer 2'],
+                                                            'BYPASS')
+        assert request_analys() == (['answer 2'], 'HIT')
+        assert analyst.calls == 2
+
+    def test_incomplete_not_cached(self, response_cache, monkeypatch):
+        use_analyst(monkeypatch, FakeAnalyst(complete=False))
+        assert request_analys() == (['answer 1'], 'MISS')
+        assert request_analys() == (['answer 2'], 'MISS')
+
+    def test_stream_hit(self, response_cache, monkeypatch):
+        use_analyst(monkeypatch, FakeAnalyst())
+        content, status = stream_analys()
+        assert status == 'MISS'
+        assert 'answer 1' in content
+        assert content.endswith('event: done\ndata: {}\n\n')
+        assert stream_analys()[1] == 'HIT'
+        assert request_analys() == (['answer 1'], 'HIT')
+
+    def test_stream_bypass(self, response_cache, monkeypatch):
+        use_analyst(monkeypatch, FakeAnalyst())
+        stream_analys()
+        content, status = stream_analys(cache_control='no-cache')
+        assert status == 'BYPASS'
+        assert 'answer 2' in content
+
+    def test_stream_incomplete_not_cached(self, response_cache, monkeypatch):
+        use_analyst(monkeypatch, FakeAnalyst(complete=False))
+        stream_analys()
+        assert stream_analys()[1] == 'MISS'
+
+    def test_backend_errors(self, failing_cache, monkeypatch):
+        monkeypatch.setattr(views, 'response_cache',
+                            ResponseCache(backend=failing_cache))
+        monkeypatch.setattr(views, 'executor', FakeExecutor())
+        use_analyst(monkeypatch, FakeAnalyst())
+        assert request_analys() == (['answer 1'], 'MISS')
+        content, status = stream_analys()
+        assert status == 'MISS'
+        assert content.endswith('event: done\ndata: {}\n\n')
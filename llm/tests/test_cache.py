@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from llm_analizer.cache import MemoryCache, ResponseCache, SQLiteCache
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        yield MemoryCache(ttl=60, max_size=2)
+        return
+    backend = SQLiteCache(path=tmp_path.joinpath('cache', 'answers.sqlite3'),
+                          ttl=60,
+                          max_size=2)
+    yield backend
+    asyncio.run(backend.close())
+
+
+class TestCacheBackend:
+    """
+    Тесты хранилищ ответов в памяти и в SQLite
+    """
+
+    def test_get_set(self, backend, clock):
+        async def run():
+            assert await backend.get('key') is None
+            await backend.set('key', 'answer')
+            return await backend.get('key')
+
+        assert asyncio.run(run()) == 'answer'
+
+    def test_ttl_expiry(self, backend, clock):
+        async def run():
+            await backend.set('key', 'answer')
+            clock.tick(59)
+            fresh = await backend.get('key')
+            clock.tick(2)
+            return fresh, await backend.get('key')
+
+        assert asyncio.run(run()) == ('answer', None)
+
+    def test_evict_least_recently_used(self, backend, clock):
+        async def run():
+            await backend.set('first', 'answer 1')
+            clock.tick()
+            await backend.set('second', 'answer 2')
+            clock.tick()
+            await backend.get('first')
+            clock.tick()
+            await backend.set('third', 'answer 3')
+            return [await backend.get(key)
+                    for key in ('first', 'second', 'third')]
+
+        assert asyncio.run(run()) == ['answer 1', None, 'answer 3']
+
+    def test_replace(self, backend, clock):
+        async def run():
+            await backend.set('key', 'old')
+            clock.tick()
+            await backend.set('key', 'new')
+            clock.tick()
+            await backend.set('other', 'answer')
+            return await backend.get('key')
+
+        assert asyncio.run(run()) == 'new'
+
+    def test_sqlite_persist(self, tmp_path, clock):
+        path = tmp_path.joinpath('answers.sqlite3')
+
+        async def run():
+            backend = SQLiteCache(path=path, ttl=60, max_size=2)
+            await backend.set('key', 'answer')
+            await backend.close()
+            backend = SQLiteCache(path=path, ttl=60, max_size=2)
+            try:
+                return await backend.get('key')
+            finally:
+                await backend.close()
+
+        assert asyncio.run(run()) == 'answer'
+
+
+class TestResponseCache:
+    """
+    Тесты обертки кэша
+    """
+
+    def test_disabled(self):
+        async def run():
+            response_cache = ResponseCache(backend=None)
+            await response_cache.set('key', 'answer')
+            return response_cache.enabled, await response_cache.get('key')
+
+        assert asyncio.run(run()) == (False, None)
+
+    def test_backend_errors(self, failing_cache):
+        def errors(operation: str) -> float:
+            return REGISTRY.get_sample_value(
+                'llm_cache_errors_total',
+                dict(backend=failing_cache.name, operation=operation),
+            ) or 0.0
+
+        async def run():
+            response_cache = ResponseCache(backend=failing_cache)
+            await response_cache.set('key', 'answer')
+            return await response_cache.get('key')
+
+        before = errors('get'), errors('set')
+        assert asyncio.run(run()) is None
+        assert (errors('get'), errors('set')) == (before[0] + 1,
+                                                  before[1] + 1)
@@ -0,0 +1,247 @@
+import asyncio
+import gc
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from llm_analizer.executor import InferenceExecutor
+from llm_analizer.exeptions import InferenceTimeoutError, QueueFullError
+
+
+class BlockingModel:
+    """
+    Модель, отвечающая только после `release`
+    """
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.stopped = threading.Event()
+        self.calls: list[tuple[list, float]] = []
+
+    def __call__(self, items, max_time=None) -> list[str]:
+        self.calls.append((list(items), max_time))
+        self.started.set()
+        self.release.wait(timeout=5)
+        return [f'{item}!' for item in items]
+
+    def stream(self, item, on_text, max_time=None, stop=None) -> bool:
+        self.started.set()
+        on_text(f'{item}!')
+        while not self.release.is_set():
+            if stop.wait(timeout=0.01):
+                self.stopped.set()
+                return False
+        return True
+
+    async def wait_started(self) -> None:
+        assert await asyncio.to_thread(self.started.wait, 5)
+
+
+@pytest.fixture
+def model():
+    model = BlockingModel()
+    yield model
+    model.release.set()
+
+
+@pytest.fixture
+def make_executor():
+    executors = []
+
+    def make_executor(**kwargs) -> InferenceExecutor:
+        options = dict(workers=1,
+                       max_queue=8,
+                       timeout=5,
+                       batch_size=4,
+                       batch_wait_ms=1)
+        options.update(kwargs)
+        executor = InferenceExecutor(**options)
+        executors.append(executor)
+        return executor
+
+    yield make_executor
+    for executor in executors:
+        executor.shutdown()
+
+
+async def wait_idle(executor: InferenceExecutor) -> None:
+    """
+    Ожидание освобождения всех потоков исполнителя
+    """
+    for _ in range(500):
+        if executor._get_slots()._value == executor.workers:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError('Поток модели не освобожден')
+
+
+class TestExecutorQueue:
+    """
+    Тесты очереди и таймаутов исполнителя
+    """
+
+    def test_queue_full(self, model, make_executor):
+        executor = make_executor(max_queue=1)
+
+        async def run():
+            running = asyncio.create_task(executor.submit(model, 1))
+            await model.wait_started()
+            with pytest.raises(QueueFullError) as submit_error:
+                await executor.submit(model, 2)
+            with pytest.raises(QueueFullError) as stream_error:
+                executor.stream(model.stream, 3)
+            model.release.set()
+            return await running, submit_error.value, stream_error.value
+
+        answer, *errors = asyncio.run(run())
+        assert answer == '1!'
+        for error in errors:
+            assert error.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+            assert error.headers == {'Retry-After': '1'}
+        assert executor.pending == 0
+
+    def test_timeout(self, model, make_executor):
+        executor = make_executor(timeout=0.1)
+
+        async def run():
+            with pytest.raises(InferenceTimeoutError) as error:
+                await executor.submit(model, 1)
+            assert executor.pending == 0
+            model.release.set()
+            await wait_idle(executor)
+            return error.value
+
+        error = asyncio.run(run())
+        assert error.status_code == HTTPStatus.GATEWAY_TIMEOUT
+        assert model.calls[0][1] <= 0.1
+
+    def test_stream_timeout(self, model, make_executor):
+        executor = make_executor(timeout=0.2)
+
+        async def run():
+            running = asyncio.create_task(executor.submit(model, 1))
+            await model.wait_started()
+            tokens = executor.stream(model.stream, 2)
+            with pytest.raises(InferenceTimeoutError):
+                await anext(tokens)
+            model.release.set()
+            with pytest.raises(InferenceTimeoutError):
+                await running
+            await wait_idle(executor)
+
+        asyncio.run(run())
+        assert executor.pending == 0
+
+    def test_stream(self, model, make_executor):
+        executor = make_executor()
+        model.release.set()
+
+        async def run():
+            return [text async for text in executor.stream(model.stream, 1)]
+
+        assert asyncio.run(run()) == ['1!']
+        assert executor.pending == 0
+
+    def test_stream_disconnect(self, model, make_executor):
+        executor = make_executor()
+
+        async def run():
+            tokens = executor.stream(model.stream, 1)
+            assert await anext(tokens) == '1!'
+            await tokens.aclose()
+            assert executor.pending == 0
+            await wait_idle(executor)
+
+        asyncio.run(run())
+        assert model.stopped.is_set()
+
+    def test_stream_not_started(self, model, make_executor):
+        executor = make_executor()
+
+        async def run():
+            tokens = executor.stream(model.stream, 1)
+            assert executor.pending == 1
+            del tokens
+            gc.collect()
+            return executor.pending
+
+        assert asyncio.run(run()) == 0
+        assert not model.started.is_set()
+
+    def test_shutdown(self, model, make_executor):
+        executor = make_executor()
+        model.release.set()
+
+        async def run():
+            assert await executor.submit(model, 1) == '1!'
+            tasks = tuple(executor._tasks)
+            assert tasks
+            executor.shutdown()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return tasks
+
+        tasks = asyncio.run(run())
+        assert all(task.cancelled() for task in tasks)
+        assert not executor._tasks
+
+
+class TestBatching:
+    """
+    Тесты объединения запросов в пачки
+    """
+
+    def test_one_batch(self, model, make_executor):
+        executor = make_executor(batch_wait_ms=200)
+        model.release.set()
+
+        async def run():
+            return await asyncio.gather(*(executor.submit(model, item)
+                                          for item in range(3)))
+
+        assert asyncio.run(run()) == ['0!', '1!', '2!']
+        assert [items for items, _ in model.calls] == [[0, 1, 2]]
+        assert executor.batches == 1
+
+    def test_batch_size(self, model, make_executor):
+        executor = make_executor(batch_size=2, batch_wait_ms=200)
+        model.release.set()
+
+        async def run():
+            return await asyncio.gather(*(executor.submit(model, item)
+                                          for item in range(5)))
+
+        assert asyncio.run(run()) == [f'{item}!' for item in range(5)]
+        assert [items for items, _ in model.calls] == [[0, 1], [2, 3], [4]]
+
+    def test_timed_out_job_dropped(self, model, make_executor):
+        executor = make_executor()
+
+        async def run():
+            running = asyncio.create_task(executor.submit(model, 0))
+            await model.wait_started()
+            executor.timeout = 0.1
+            with pytest.raises(InferenceTimeoutError):
+                await executor.submit(model, 1)
+            executor.timeout = 5
+            model.release.set()
+            return await running, await executor.submit(model, 2)
+
+        assert asyncio.run(run()) == ('0!', '2!')
+        assert [items for items, _ in model.calls] == [[0], [2]]
+
+    def test_max_time_earliest_deadline(self, model, make_executor):
+        executor = make_executor(batch_wait_ms=200)
+        model.release.set()
+
+        async def run():
+            later = asyncio.create_task(executor.submit(model, 0))
+            await asyncio.sleep(0)
+            executor.timeout = 1
+            return await asyncio.gather(later, executor.submit(model, 1))
+
+        assert asyncio.run(run()) == ['0!', '1!']
+        (items, max_time), = model.calls
+        assert items == [0, 1]
+        assert 0.5 < max_time <= 1